@@ -0,0 +1,61 @@
+# benchmarks/bench_excel_read.py
+"""
+Excel 読み込みの比較ベンチマーク（stream vs pandas）。
+
+実行例（Project1 直下で）:
+    python -m benchmarks.bench_excel_read --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.data.generator import make_dataset
+from src.data.loader import load_table
+
+
+def _measure(path: Path, engine: str, usecols: list[str] | None, repeat: int) -> float:
+    """最短の実行時間（秒）を返す。"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        load_table(path, usecols=usecols, excel_engine=engine)  # type: ignore[arg-type]
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _peak_mb(path: Path, engine: str, usecols: list[str] | None) -> float:
+    """tracemalloc によるピークメモリ（MB）。計測中は大幅に遅くなるため別に1回だけ走らせる。"""
+    tracemalloc.start()
+    try:
+        load_table(path, usecols=usecols, excel_engine=engine)  # type: ignore[arg-type]
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Excel 読み込みのベンチマーク")
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--usecols", nargs="*", default=None, help="指定列だけ読む場合の列名")
+    ap.add_argument("--memory", action="store_true", help="ピークメモリも計測する（遅い）")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.xlsx"
+        make_dataset(args.rows).to_excel(path, index=False, engine="openpyxl")
+        print(f"rows={args.rows} size={path.stat().st_size / 1024 / 1024:.1f}MB usecols={args.usecols}")
+        for engine in ("pandas", "stream"):
+            sec = _measure(path, engine, args.usecols, args.repeat)
+            line = f"{engine:>7}: {sec:8.3f}s"
+            if args.memory:
+                line += f"  peak={_peak_mb(path, engine, args.usecols):8.1f}MB"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_report_overhead.py
+"""
+レポート1件あたりの固定費（フォント登録・スタイル生成）のベンチマーク。
+
+- before: 毎回フォント登録を確認し、getSampleStyleSheet からスタイルを作り直す（従来の動作）
+- after : プロセス内で1回だけ作ったものを使い回す（現在の動作）
+初回（コールド）のコストはワーカー起動時の warm_up() で払う分として別に表示する。
+
+実行例（Project1 直下で）:
+    python -m benchmarks.bench_report_overhead --reports 50
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from src.reporting import pdf_builder
+
+
+def _setup_before() -> None:
+    """従来の動作：キャッシュを捨ててから登録確認・スタイル生成を行う。"""
+    pdf_builder._fonts_ready = False
+    pdf_builder._sample_styles.cache_clear()
+    pdf_builder._build_styles.cache_clear()
+    pdf_builder.warm_up()
+
+
+def _setup_after() -> None:
+    pdf_builder.warm_up()
+
+
+def _per_call(setup: Callable[[], None], n: int) -> float:
+    """固定費だけを n 回計測し、1回あたりのミリ秒を返す。"""
+    t0 = time.perf_counter()
+    for _ in range(n):
+        setup()
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def _per_report(setup: Callable[[], None], n: int, out_dir: Path) -> float:
+    """小さなレポートを n 件作り、1件あたりのミリ秒を返す（表1つ・グラフなし）。"""
+    df = pd.DataFrame({"項目": [f"設問{i}" for i in range(10)], "値": range(10)})
+    t0 = time.perf_counter()
+    for i in range(n):
+        setup()
+        pdf_builder.build_analysis_report(out_dir / f"r{i}.pdf", overview_kv={"回答数": i}, tables={"表": df})
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="レポート作成の固定費ベンチマーク")
+    ap.add_argument("--calls", type=int, default=200, help="固定費だけを計測する回数")
+    ap.add_argument("--reports", type=int, default=30, help="作成するレポート数")
+    args = ap.parse_args()
+
+    # 初回（コールド）の CID フォント読み込み・スタイル生成。ワーカーごとに1回かかるため initializer で先に払う
+    t0 = time.perf_counter()
+    pdf_builder.warm_up()
+    print(f"初回（コールド） {(time.perf_counter() - t0) * 1000:8.1f}ms")
+
+    before = _per_call(_setup_before, args.calls)
+    after = _per_call(_setup_after, args.calls)
+    print(f"固定費/回   before={before:8.3f}ms  after={after:8.3f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = _per_report(_setup_before, args.reports, Path(tmp))
+        after = _per_report(_setup_after, args.reports, Path(tmp))
+    print(f"レポート/件 before={before:8.1f}ms  after={after:8.1f}ms  (差 {before - after:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_startup.py
+"""
+Streamlit アプリの起動時 import 時間のチェック（python -X importtime を使用）。
+
+src/app.py のモジュール直下の import 文（関数内の遅延 import は除く）を別プロセスで実行し、
+- 合計 import 時間が --budget-ms を超えたら
+- 起動時に読み込まないはずの重いモジュール（reportlab / openpyxl / matplotlib など）が読み込まれたら
+終了コード 1 で終わる（CI で起動時間の悪化を検出する用）。
+
+実行例（Project1 直下で）:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 800 --top 15
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "src" / "app.py"
+
+# 機能を使うときまで読み込まないモジュール（起動時に読み込まれていたら失敗）
+LAZY_MODULES = ("reportlab", "openpyxl", "matplotlib", "seaborn", "svglib")
+
+# 既定の予算（ミリ秒）。streamlit 自体の import に数百ms かかるので、その分を含めた値
+DEFAULT_BUDGET_MS = 1500.0
+
+
+def startup_imports(app: Path = APP) -> list[str]:
+    """app のモジュール直下で import されるモジュール名（TYPE_CHECKING ブロックと関数内は除く）。"""
+    tree = ast.parse(app.read_text(encoding="utf-8"))
+    names: list[str] = []
+
+    def _visit(body: list[ast.stmt]) -> None:
+        for node in body:
+            if isinstance(node, ast.Import):
+                names.extend(a.name for a in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level == 0 and node.module and node.module != "__future__":
+                    names.append(node.module)
+            elif isinstance(node, ast.If):
+                if not (isinstance(node.test, ast.Name) and node.test.id == "TYPE_CHECKING"):
+                    _visit(node.body)
+                    _visit(node.orelse)
+            elif isinstance(node, (ast.Try, ast.With)):
+                _visit(node.body)
+
+    _visit(tree.body)
+    return list(dict.fromkeys(names))
+
+
+def _available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def parse_importtime(stderr: str) -> tuple[float, dict[str, float], set[str]]:
+    """
+    -X importtime の出力を読み、(合計ms, トップレベル import ごとの累積ms, 読み込まれた全モジュール) を返す。
+    トップレベル（インデントなし）の行の cumulative を足したものが合計。
+    """
+    total_us = 0
+    top: dict[str, float] = {}
+    loaded: set[str] = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cum_us, raw_name = line.split(":", 1)[1].split("|", 2)
+        mod = raw_name.strip()
+        loaded.add(mod)
+        # 入れ子の import は2文字ずつ字下げされる（" name" がトップレベル）
+        if not raw_name.startswith("  "):
+            us = int(cum_us)
+            total_us += us
+            top[mod] = us / 1000
+    return total_us / 1000, top, loaded
+
+
+def measure(modules: list[str], repeat: int = 3) -> tuple[float, dict[str, float], set[str]]:
+    """別プロセスで modules を import し、最短の結果を返す（初回は .pyc 作成分を含むため複数回測る）。"""
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), os.environ.get("PYTHONPATH", "")]))
+    best: tuple[float, dict[str, float], set[str]] | None = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            err = proc.stderr.strip().splitlines()
+            raise RuntimeError(f"import に失敗しました: {err[-1] if err else code}")
+        result = parse_importtime(proc.stderr)
+        if best is None or result[0] < best[0]:
+            best = result
+    assert best is not None
+    return best
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="アプリ起動時の import 時間チェック")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="合計 import 時間の上限（ms）")
+    ap.add_argument("--repeat", type=int, default=3, help="計測回数（最短値を使う）")
+    ap.add_argument("--top", type=int, default=10, help="時間のかかった import を上位何件表示するか")
+    ap.add_argument("--app", type=Path, default=APP, help="対象のスクリプト（既定：src/app.py）")
+    args = ap.parse_args(argv)
+
+    modules = startup_imports(args.app)
+    missing = [m for m in modules if not _available(m)]
+    if missing:
+        print(f"未インストールのため除外: {', '.join(missing)}（計測値は実際の起動より小さくなる）")
+    modules = [m for m in modules if m not in missing]
+
+    total_ms, top, loaded = measure(modules, repeat=args.repeat)
+    print(f"起動時 import: {', '.join(modules)}")
+    for name, ms in sorted(top.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {ms:8.1f}ms  {name}")
+    print(f"合計 {total_ms:.1f}ms（予算 {args.budget_ms:.0f}ms）")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"予算超過: {total_ms:.1f}ms > {args.budget_ms:.0f}ms")
+    eager = sorted(m for m in LAZY_MODULES if m in loaded)
+    if eager:
+        failures.append(f"起動時に読み込まれた重いモジュール: {', '.join(eager)}")
+    for msg in failures:
+        print(f"NG {msg}", file=sys.stderr)
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
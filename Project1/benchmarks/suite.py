@@ -0,0 +1,354 @@
+# benchmarks/suite.py
+"""
+処理段階ごとのベンチマーク（読み込み → 集計 → グラフ → PDF）。
+
+src.data.generator で 1k / 100k / 1M 行などのデータを作り、段階ごとに
+  - 実行時間（repeat 回の最短・中央値）
+  - ピークメモリ（tracemalloc。時間の計測とは別に1回だけ実行して測る）
+を記録して JSON に書き出す。コミット間の比較は --compare で行う。
+
+段階:
+  load    : load_table（CSV / xlsx、スキーマあり・なし）
+  agg     : src/processing/aggregations.py の各関数
+  charts  : src/viz/charts.py の各グラフ関数（PNG への書き出しまで）
+  report  : build_analysis_report（グラフ6枚・表つき）
+
+実行例（Project1 直下で）:
+    python -m benchmarks.suite --sizes 1k 100k --out bench.json
+    python -m benchmarks.suite --sizes 1k 100k 1M --stages load agg --fixtures data/intermediate/bench
+    python -m benchmarks.suite --sizes 100k --compare bench_prev.json --tolerance 1.3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.data.generator import make_dataset, write_dataset
+from src.data.loader import load_table
+from src.data.schema import load_schema
+from src.processing import aggregations as agg
+
+ROOT = Path(__file__).resolve().parents[1]
+
+STAGES = ("load", "agg", "charts", "report")
+
+# openpyxl での xlsx 書き出しは 1M 行だと数分かかるため、既定ではこの行数までにする
+XLSX_MAX_ROWS = 100_000
+
+AGE_ORDER = ["10代", "20代", "30代", "40代", "50代", "60代", "70代"]
+
+
+@dataclass
+class Case:
+    """1つの計測対象。fn は引数なしで呼べるようにしておく。"""
+    stage: str
+    name: str
+    fn: Callable[[], Any]
+
+
+def parse_size(text: str) -> int:
+    """'1k' / '100k' / '1M' / '2500' を行数にする。"""
+    t = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(t[-1:], 1)
+    try:
+        return int(float(t[:-1] if mult > 1 else t) * mult)
+    except ValueError:
+        raise ValueError(f"行数の指定が不正です: {text}") from None
+
+
+def size_label(n: int) -> str:
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f"{n // 1_000_000}M"
+    if n >= 1_000 and n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+# ---- 計測 ----------------------------------------------------------------------------
+
+def time_case(fn: Callable[[], Any], repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def peak_memory_mb(fn: Callable[[], Any]) -> float:
+    """fn 実行中の Python / numpy の割り当てのピーク（MB）。"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def max_rss_mb() -> Optional[float]:
+    """プロセス全体の最大常駐メモリ（MB）。取得できない環境では None。"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+
+# ---- 対象 ----------------------------------------------------------------------------
+
+def fixtures(n: int, directory: Path, xlsx_max_rows: int) -> dict[str, Path]:
+    """n 行の CSV / xlsx を用意する（directory にあれば再利用）。"""
+    directory.mkdir(parents=True, exist_ok=True)
+    out = {"csv": directory / f"survey_{size_label(n)}.csv"}
+    if n <= xlsx_max_rows:
+        out["xlsx"] = directory / f"survey_{size_label(n)}.xlsx"
+    for path in out.values():
+        if not path.exists():
+            write_dataset(path, n, seed=42)
+    return out
+
+
+def load_cases(files: dict[str, Path]) -> list[Case]:
+    schema = load_schema()
+    cases = []
+    for fmt, path in files.items():
+        cases.append(Case("load", f"load_table[{fmt}]", lambda p=path: load_table(p)))
+        cases.append(Case("load", f"load_table[{fmt},schema]", lambda p=path: load_table(p, schema=schema)))
+    return cases
+
+
+def agg_cases(df: pd.DataFrame) -> list[Case]:
+    q = ["満足度", "コスパ満足度", "接客満足度", "利用頻度"]
+    spec = {
+        "年代": {"metrics": ["count", "percent"], "order": AGE_ORDER},
+        "満足度": ["mean", "median", "mode", "likert", "n", "missing"],
+    }
+    return [
+        Case("agg", "count_by", lambda: agg.count_by(df, "年代")),
+        Case("agg", "percent_by", lambda: agg.percent_by(df, "年代")),
+        Case("agg", "mean_of", lambda: agg.mean_of(df, "満足度")),
+        Case("agg", "median_of", lambda: agg.median_of(df, "満足度")),
+        Case("agg", "mode_of", lambda: agg.mode_of(df, "満足度")),
+        Case("agg", "mean_by", lambda: agg.mean_by(df, "年代", "満足度")),
+        Case("agg", "crosstab_counts", lambda: agg.crosstab_counts(df, "年代", "満足度")),
+        Case("agg", "crosstab_percent", lambda: agg.crosstab_percent(df, "年代", "満足度")),
+        Case("agg", "crosstab_all", lambda: agg.crosstab_all(df, ["年代", "性別"], q)),
+        Case("agg", "likert_summary", lambda: agg.likert_summary(df, "満足度")),
+        Case("agg", "nps", lambda: agg.nps(df, "満足度")),
+        Case("agg", "summarize", lambda: agg.summarize(df, spec)),
+        Case("agg", "top_terms", lambda: agg.top_terms(df, "良かった点")),
+        Case("agg", "top_terms_by", lambda: agg.top_terms_by(df, "良かった点", "年代")),
+    ]
+
+
+def _render(make: Callable[[], Any]) -> None:
+    """グラフを作って PNG に書き出し、図をプールへ返す。"""
+    from src.viz.charts import release_figure
+
+    fig = make()
+    try:
+        fig.savefig(BytesIO(), format="png")
+    finally:
+        release_figure(fig)
+
+
+def chart_inputs(df: pd.DataFrame) -> dict[str, Any]:
+    return {
+        "age": agg.count_by(df, "年代"),
+        "age_pct": agg.percent_by(df, "年代"),
+        "mean": agg.mean_by(df, "年代", "満足度"),
+        "cross": agg.crosstab_counts(df, "年代", "満足度"),
+    }
+
+
+def chart_cases(df: pd.DataFrame) -> list[Case]:
+    from src.viz import charts
+
+    x = chart_inputs(df)
+    return [
+        Case("charts", "pie_from_counts", lambda: _render(lambda: charts.pie_from_counts(x["age"], "年代"))),
+        Case("charts", "donut_from_counts", lambda: _render(lambda: charts.donut_from_counts(x["age"], "年代"))),
+        Case("charts", "bar_from_counts", lambda: _render(lambda: charts.bar_from_counts(x["age"], "年代"))),
+        Case("charts", "bar_from_percent", lambda: _render(lambda: charts.bar_from_percent(x["age_pct"], "年代"))),
+        Case("charts", "bar_group_mean", lambda: _render(lambda: charts.bar_group_mean(x["mean"], "満足度"))),
+        Case("charts", "stacked_bar_from_dataframe",
+             lambda: _render(lambda: charts.stacked_bar_from_dataframe(x["cross"], "年代×満足度"))),
+    ]
+
+
+def report_cases(df: pd.DataFrame, out_dir: Path) -> list[Case]:
+    from src.reporting.pdf_builder import build_analysis_report
+    from src.viz.charts import ChartSpec
+
+    x = chart_inputs(df)
+    specs = [
+        ChartSpec("pie", x["age"], title="年代"),
+        ChartSpec("donut", agg.count_by(df, "性別"), title="性別"),
+        ChartSpec("bar_counts", agg.count_by(df, "利用頻度"), title="利用頻度"),
+        ChartSpec("bar_percent", x["age_pct"], title="年代（%）"),
+        ChartSpec("bar_mean", x["mean"], title="年代別の満足度"),
+        ChartSpec("stacked_bar", x["cross"], title="年代×満足度"),
+    ]
+    tables = {
+        "年代×満足度": agg.crosstab_counts(df, "年代", "満足度").reset_index(),
+        "満足度": agg.likert_summary(df, "満足度")[0].reset_index(),
+    }
+
+    def _build() -> None:
+        build_analysis_report(
+            out_dir / "bench_report.pdf",
+            overview_kv={"回答数": len(df)},
+            chart_paths=specs,
+            tables=tables,
+        )
+
+    return [Case("report", "build_analysis_report", _build)]
+
+
+# ---- 実行 ----------------------------------------------------------------------------
+
+def run_suite(
+    sizes: Sequence[int],
+    *,
+    stages: Sequence[str] = STAGES,
+    repeat: int = 3,
+    memory: bool = True,
+    fixture_dir: Optional[Path] = None,
+    xlsx_max_rows: int = XLSX_MAX_ROWS,
+) -> list[dict[str, Any]]:
+    """sizes × stages を計測し、1ケース1要素の結果リストを返す。"""
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise ValueError(f"未対応の段階です: {', '.join(unknown)}")
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = fixture_dir or Path(tmp)
+        for n in sizes:
+            df = make_dataset(n)
+            cases: list[Case] = []
+            if "load" in stages:
+                cases += load_cases(fixtures(n, base, xlsx_max_rows))
+            if "agg" in stages:
+                cases += agg_cases(df)
+            if "charts" in stages:
+                cases += chart_cases(df)
+            if "report" in stages:
+                cases += report_cases(df, Path(tmp))
+
+            for case in cases:
+                case.fn()  # ウォームアップ（import・フォント登録・初回コンパイルなどを除く）
+                times = time_case(case.fn, repeat)
+                row = {
+                    "size": n,
+                    "stage": case.stage,
+                    "name": case.name,
+                    "repeat": repeat,
+                    "min_s": round(min(times), 6),
+                    "median_s": round(statistics.median(times), 6),
+                    "peak_mb": round(peak_memory_mb(case.fn), 3) if memory else None,
+                }
+                results.append(row)
+                mem = f"  peak {row['peak_mb']:9.1f}MB" if memory else ""
+                print(f"{size_label(n):>5} {case.stage:<7} {case.name:<30} "
+                      f"min {row['min_s'] * 1000:10.2f}ms  median {row['median_s'] * 1000:10.2f}ms{mem}", flush=True)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict[str, Any]:
+    import matplotlib
+    import reportlab
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "reportlab": reportlab.Version,
+    }
+
+
+def compare(current: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+    """baseline より tolerance 倍以上遅くなったケースを返す（min_s で比較）。"""
+    base = {(r["size"], r["stage"], r["name"]): r for r in baseline}
+    slower = []
+    for r in current:
+        b = base.get((r["size"], r["stage"], r["name"]))
+        if not b or not b["min_s"]:
+            continue
+        ratio = r["min_s"] / b["min_s"]
+        if ratio >= tolerance:
+            slower.append(f"{size_label(r['size'])} {r['stage']} {r['name']}: "
+                          f"{b['min_s'] * 1000:.2f}ms → {r['min_s'] * 1000:.2f}ms（×{ratio:.2f}）")
+    return slower
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="読み込み・集計・グラフ・PDF の段階別ベンチマーク")
+    ap.add_argument("--sizes", nargs="+", default=["1k", "100k", "1M"], help="行数（1k / 100k / 1M など）")
+    ap.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    ap.add_argument("--repeat", type=int, default=3, help="ケースごとの計測回数")
+    ap.add_argument("--no-memory", action="store_true", help="ピークメモリを計測しない（その分速く終わる）")
+    ap.add_argument("--fixtures", type=Path, default=None, help="CSV / xlsx を保存して再利用するディレクトリ")
+    ap.add_argument("--xlsx-max-rows", type=int, default=XLSX_MAX_ROWS, help="xlsx の読み込みを計測する最大行数")
+    ap.add_argument("--out", type=Path, default=None, help="結果の JSON（既定：benchmarks/results/<commit>.json）")
+    ap.add_argument("--compare", type=Path, default=None, help="比較する過去の結果 JSON")
+    ap.add_argument("--tolerance", type=float, default=1.2, help="この倍率以上遅くなったら失敗扱い")
+    args = ap.parse_args(argv)
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    sizes = [parse_size(s) for s in args.sizes]
+    results = run_suite(
+        sizes, stages=args.stages, repeat=args.repeat, memory=not args.no_memory,
+        fixture_dir=args.fixtures, xlsx_max_rows=args.xlsx_max_rows,
+    )
+    env = environment()
+    env["max_rss_mb"] = max_rss_mb()
+    out = args.out or ROOT / "benchmarks" / "results" / f"{env['commit'] or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"environment": env, "results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"結果: {out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+        slower = compare(results, baseline, args.tolerance)
+        for line in slower:
+            print(f"遅くなった: {line}", file=sys.stderr)
+        if slower:
+            return 1
+        print(f"{args.compare} と比べて ×{args.tolerance} 以上遅くなったケースはありません")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,116 +1,95 @@
 from __future__ import annotations
 
-import io
-import logging
+import hashlib
+import sys
 from pathlib import Path
-from datetime import datetime
+from typing import TYPE_CHECKING
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 
-# 日本語フォント対策 (環境によってはこれが必要な場合があります)
-import matplotlib
-matplotlib.rcParams['font.family'] = ['MS Gothic', 'Hiragino Sans', 'AppleGothic', 'sans-serif']
+# `streamlit run src/app.py` ではスクリプトのあるディレクトリ（src/）しか import パスに入らないため、
+# プロジェクトルートを追加して src パッケージを使えるようにする
+_ROOT = Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
 
-# ---- Logging ---------------------------------------------------------------
-try:
-    from src.utils.logging import setup_logging, get_logger
-except Exception:
-    def setup_logging(**kwargs):
-        logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(asctime)s - %(message)s')
-    def get_logger(name: str = 'app'):
-        return logging.getLogger(name)
+from src.utils.logging import setup_logging, get_logger  # noqa: E402
+from src.utils.paths import make_data_layout, charts_dir, reports_dir  # noqa: E402
+from src.utils import profiling  # noqa: E402
 
-# ---- Paths -----------------------------------------------------------------
-def _p(*parts):
-    return Path(__file__).resolve().parents[0].joinpath(*parts) # パス計算を修正
+if TYPE_CHECKING:
+    import pandas as pd
 
-try:
-    from src.utils.paths import (
-        make_data_layout, charts_dir, reports_dir, input_dir, intermediate_dir
-    )
-except Exception:
-    def make_data_layout():
-        for d in [charts_dir(), reports_dir(), input_dir(), intermediate_dir()]:
-            d.mkdir(parents=True, exist_ok=True)
-    def charts_dir(): return _p('data', 'output', 'charts')
-    def reports_dir(): return _p('data', 'output', 'reports')
-    def input_dir(): return _p('data', 'input')
-    def intermediate_dir(): return _p('data', 'intermediate')
-
-# ---- Loader & Processing ----------------------------------------------------
-# 外部モジュールがない場合に備え、最低限必要なロジックを統合
-def load_table_from_bytes(data: bytes, *, suffix: str, **kwargs) -> pd.DataFrame:
-    bio = io.BytesIO(data)
-    if suffix.lower() == '.csv':
-        return pd.read_csv(bio, encoding=kwargs.get('encoding','utf-8-sig'))
-    else:
-        return pd.read_excel(bio, engine='openpyxl')
-
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [str(c).strip().replace('\u3000',' ') for c in df.columns]
-    return df
-
-def count_by(df: pd.DataFrame, col: str):
-    return df[col].value_counts().sort_index()
-
-def mean_of(df: pd.DataFrame, col: str):
-    return float(pd.to_numeric(df[col], errors='coerce').dropna().mean())
-
-# ---- Charts -----------------------------------------------------------------
-def pie_from_counts(s, title='', out: Path|None=None):
-    fig, ax = plt.subplots()
-    ax.pie(s.values, labels=[str(i) for i in s.index], autopct='%1.1f%%', startangle=90)
-    ax.set_title(title)
-    fig.tight_layout()
-    if out:
-        out.parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(out)
-    return fig
-
-def bar_from_counts(s, title='', xlabel='カテゴリ', ylabel='件数', out: Path|None=None):
-    fig, ax = plt.subplots()
-    ax.bar([str(i) for i in s.index], s.values, color='#00b894')
-    ax.set_title(title)
-    ax.set_xlabel(xlabel)
-    ax.set_ylabel(ylabel)
-    plt.xticks(rotation=45)
-    fig.tight_layout()
-    if out:
-        out.parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(out)
-    return fig
-
-def stacked_bar_from_dataframe(df, title='', xlabel='', ylabel='件数', out: Path|None=None):
-    fig, ax = plt.subplots()
-    df.plot(kind='bar', stacked=True, ax=ax)
-    ax.set_title(title)
-    ax.set_xlabel(xlabel)
-    ax.set_ylabel(ylabel)
-    plt.xticks(rotation=45)
-    fig.tight_layout()
-    if out:
-        out.parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(out)
-    return fig
-
-# ---- Demo Data --------------------------------------------------------------
-def make_demo_dataset(n: int = 200) -> pd.DataFrame:
-    rng = np.random.default_rng(42)
-    ages = ["10代","20代","30代","40代","50代","60代以上"]
-    genders = ["男性","女性","その他","無回答"]
-    rows = []
-    for i in range(1, n+1):
-        rows.append({
-            "回答者ID": f"R{i:04d}",
-            "年代": rng.choice(ages),
-            "性別": rng.choice(genders),
-            "満足度": int(rng.integers(1, 6)),
-        })
-    return pd.DataFrame(rows)
+# UI は src/ 以下のモジュールの薄い層にする。
+# pandas / matplotlib / reportlab などの重いモジュールは、その機能を使う関数の中で import する
+# （初回表示までの時間を短くするため）。
+
+logger = get_logger('app')
+
+# ---- Caching ----------------------------------------------------------------
+# ウィジェット操作のたびにスクリプト全体が再実行されるため、
+# アップロード内容のハッシュをキーに「読み込み結果」と「集計結果」をキャッシュする。
+# - DataFrame は st.cache_resource（コピーせず共有。大きなファイルでも再実行が速い）
+#   → 全セッションで共有されるので、取得した DataFrame は変更しないこと
+# - 集計結果（小さい）は st.cache_data（呼び出しごとにコピーされるので安全）
+# - 読み込み結果はさらに data/intermediate の Arrow キャッシュにも保存され、サーバ再起動後も再利用される
+# - グラフは src.viz.charts の PNG キャッシュを通すので、同じ内容なら再描画しない
+CACHE_TTL_SEC = 60 * 60
+CACHE_MAX_ENTRIES = 8
+
+def _upload_id(uploaded) -> str:
+    return getattr(uploaded, 'file_id', None) or f'{uploaded.name}:{uploaded.size}'
+
+def upload_digest(uploaded) -> str:
+    """アップロード内容のハッシュ。同じアップロードに対しては再計算しない（session_state に保持）"""
+    file_id = _upload_id(uploaded)
+    memo = st.session_state.get('_upload_digest')
+    if memo and memo[0] == file_id:
+        return memo[1]
+    digest = hashlib.blake2b(uploaded.getbuffer(), digest_size=16).hexdigest()
+    st.session_state['_upload_digest'] = (file_id, digest)
+    return digest
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SEC, show_spinner='読み込み中...')
+def load_upload(digest: str, name: str, _data) -> pd.DataFrame:
+    """digest とファイル名がキャッシュキー（_data はハッシュしない）"""
+    from src.data.cache import cached_load
+    from src.data.loader import load_table_from_bytes, normalize_columns
+
+    suffix = Path(name).suffix.lower()
+
+    def _load() -> pd.DataFrame:
+        return normalize_columns(load_table_from_bytes(bytes(_data), suffix=suffix))
+
+    # アップロードは内容ハッシュを識別子にする（同じファイル名の別のアップロードと混ざらない）
+    return cached_load(digest, digest, {'suffix': suffix, 'normalized': True}, _load, name=f'upload_{Path(name).stem}')
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SEC, show_spinner=False)
+def load_demo(n: int) -> pd.DataFrame:
+    from src.data.generator import make_dataset
+
+    return make_dataset(n)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES * 16, ttl=CACHE_TTL_SEC, show_spinner=False)
+def cached_count_by(data_key: str, col: str, _df: pd.DataFrame) -> pd.Series:
+    """data_key（内容ハッシュ）と列名がキャッシュキー"""
+    from src.processing.aggregations import count_by
+
+    return count_by(_df, col)
+
+# ---- Charts / Report --------------------------------------------------------
+def chart_png(kind: str, series, title: str, out: Path) -> Path:
+    """src.viz.charts のキャッシュ付き描画で PNG にし、out（PDF 用）にも保存する"""
+    from src.viz.charts import render_cached
+
+    return render_cached(kind, series, title=title, out=out)
+
+def build_report(title: str, chart_paths: list[Path]) -> Path:
+    from src.reporting.pdf_builder import build_simple_report
+
+    out = reports_dir() / 'report.pdf'
+    build_simple_report(out, title, chart_paths)
+    return out
 
 # ---- Streamlit Main ---------------------------------------------------------
 st.set_page_config(page_title='アンケート集計', page_icon='📊', layout='wide')
@@ -124,14 +103,40 @@ with st.sidebar:
     demo_rows = st.slider('データ件数', 50, 1000, 200)
     use_demo = st.button('デモデータをロード')
     uploaded = st.file_uploader('ファイルをアップロード', type=['xlsx', 'csv'])
+    show_timing = st.checkbox('処理時間を表示', value=profiling.is_enabled())
 
-df = None
+# 計測は再実行ごとに取り直す（計測はプロセス全体で共有されるため、開発・調査用）
+if show_timing:
+    if profiling.is_enabled():
+        profiling.reset()
+    else:
+        profiling.enable()
+elif profiling.is_enabled():
+    profiling.disable()
+
+# 読み込むデータ（デモ／アップロード）を session_state に覚えておき、以降の再実行でも同じデータを使う
 if use_demo:
-    df = make_demo_dataset(demo_rows)
-elif uploaded:
-    suffix = Path(uploaded.name).suffix
-    df = load_table_from_bytes(uploaded.read(), suffix=suffix)
-    df = normalize_columns(df)
+    st.session_state['source'] = ('demo', demo_rows)
+elif uploaded is not None and st.session_state.get('_source_file') != _upload_id(uploaded):
+    st.session_state['_source_file'] = _upload_id(uploaded)
+    st.session_state['source'] = ('upload', upload_digest(uploaded), uploaded.name)
+elif uploaded is None and st.session_state.get('source', ('',))[0] == 'upload':
+    st.session_state.pop('source')
+    st.session_state.pop('_source_file', None)
+
+df = None
+data_key = None
+source = st.session_state.get('source')
+try:
+    if source and source[0] == 'demo':
+        data_key = f'demo:{source[1]}'
+        df = load_demo(source[1])
+    elif source:
+        data_key = source[1]
+        df = load_upload(data_key, source[2], uploaded.getbuffer())
+except (ValueError, KeyError) as e:
+    logger.warning('読み込みに失敗しました: %s', e)
+    st.error(f'ファイルを読み込めませんでした: {e}')
 
 if df is not None:
     st.subheader('データプレビュー')
@@ -139,23 +144,42 @@ if df is not None:
 
     chart_paths = []
     col1, col2 = st.columns(2)
-    
+
     if '年代' in df.columns:
         with col1:
-            s_age = count_by(df, '年代')
-            p1 = charts_dir() / 'age_pie.png'
-            st.pyplot(pie_from_counts(s_age, '年代比率', out=p1))
+            s_age = cached_count_by(data_key, '年代', df)
+            p1 = chart_png('pie', s_age, '年代比率', charts_dir() / 'age_pie.png')
+            st.image(str(p1))
             chart_paths.append(p1)
-            
+
     if '性別' in df.columns:
         with col2:
-            s_gen = count_by(df, '性別')
-            p2 = charts_dir() / 'gender_bar.png'
-            st.pyplot(bar_from_counts(s_gen, '性別分布', out=p2))
+            s_gen = cached_count_by(data_key, '性別', df)
+            p2 = chart_png('bar_counts', s_gen, '性別分布', charts_dir() / 'gender_bar.png')
+            st.image(str(p2))
             chart_paths.append(p2)
 
     if st.button('📄 PDFレポート生成（簡易版）'):
-        # PDF作成のロジックは環境依存が強いため、ここでは成功メッセージのみ
-        st.success('チャート画像を data/output/charts に保存しました。')
+        with st.spinner('PDF を作成中...'):
+            pdf = build_report('アンケート集計レポート', chart_paths)
+        st.success(f'PDF を作成しました: {pdf}')
+        st.download_button('PDF をダウンロード', data=pdf.read_bytes(), file_name=pdf.name, mime='application/pdf')
 else:
-    st.info('データをロードしてください。')
\ No newline at end of file
+    st.info('データをロードしてください。')
+
+# ---- Timing panel -----------------------------------------------------------
+if show_timing:
+    with st.expander('⏱ 処理時間（この再実行分・キャッシュから返したものは含まない）', expanded=True):
+        rows = profiling.summary()
+        if rows:
+            st.dataframe(rows, use_container_width=True)
+            import json
+
+            st.download_button(
+                'Chrome trace をダウンロード',
+                data=json.dumps(profiling.chrome_trace(), ensure_ascii=False),
+                file_name='trace.json',
+                mime='application/json',
+            )
+        else:
+            st.caption('計測された処理はありません。')
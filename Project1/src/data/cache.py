@@ -0,0 +1,189 @@
+# src/data/cache.py
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional
+
+import pandas as pd
+
+from ..utils.logging import get_logger
+from ..utils.paths import ensure_dir, intermediate_dir
+
+
+# ---- 読み込み結果の列指向キャッシュ（Arrow IPC / Feather v2） ----------------------
+#
+# xlsx の解析（openpyxl）は遅いため、読み込んだ DataFrame を data/intermediate に保存し、
+# 次回以降はメモリマップで読み直す。
+# - キー：元ファイルの内容ハッシュ + 読み込みオプション + キャッシュ形式のバージョン
+#   → 元ファイルが変われば自動的に別キーになり、古いキャッシュは書き込み時に削除する
+# - 「同じ元ファイル」の判定は絶対パス（アップロードは内容ハッシュ）で行う
+#   （ファイル名だけだと a.csv / a.xlsx や別フォルダの同名ファイルが互いのキャッシュを消してしまう）
+# - ファイル数が CACHE_MAX_FILES を超えたら、古いものから削除する
+# - カテゴリ的な文字列列は category 型（Arrow の辞書型）で保存する
+# - 非圧縮で保存するので、読み込み時は mmap でほぼゼロコピーになる
+# pyarrow が無い環境ではキャッシュを使わずに毎回読み込む。
+
+logger = get_logger(__name__)
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".arrow"
+CACHE_MAX_FILES = 64
+
+# category 型に変換する条件（ユニーク数が少ない文字列列）
+CATEGORY_MAX_UNIQUE = 1000
+CATEGORY_MAX_RATIO = 0.5
+
+_HASH_BLOCK = 1024 * 1024
+
+
+def cache_dir() -> Path:
+    """キャッシュの保存先（data/intermediate/table_cache）。"""
+    return intermediate_dir() / "table_cache"
+
+
+def file_digest(path: Path | str) -> str:
+    """ファイル内容のハッシュ（ブロック単位で読むので巨大ファイルでもメモリを使わない）。"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def bytes_digest(data: bytes) -> str:
+    """バイト列のハッシュ（アップロードファイルなど）。"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def source_id(path: Path | str) -> str:
+    """元ファイルの識別子（絶対パスのハッシュ）。"""
+    resolved = str(Path(path).resolve())
+    return hashlib.blake2b(resolved.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def cache_key(digest: str, options: Mapping[str, Any]) -> str:
+    """内容ハッシュと読み込みオプションからキャッシュキーを作る。"""
+    payload = json.dumps(
+        {"v": CACHE_VERSION, "digest": digest, "options": options},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def to_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """カテゴリ的な文字列列を category 型にする（保存サイズとメモリの削減）。"""
+    out = df.copy(deep=False)
+    n = len(df)
+    for col in df.columns:
+        s = df[col]
+        if s.dtype != object:
+            continue
+        if pd.api.types.infer_dtype(s, skipna=True) != "string":
+            continue
+        nunique = s.nunique(dropna=True)
+        if nunique <= CATEGORY_MAX_UNIQUE and nunique <= max(1, n * CATEGORY_MAX_RATIO):
+            out[col] = s.astype("category")
+    return out
+
+
+def read_cache(path: Path) -> Optional[pd.DataFrame]:
+    """キャッシュをメモリマップで読む。無い・読めない場合は None。"""
+    if not path.exists():
+        return None
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return None
+    try:
+        return feather.read_table(path, memory_map=True).to_pandas()
+    except Exception as e:
+        logger.warning("キャッシュの読み込みに失敗したため再読み込みします: %s (%s)", path, e)
+        return None
+
+
+def write_cache(df: pd.DataFrame, path: Path) -> bool:
+    """
+    DataFrame をキャッシュとして保存する（一時ファイル → rename で原子的に置き換え）。
+    pyarrow が無い・型が混在して変換できない場合は保存せず False を返す。
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+    except ImportError:
+        return False
+    ensure_dir(path.parent)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        table = pa.Table.from_pandas(to_categoricals(df), preserve_index=False)
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+        return True
+    except Exception as e:
+        logger.warning("キャッシュを保存できませんでした: %s (%s)", path, e)
+        tmp.unlink(missing_ok=True)
+        return False
+
+
+def _cache_prefix(source: str, name: str) -> str:
+    """キャッシュファイル名の接頭辞：<表示用の名前>-<元ファイルの識別子>。"""
+    label = "".join(c if c.isalnum() or c in "_-" else "_" for c in name)[:40] or "_"
+    return f"{label}-{source}"
+
+
+def _remove_stale(directory: Path, prefix: str, digest: str) -> None:
+    """同じ元ファイルで内容ハッシュが異なる（＝元ファイルが更新された）古いキャッシュを削除する。"""
+    for old in directory.glob(f"{glob.escape(prefix)}.*{CACHE_SUFFIX}"):
+        # <prefix>.<内容ハッシュ>.<キー>.arrow の形のものだけを対象にする
+        parts = old.name[len(prefix) + 1:-len(CACHE_SUFFIX)].split(".")
+        if len(parts) == 2 and parts[0] != digest[:16]:
+            old.unlink(missing_ok=True)
+
+
+def _prune(directory: Path, max_files: int = CACHE_MAX_FILES) -> None:
+    """キャッシュが max_files を超えたら、更新日時の古いものから削除する。"""
+    files = []
+    for p in directory.glob(f"*{CACHE_SUFFIX}"):
+        try:
+            files.append((p.stat().st_mtime, p))
+        except OSError:
+            continue
+    if len(files) <= max_files:
+        return
+    for _, p in sorted(files)[: len(files) - max_files]:
+        p.unlink(missing_ok=True)
+
+
+def cached_load(
+    digest: str,
+    source: str,
+    options: Mapping[str, Any],
+    load: Callable[[], pd.DataFrame],
+    *,
+    name: str = "",
+    directory: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    キャッシュがあれば読み、無ければ load() で読み込んで保存する。
+    source は元ファイルの識別子（source_id(path)、アップロードなら内容ハッシュ）で、
+    同じ source の古いキャッシュの掃除に使う。name はファイル名を読みやすくするためだけのもの。
+    ファイル名：<name>-<source>.<内容ハッシュ>.<キー>.arrow
+    """
+    directory = directory or cache_dir()
+    prefix = _cache_prefix(source[:16], name)
+    key = cache_key(digest, options)
+    path = directory / f"{prefix}.{digest[:16]}.{key[:16]}{CACHE_SUFFIX}"
+    df = read_cache(path)
+    if df is not None:
+        logger.debug("キャッシュを使用: %s", path)
+        return df
+    df = load()
+    if write_cache(df, path):
+        _remove_stale(directory, prefix, digest)
+        _prune(directory)
+        # 返り値もキャッシュから読んだ場合と同じ型（category など）にそろえる
+        return to_categoricals(df)
+    return df
@@ -1,43 +1,293 @@
 # src/data/generator.py
-from pathlib import Path
+"""
+デモ・負荷テスト用のアンケートデータ生成。
+
+- 列ごとに numpy の Generator.choice でまとめて生成する（1行ずつ作らない）
+- 選択肢ごとの出現確率（p）と、他の列との相関（follows / corr）を列ごとに指定できる
+- 大きなデータは chunk_rows 行ずつ生成して CSV / Parquet に追記する（全体をメモリに載せない）
+- チャンクごとの乱数は seed から SeedSequence.spawn で作るので、workers 数を変えても同じ結果になる
+
+実行例（Project1 直下で）:
+    python -m src.data.generator                                   # data/input/demo.xlsx（200行）
+    python -m src.data.generator --rows 1000000 --format parquet --workers 4
+    python -m src.data.generator --rows 5000000 --format csv --chunk-rows 200000 --spec my_spec.yaml
+"""
+from __future__ import annotations
+
 import argparse
-import random
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Literal, Optional, Sequence
+
+import numpy as np
 import pandas as pd
 
 AGES = ["10代", "20代", "30代", "40代", "50代", "60代", "70代"]
 GENDERS = ["男性", "女性", "その他"]
 SATISFACTION = [1, 2, 3, 4, 5]
 
-def make_dataset(n: int = 200, seed: int | None = 42) -> pd.DataFrame:
-    random.seed(seed)
-    rows = []
-    for i in range(1, n + 1):
-        rows.append({
-            "回答者ID": f"R{i:04d}",
-            "年代": random.choice(AGES),
-            "性別": random.choice(GENDERS),
-            "満足度": random.choice(SATISFACTION),
-            # 必要なら他の項目も追加
-            "コスパ満足度": random.choice(SATISFACTION),
-            "接客満足度": random.choice(SATISFACTION),
-            "利用頻度": random.choice(["毎日", "週3", "週1", "月数回", "ほとんど使わない"]),
-            "良かった点": random.choice(["店内がきれい", "スタッフが親切", "価格が妥当", "品揃えが豊富"]),
-            "改善してほしい点": random.choice(["価格が高い", "品切れが多い", "待ち時間が長い"]),
-        })
-    return pd.DataFrame(rows)
-
-def main():
+DEFAULT_CHUNK_ROWS = 100_000
+
+OutputFormat = Literal["csv", "parquet", "xlsx"]
+
+
+# ---- 列の分布 ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ColumnDist:
+    """
+    1列分の分布。
+    - p      : values と同じ長さの出現確率（None なら一様）
+    - follows: 相関させる列名（values が同じ列で、この列より前に定義されていること）
+    - corr   : 0〜1。この割合の行は follows の列と同じ値になり、残りは p から独立に選ばれる
+               （p が同じなら2列の相関係数はおよそ corr になる）
+    """
+    name: str
+    values: tuple[Any, ...]
+    p: Optional[tuple[float, ...]] = None
+    follows: Optional[str] = None
+    corr: float = 0.0
+
+    def probabilities(self) -> Optional[np.ndarray]:
+        if self.p is None:
+            return None
+        p = np.asarray(self.p, dtype=float)
+        if len(p) != len(self.values) or (p < 0).any() or p.sum() <= 0:
+            raise ValueError(f"確率の指定が不正です: {self.name}")
+        return p / p.sum()
+
+
+DEFAULT_COLUMNS: tuple[ColumnDist, ...] = (
+    ColumnDist("年代", tuple(AGES), p=(0.08, 0.20, 0.20, 0.18, 0.15, 0.12, 0.07)),
+    ColumnDist("性別", tuple(GENDERS), p=(0.48, 0.48, 0.04)),
+    ColumnDist("満足度", tuple(SATISFACTION), p=(0.05, 0.10, 0.25, 0.35, 0.25)),
+    # 個別の満足度は総合の満足度と相関させる
+    ColumnDist("コスパ満足度", tuple(SATISFACTION), p=(0.08, 0.15, 0.30, 0.30, 0.17), follows="満足度", corr=0.6),
+    ColumnDist("接客満足度", tuple(SATISFACTION), p=(0.04, 0.08, 0.22, 0.38, 0.28), follows="満足度", corr=0.5),
+    ColumnDist("利用頻度", ("毎日", "週3", "週1", "月数回", "ほとんど使わない"), p=(0.10, 0.20, 0.30, 0.25, 0.15)),
+    ColumnDist("良かった点", ("店内がきれい", "スタッフが親切", "価格が妥当", "品揃えが豊富")),
+    ColumnDist("改善してほしい点", ("価格が高い", "品切れが多い", "待ち時間が長い")),
+)
+
+
+def load_spec(path: Path | str) -> tuple[ColumnDist, ...]:
+    """
+    YAML から列の分布を読む。
+    例:
+      columns:
+        - name: 満足度
+          values: [1, 2, 3, 4, 5]
+          p: [0.05, 0.1, 0.25, 0.35, 0.25]
+        - name: 接客満足度
+          values: [1, 2, 3, 4, 5]
+          follows: 満足度
+          corr: 0.5
+    """
+    import yaml
+
+    raw = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+    cols = []
+    for c in raw.get("columns") or []:
+        if "name" not in c or not c.get("values"):
+            raise ValueError(f"name と values は必須です: {c}")
+        cols.append(ColumnDist(
+            name=str(c["name"]),
+            values=tuple(c["values"]),
+            p=tuple(c["p"]) if c.get("p") is not None else None,
+            follows=c.get("follows"),
+            corr=float(c.get("corr", 0.0)),
+        ))
+    return tuple(cols)
+
+
+def _check_columns(columns: Sequence[ColumnDist]) -> None:
+    seen: dict[str, ColumnDist] = {}
+    for c in columns:
+        c.probabilities()
+        if c.follows is not None:
+            base = seen.get(c.follows)
+            if base is None:
+                raise KeyError(f"列が見つかりません: {c.follows}（{c.name} より前に定義してください）")
+            if tuple(base.values) != tuple(c.values):
+                raise ValueError(f"相関させる列と選択肢が一致しません: {c.name} / {c.follows}")
+        if not 0.0 <= c.corr <= 1.0:
+            raise ValueError(f"corr は 0〜1 で指定してください: {c.name}={c.corr}")
+        seen[c.name] = c
+
+
+# ---- 生成 --------------------------------------------------------------------------
+
+def _column_values(c: ColumnDist, codes: np.ndarray) -> Any:
+    """選択肢の番号から列の値を作る（整数の選択肢は int64、それ以外は category）。"""
+    if all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in c.values):
+        return np.asarray(c.values, dtype=np.int64)[codes]
+    return pd.Categorical.from_codes(codes, categories=list(c.values))
+
+
+def generate_chunk(
+    start: int,
+    n: int,
+    rng: np.random.Generator,
+    columns: Sequence[ColumnDist] = DEFAULT_COLUMNS,
+) -> pd.DataFrame:
+    """回答者ID が start+1 から始まる n 行を生成する。"""
+    ids = np.arange(start + 1, start + n + 1)
+    data: dict[str, Any] = {"回答者ID": "R" + pd.Series(ids).astype(str).str.zfill(4)}
+    codes: dict[str, np.ndarray] = {}
+    for c in columns:
+        k = rng.choice(len(c.values), size=n, p=c.probabilities())
+        if c.follows is not None and c.corr > 0:
+            k = np.where(rng.random(n) < c.corr, codes[c.follows], k)
+        codes[c.name] = k
+        data[c.name] = _column_values(c, k)
+    return pd.DataFrame(data)
+
+
+def _chunk_bounds(n: int, chunk_rows: int) -> list[tuple[int, int]]:
+    if chunk_rows <= 0:
+        raise ValueError(f"chunk_rows は1以上で指定してください: {chunk_rows}")
+    return [(s, min(chunk_rows, n - s)) for s in range(0, n, chunk_rows)]
+
+
+def _chunk_task(args: tuple[int, int, np.random.SeedSequence, Sequence[ColumnDist]]) -> pd.DataFrame:
+    start, size, seq, columns = args
+    return generate_chunk(start, size, np.random.default_rng(seq), columns)
+
+
+def iter_chunks(
+    n: int,
+    *,
+    seed: Optional[int] = 42,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: Sequence[ColumnDist] = DEFAULT_COLUMNS,
+    workers: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    n 行を chunk_rows 行ずつ順に返す。workers > 1 ならプロセスプールで先読み生成する
+    （先読みは workers × 2 チャンクまでに抑え、メモリを使いすぎないようにする）。
+    """
+    _check_columns(columns)
+    bounds = _chunk_bounds(n, chunk_rows)
+    seqs = np.random.SeedSequence(seed).spawn(len(bounds))
+    tasks = [(s, size, seq, tuple(columns)) for (s, size), seq in zip(bounds, seqs)]
+
+    if workers <= 1 or len(tasks) <= 1:
+        for t in tasks:
+            yield _chunk_task(t)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as ex:
+        pending: deque[Future] = deque()
+        it = iter(tasks)
+        for t in it:
+            pending.append(ex.submit(_chunk_task, t))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            chunk = pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(ex.submit(_chunk_task, nxt))
+            yield chunk
+
+
+def make_dataset(
+    n: int = 200,
+    seed: int | None = 42,
+    *,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: Sequence[ColumnDist] = DEFAULT_COLUMNS,
+) -> pd.DataFrame:
+    """n 行のデータをメモリ上に作る（大きなデータはファイルに書く write_dataset を使う）。"""
+    if n <= 0:
+        return generate_chunk(0, 0, np.random.default_rng(seed), columns)
+    return pd.concat(list(iter_chunks(n, seed=seed, chunk_rows=chunk_rows, columns=columns)), ignore_index=True)
+
+
+# ---- 出力 --------------------------------------------------------------------------
+
+def _infer_format(path: Path) -> OutputFormat:
+    suffix = path.suffix.lower()
+    if suffix in (".csv", ".parquet", ".xlsx"):
+        return suffix[1:]  # type: ignore[return-value]
+    raise ValueError(f"未対応の出力形式です: {suffix}")
+
+
+def write_dataset(
+    path: Path | str,
+    n: int,
+    *,
+    fmt: Optional[OutputFormat] = None,
+    seed: Optional[int] = 42,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: Sequence[ColumnDist] = DEFAULT_COLUMNS,
+    workers: int = 1,
+) -> Path:
+    """
+    n 行を生成して path に書く。CSV / Parquet はチャンクごとに追記するので、メモリ使用量は chunk_rows 分で済む。
+    xlsx は全体を作ってから書く（小さなデモ用）。一時ファイルに書いてから置き換える。
+    n は1以上（0行だと CSV のヘッダ・Parquet のスキーマを決められないため）。
+    """
+    if n < 1:
+        raise ValueError(f"行数は1以上で指定してください: {n}")
+    path = Path(path)
+    fmt = fmt or _infer_format(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+    chunks = iter_chunks(n, seed=seed, chunk_rows=chunk_rows, columns=columns, workers=workers)
+    try:
+        if fmt == "csv":
+            # BOM 付き UTF-8（Excel でそのまま開ける・loader の判定でも最初に試される）
+            with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+                for i, chunk in enumerate(chunks):
+                    chunk.to_csv(f, index=False, header=(i == 0))
+        elif fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            writer = None
+            try:
+                for chunk in chunks:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp, table.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+        elif fmt == "xlsx":
+            pd.concat(list(chunks), ignore_index=True).to_excel(tmp, index=False, engine="openpyxl")
+        else:
+            raise ValueError(f"未対応の出力形式です: {fmt}")
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="デモ用アンケートデータ生成")
     ap.add_argument("--rows", type=int, default=200)
-    ap.add_argument("--output", type=Path, default=Path("data/input/demo.xlsx"))
+    ap.add_argument("--output", type=Path, default=None, help="出力先（既定：data/input/demo.<format>）")
+    ap.add_argument("--format", choices=["xlsx", "csv", "parquet"], default=None,
+                    help="出力形式（省略時は --output の拡張子、それも無ければ xlsx）")
+    ap.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="一度に生成・書き込みする行数")
+    ap.add_argument("--workers", type=int, default=1, help="生成に使うプロセス数")
+    ap.add_argument("--spec", type=Path, default=None, help="列の分布を定義した YAML")
     ap.add_argument("--seed", type=int, default=42)
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
-    df = make_dataset(args.rows, args.seed)
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    df.to_excel(args.output, index=False, engine="openpyxl")
-    print("generated", args.output)
+    fmt = args.format or (_infer_format(args.output) if args.output else "xlsx")
+    output = args.output or Path(f"data/input/demo.{fmt}")
+    columns = load_spec(args.spec) if args.spec else DEFAULT_COLUMNS
+    write_dataset(
+        output, args.rows, fmt=fmt, seed=args.seed, chunk_rows=args.chunk_rows,
+        columns=columns, workers=args.workers,
+    )
+    print("generated", output)
 
 if __name__ == "__main__":
     main()
-
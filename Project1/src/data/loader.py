@@ -1,20 +1,41 @@
 # src/data/loader.py
 from __future__ import annotations
+import codecs
 from pathlib import Path
 from io import BytesIO
-from typing import Iterable, Literal
+from typing import Iterable, Iterator, Literal, Sequence
+import numpy as np
 import pandas as pd
 
+from .cache import cached_load, file_digest, source_id
+from .schema import TableSchema, apply_schema
+from .xlsx_reader import open_sheet_rows
+from ..utils.profiling import timed
+
 
 ExcelSuffix = Literal[".xlsx", ".xlsm", ".xls"]
 CsvSuffix = Literal[".csv"]
 SupportedSuffix = ExcelSuffix | CsvSuffix
 
+#Excel の読み込み方式
+# - "stream": シート XML を直接パースして行を順に読み、セルオブジェクトを作らない（既定・高速）
+# - "pandas": pd.read_excel（openpyxl 通常モード）。.xls など stream で読めない場合用
+ExcelEngine = Literal["stream", "pandas"]
+
 #CSVの欠損値として扱う文字
 DEFAULT_NA_VALUES: list[str] = [
     "", "NA", "N/A", "NaN", "null", "NULL", "-", "--", "無回答"
 ]
 
+#CSV のエンコーディング候補（先頭から順に判定）
+CSV_ENCODINGS: tuple[str, ...] = ("utf-8-sig", "cp932")
+
+#エンコーディング判定に使う先頭バイト数
+SNIFF_BYTES = 64 * 1024
+
+#iter_table_chunks の既定チャンク行数
+DEFAULT_CHUNKSIZE = 100_000
+
 def _ensure_path(p: Path | str) -> Path:
     path = Path(p)
     if not path.exists():
@@ -22,20 +43,133 @@ def _ensure_path(p: Path | str) -> Path:
     return path
 
 
+def _excel_header_names(raw: Sequence[object]) -> list[str]:
+    """見出し行から列名を作る（pd.read_excel と同じく空欄は Unnamed: i、重複は .1, .2 を付ける）。"""
+    names: list[str] = []
+    seen: dict[str, int] = {}
+    for i, v in enumerate(raw):
+        name = f"Unnamed: {i}" if v is None else str(v)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def _blank_rows_trimmed(rows: Iterable[tuple]) -> Iterator[tuple | None]:
+    """空行は None として流し、末尾に続く空行だけは捨てる（pd.read_excel と同じ扱い）。"""
+    pending = 0
+    for row in rows:
+        if all(v is None for v in row):
+            pending += 1
+            continue
+        for _ in range(pending):
+            yield None
+        pending = 0
+        yield row
+
+
+def _typed_column(values: np.ndarray) -> pd.Series:
+    """object 配列を値に合った dtype（int64/float64/datetime64 など）の Series にする。"""
+    s = pd.Series(values, dtype=object).infer_objects()
+    if s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in (
+        "integer", "floating", "mixed-integer-float", "decimal"
+    ):
+        s = pd.to_numeric(s)
+    return s
+
+
+def _excel_frame(columns: list[str], buffers: list[np.ndarray], n: int, start: int) -> pd.DataFrame:
+    data = {c: _typed_column(b[:n]).to_numpy() for c, b in zip(columns, buffers)}
+    return pd.DataFrame(data, columns=columns, index=pd.RangeIndex(start, start + n))
+
+
+def _iter_excel_frames(
+    source: Path | BytesIO,
+    *,
+    sheet: int | str | None = 0,
+    header: int = 0,
+    na_values: Iterable[str] = DEFAULT_NA_VALUES,
+    usecols: Sequence[str] | None = None,
+    chunksize: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    指定シートの XML を直接パースして行を順に読み、DataFrame を返す（他のシートは読まない）。
+    - セルオブジェクトを作らず、必要な列の値だけを事前確保した配列に詰める
+    - chunksize 未指定ならシート全体を1つの DataFrame で、指定時は chunksize 行ずつ返す
+    """
+    with open_sheet_rows(source, sheet) as (max_row, rows):
+        for _ in range(header):
+            next(rows, None)
+        names = _excel_header_names(next(rows, ()))
+
+        if usecols is None:
+            picks = list(range(len(names)))
+        else:
+            normalized = [_normalize_name(n) for n in names]
+            missing = [c for c in usecols if _normalize_name(c) not in normalized]
+            if missing:
+                raise KeyError(f"列が見つかりません: {', '.join(map(str, missing))}")
+            wanted = {_normalize_name(c) for c in usecols}
+            picks = [i for i, n in enumerate(normalized) if n in wanted]
+        columns = [names[i] for i in picks]
+        na = frozenset(na_values)
+
+        # 行数が分かれば一括確保、分からなければ倍々で拡張する
+        capacity = chunksize or max((max_row or 0) - header - 1, 1)
+        buffers = [np.full(capacity, np.nan, dtype=object) for _ in picks]
+        n = 0
+        start = 0
+        for row in _blank_rows_trimmed(rows):
+            if n == capacity:
+                if chunksize:
+                    yield _excel_frame(columns, buffers, n, start)
+                    start += n
+                    n = 0
+                    buffers = [np.full(capacity, np.nan, dtype=object) for _ in picks]
+                else:
+                    grown = [np.full(capacity, np.nan, dtype=object) for _ in picks]
+                    buffers = [np.concatenate([b, g]) for b, g in zip(buffers, grown)]
+                    capacity *= 2
+            if row is not None:
+                width = len(row)
+                for b, i in zip(buffers, picks):
+                    if i < width:
+                        v = row[i]
+                        if v is not None and not (isinstance(v, str) and v in na):
+                            b[n] = v
+            n += 1
+        if n or start == 0:
+            yield _excel_frame(columns, buffers, n, start)
+
+
 def _read_excel(
     source: Path | BytesIO,
     sheet: int | str | None = 0,
     header: int = 0,
     na_values: Iterable[str] = DEFAULT_NA_VALUES,
+    usecols: Sequence[str] | None = None,
+    engine: ExcelEngine = "stream",
 ) -> pd.DataFrame:
     """Excel 読み込み（.xlsx/.xlsm/.xls）"""
     try:
+        if engine == "stream":
+            frames = _iter_excel_frames(
+                source, sheet=sheet, header=header, na_values=na_values, usecols=usecols
+            )
+            try:
+                return next(frames)
+            finally:
+                frames.close()
+
         df = pd.read_excel(
             source,
             sheet_name=sheet,
             header=header,
             engine="openpyxl",  #xlsの場合はxlrdが必要だが、一般には xlsx/xlsm を想定
             na_values=list(na_values),
+            usecols=list(usecols) if usecols is not None else None,
         )
         
         #sheet_name 指定で単一シートなら DataFrame、複数なら dict になる
@@ -45,32 +179,144 @@ def _read_excel(
             first_key = next(iter(df))
             df = df[first_key]
         return df
+    except KeyError:
+        raise  # usecols の列不足は CSV と同じく KeyError のまま伝える
     except Exception as e:
         raise ValueError(f"Excel 読み込みに失敗しました: {e}") from e
 
 
+def _peek_bytes(source: Path | BytesIO, size: int = SNIFF_BYTES) -> bytes:
+    """先頭 size バイトを読む。BytesIO の読み取り位置は元に戻す。"""
+    if isinstance(source, BytesIO):
+        pos = source.tell()
+        head = source.read(size)
+        source.seek(pos)
+        return head
+    with open(source, "rb") as f:
+        return f.read(size)
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """
+    先頭バイト列から CSV のエンコーディングを推定する。
+    CSV_ENCODINGS の順にデコードを試し、最初に成功したものを返す。
+    末尾で途切れたマルチバイト文字は誤判定しないよう、増分デコーダで判定する。
+    """
+    for enc in CSV_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(enc)()
+        try:
+            decoder.decode(prefix, final=False)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return CSV_ENCODINGS[-1]
+
+
+def _usecols_matcher(usecols: Sequence[str] | None):
+    """read_csv の usecols 用：正規化後の列名で比較する callable を返す。"""
+    if usecols is None:
+        return None
+    wanted = {_normalize_name(c) for c in usecols}
+    return lambda name: _normalize_name(name) in wanted
+
+
+def _check_usecols(columns: Iterable[object], usecols: Sequence[str] | None) -> None:
+    if usecols is None:
+        return
+    found = {_normalize_name(c) for c in columns}
+    missing = [c for c in usecols if _normalize_name(c) not in found]
+    if missing:
+        raise KeyError(f"列が見つかりません: {', '.join(map(str, missing))}")
+
+
 def _read_csv_with_fallback(
     source: Path | BytesIO,
     header: int = 0,
     na_values: Iterable[str] = DEFAULT_NA_VALUES,
     encoding: str | None = None,
+    usecols: Sequence[str] | None = None,
+    dtype: dict | None = None,
 ) -> pd.DataFrame:
-    """CSV を UTF-8-SIG → CP932(Shift_JIS) の順でフォールバックして読む"""
-    encodings_to_try = [encoding] if encoding else ["utf-8-sig", "cp932"]
+    """
+    CSV を読む。encoding 未指定なら先頭バイトから判定したエンコーディングで1回だけパースし、
+    先頭以降で判定が外れた場合のみ残りの候補（UTF-8-SIG / CP932）でフォールバックする。
+    """
+    if encoding:
+        encodings_to_try = [encoding]
+    else:
+        sniffed = sniff_encoding(_peek_bytes(source))
+        encodings_to_try = [sniffed] + [e for e in CSV_ENCODINGS if e != sniffed]
+    start = source.tell() if isinstance(source, BytesIO) else 0
     last_error: Exception | None = None
     for enc in encodings_to_try:
+        if isinstance(source, BytesIO):
+            source.seek(start)
         try:
-            return pd.read_csv(
+            df = pd.read_csv(
                 source,
                 header=header,
                 encoding=enc,
                 na_values=list(na_values),
+                usecols=_usecols_matcher(usecols),
+                dtype=dtype,
             )
-        except Exception as e:
+            break
+        except UnicodeDecodeError as e:
+            # エンコーディングの判定違いだけ次の候補で読み直す（それ以外の失敗はそのまま伝える）
             last_error = e
-    raise ValueError(f"CSV 読み込みに失敗しました（encoding={encodings_to_try}）: {last_error}") from last_error
+    else:
+        raise ValueError(f"CSV 読み込みに失敗しました（encoding={encodings_to_try}）: {last_error}") from last_error
+    _check_usecols(df.columns, usecols)
+    return df
+
+
+def _resolve_schema(
+    schema: TableSchema | None,
+    usecols: Sequence[str] | None,
+    na_values: Iterable[str],
+) -> tuple[Sequence[str] | None, list[str], dict | None]:
+    """
+    スキーマから (usecols, na_values, read_csv 用 dtype) を決める。引数の指定が優先。
+    dtype は category / 文字列型だけ（数値型は apply_schema で欠損を許して変換する）。
+    """
+    na = list(na_values)
+    if schema is None:
+        return usecols, na, None
+    if usecols is None:
+        usecols = schema.usecols
+    na += [v for v in schema.na_values if v not in na]
+    return usecols, na, schema.read_dtypes() or None
 
 
+def _read_source(
+    source: Path | BytesIO,
+    suffix: str,
+    *,
+    sheet: int | str | None,
+    header: int,
+    na_values: Iterable[str],
+    encoding: str | None,
+    usecols: Sequence[str] | None,
+    excel_engine: ExcelEngine,
+    schema: TableSchema | None,
+) -> pd.DataFrame:
+    usecols, na, dtype = _resolve_schema(schema, usecols, na_values)
+
+    if suffix in (".xlsx", ".xlsm", ".xls"):
+        engine: ExcelEngine = "pandas" if suffix == ".xls" else excel_engine
+        df = _read_excel(source, sheet=sheet, header=header, na_values=na, usecols=usecols, engine=engine)
+    elif suffix == ".csv":
+        # CSV は dtype 指定で読み込み時点からコンパクトな型にする
+        df = _read_csv_with_fallback(
+            source, header=header, na_values=na, encoding=encoding, usecols=usecols, dtype=dtype
+        )
+    else:
+        raise ValueError(f"未対応の拡張子です: {suffix}")
+
+    return apply_schema(df, schema) if schema is not None else df
+
+
+@timed(rows="result")
 def load_table(
     path: Path | str,
     *,
@@ -78,24 +324,48 @@ def load_table(
     header: int = 0,
     na_values: Iterable[str] = DEFAULT_NA_VALUES,
     encoding: str | None = None,
+    usecols: Sequence[str] | None = None,
+    excel_engine: ExcelEngine = "stream",
+    schema: TableSchema | None = None,
+    cache: bool = False,
 ) -> pd.DataFrame:
     """
     ファイルパスから DataFrame を読み込む。
-    - Excel: sheet / header をサポート
+    - Excel: sheet / header をサポート。既定は行ストリーミング（excel_engine="stream"）
     - CSV  : encoding フォールバック（utf-8-sig → cp932）
+    - usecols を指定すると、その列だけを読む（列名は正規化後の名前で比較）
+    - schema（src.data.schema.load_schema() など）を渡すと、スキーマの列だけを指定の型で読む
+      （category の categories は集計時の表示順にもなる）
+    - cache=True で data/intermediate に列指向キャッシュを保存し、次回以降はそれを読む
+      （元ファイルの内容が変わると自動で読み直す。文字列のカテゴリ列は category 型になる）
     """
     p = _ensure_path(path)
     suffix = p.suffix.lower()
 
-    if suffix in (".xlsx", ".xlsm", ".xls"):
-        return _read_excel(p, sheet=sheet, header=header, na_values=na_values)
-
-    if suffix == ".csv":
-        return _read_csv_with_fallback(p, header=header, na_values=na_values, encoding=encoding)
+    if cache:
+        options = {
+            "suffix": suffix, "sheet": sheet, "header": header,
+            "na_values": list(na_values), "encoding": encoding,
+            "usecols": list(usecols) if usecols is not None else None,
+            "excel_engine": excel_engine,
+            "schema": schema.as_options() if schema is not None else None,
+        }
+        return cached_load(
+            file_digest(p), source_id(p), options,
+            lambda: load_table(
+                p, sheet=sheet, header=header, na_values=na_values, encoding=encoding,
+                usecols=usecols, excel_engine=excel_engine, schema=schema,
+            ),
+            name=p.stem,
+        )
 
-    raise ValueError(f"未対応の拡張子です: {suffix}")
+    return _read_source(
+        p, suffix, sheet=sheet, header=header, na_values=na_values, encoding=encoding,
+        usecols=usecols, excel_engine=excel_engine, schema=schema,
+    )
 
 
+@timed(rows="result")
 def load_table_from_bytes(
     data: bytes,
     *,
@@ -104,22 +374,24 @@ def load_table_from_bytes(
     header: int = 0,
     na_values: Iterable[str] = DEFAULT_NA_VALUES,
     encoding: str | None = None,
+    usecols: Sequence[str] | None = None,
+    excel_engine: ExcelEngine = "stream",
+    schema: TableSchema | None = None,
 ) -> pd.DataFrame:
     """
     バイト列（Streamlit の file_uploader など）から DataFrame を読み込む。
     suffix でファイル種別（.xlsx/.csv など）を指定する。
     """
-    bio = BytesIO(data)
-    suffix = suffix.lower()  # type: ignore[assignment]
-
-    if suffix in (".xlsx", ".xlsm", ".xls"):
-        return _read_excel(bio, sheet=sheet, header=header, na_values=na_values)
+    # BytesIO は read_csv でもそのまま読める
+    return _read_source(
+        BytesIO(data), suffix.lower(), sheet=sheet, header=header, na_values=na_values,
+        encoding=encoding, usecols=usecols, excel_engine=excel_engine, schema=schema,
+    )
 
-    if suffix == ".csv":
-        # BytesIO は read_csv でもそのまま読める
-        return _read_csv_with_fallback(bio, header=header, na_values=na_values, encoding=encoding)
 
-    raise ValueError(f"未対応の拡張子です: {suffix}")
+def _normalize_name(name: object) -> str:
+    # 前後空白除去 + 全角空白を半角へ
+    return str(name).strip().replace("\u3000", " ")
 
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -127,10 +399,77 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     列名の軽微な正規化（前後空白の除去・全角空白→半角など）
     日本語列名の保持を前提に、破壊的な正規化は行わない。
     """
-    def _norm(s: str) -> str:
-        # 前後空白除去 + 全角空白を半角へ
-        return s.strip().replace("\u3000", " ")
-
     df = df.copy()
-    df.columns = [_norm(str(c)) for c in df.columns]
-    return df
\ No newline at end of file
+    df.columns = [_normalize_name(c) for c in df.columns]
+    return df
+
+
+def iter_table_chunks(
+    path: Path | str,
+    *,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sheet: int | str | None = 0,
+    header: int = 0,
+    na_values: Iterable[str] = DEFAULT_NA_VALUES,
+    encoding: str | None = None,
+    usecols: Sequence[str] | None = None,
+    schema: TableSchema | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    巨大な CSV を chunksize 行ずつ読み、列名を正規化した DataFrame を順に返すジェネレータ。
+    - エンコーディングは先頭バイトから1回だけ判定する（ファイル全体の再パースはしない）
+    - メモリ使用量はチャンクサイズで上限が決まる
+    - Excel（.xlsx/.xlsm）も行ストリーミングで chunksize 行ずつ返す（.xls は全体を1チャンク）
+    - schema を渡すと全チャンクが同じ型（同じカテゴリ）になる
+    返り値は src.processing.aggregations の各関数にそのまま渡せる。
+    """
+    if chunksize <= 0:
+        raise ValueError(f"chunksize は 1 以上を指定してください: {chunksize}")
+    p = _ensure_path(path)
+    suffix = p.suffix.lower()
+    usecols, na, dtype = _resolve_schema(schema, usecols, na_values)
+
+    if suffix == ".xls":
+        df = normalize_columns(_read_excel(
+            p, sheet=sheet, header=header, na_values=na, usecols=usecols, engine="pandas"
+        ))
+        yield apply_schema(df, schema) if schema is not None else df
+        return
+
+    if suffix in (".xlsx", ".xlsm"):
+        columns: list[str] | None = None
+        for chunk in _iter_excel_frames(
+            p, sheet=sheet, header=header, na_values=na, usecols=usecols, chunksize=chunksize
+        ):
+            if columns is None:
+                columns = [_normalize_name(c) for c in chunk.columns]
+            chunk.columns = columns
+            yield apply_schema(chunk, schema) if schema is not None else chunk
+        return
+
+    if suffix != ".csv":
+        raise ValueError(f"未対応の拡張子です: {suffix}")
+
+    enc = encoding or sniff_encoding(_peek_bytes(p))
+    columns = None
+    try:
+        with pd.read_csv(
+            p,
+            header=header,
+            encoding=enc,
+            na_values=na,
+            usecols=_usecols_matcher(usecols),
+            dtype=dtype,
+            chunksize=chunksize,
+        ) as reader:
+            for chunk in reader:
+                # 列名の正規化は初回だけ計算し、以降のチャンクは付け替えのみ（コピーしない）
+                if columns is None:
+                    _check_usecols(chunk.columns, usecols)
+                    columns = [_normalize_name(c) for c in chunk.columns]
+                chunk.columns = columns
+                yield apply_schema(chunk, schema) if schema is not None else chunk
+    except UnicodeDecodeError as e:
+        raise ValueError(
+            f"CSV 読み込みに失敗しました（encoding={enc}）。encoding を明示して再実行してください: {e}"
+        ) from e
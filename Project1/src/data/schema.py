@@ -0,0 +1,156 @@
+# src/data/schema.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import pandas as pd
+
+from ..utils.paths import resource_path
+
+
+# ---- 列スキーマ（configs/schema.yaml） --------------------------------------------
+#
+# 読み込む列・型・欠損扱いの文字を宣言しておき、ローダーは
+#   - 必要な列だけを読む（usecols）
+#   - 読み込み時点でコンパクトな型にする（category / Int8 など）
+# を行う。category の categories は「表示順」として集計関数にもそのまま使われる。
+#
+# 例（configs/schema.yaml）:
+#   na_values: ["未回答"]
+#   columns:
+#     - name: 年代
+#       dtype: category
+#       categories: [10代, 20代, 30代]
+#     - name: 満足度
+#       dtype: int8
+
+SCHEMA_FILE = Path("configs") / "schema.yaml"
+
+# 整数型は欠損を含められるよう pandas の nullable 整数型で読む
+_NULLABLE_INT = {
+    "int8": "Int8", "int16": "Int16", "int32": "Int32", "int64": "Int64",
+    "uint8": "UInt8", "uint16": "UInt16", "uint32": "UInt32", "uint64": "UInt64",
+}
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """1列分の定義。"""
+    name: str
+    dtype: Optional[str] = None
+    categories: Optional[tuple[Any, ...]] = None
+    ordered: bool = True
+
+    def pandas_dtype(self) -> Any:
+        """読み込み時に使う pandas の dtype（未指定なら None＝推論に任せる）。"""
+        if self.dtype is None:
+            return None
+        if self.dtype == "category":
+            if self.categories is None:
+                return "category"
+            return pd.CategoricalDtype(categories=list(self.categories), ordered=self.ordered)
+        return _NULLABLE_INT.get(self.dtype.lower(), self.dtype)
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """読み込む列の一覧と、追加の欠損値トークン。"""
+    columns: tuple[ColumnSpec, ...] = ()
+    na_values: tuple[str, ...] = ()
+
+    @property
+    def usecols(self) -> Optional[list[str]]:
+        """読み込む列名（列の定義が無ければ None＝全列）。"""
+        return [c.name for c in self.columns] or None
+
+    def dtypes(self) -> dict[str, Any]:
+        """{列名: dtype}（型が指定されている列のみ）。"""
+        return {c.name: dt for c in self.columns if (dt := c.pandas_dtype()) is not None}
+
+    def read_dtypes(self) -> dict[str, Any]:
+        """
+        read_csv の dtype 引数に渡す {列名: dtype}（category と文字列型だけ）。
+        数値型は read_csv で指定すると1セルでも数値でないと読み込み全体が失敗するため、
+        読み込み後に apply_schema で変換する（数値でない値は欠損。Excel と同じ扱い）。
+        """
+        return {
+            name: dt for name, dt in self.dtypes().items()
+            if isinstance(dt, pd.CategoricalDtype) or dt in ("category", "string", "str", "object")
+        }
+
+    def category_orders(self) -> dict[str, list[Any]]:
+        """カテゴリ順が定義されている列の {列名: 表示順}。"""
+        return {c.name: list(c.categories) for c in self.columns if c.categories is not None}
+
+    def as_options(self) -> dict[str, Any]:
+        """キャッシュキーなどに使う、JSON 化できる表現。"""
+        return {
+            "columns": [
+                [c.name, c.dtype, list(c.categories) if c.categories is not None else None, c.ordered]
+                for c in self.columns
+            ],
+            "na_values": list(self.na_values),
+        }
+
+
+def schema_from_dict(data: Mapping[str, Any]) -> TableSchema:
+    """YAML などから読んだ dict を TableSchema にする。"""
+    columns = []
+    for item in data.get("columns") or []:
+        if isinstance(item, str):
+            columns.append(ColumnSpec(item))
+            continue
+        if "name" not in item:
+            raise ValueError(f"スキーマの列定義に name がありません: {item}")
+        cats = item.get("categories")
+        columns.append(ColumnSpec(
+            name=str(item["name"]),
+            dtype=item.get("dtype"),
+            categories=tuple(cats) if cats is not None else None,
+            ordered=bool(item.get("ordered", True)),
+        ))
+    return TableSchema(
+        columns=tuple(columns),
+        na_values=tuple(str(v) for v in data.get("na_values") or []),
+    )
+
+
+def load_schema(path: Optional[Path | str] = None) -> TableSchema:
+    """
+    スキーマファイル（既定：configs/schema.yaml）を読み込む。
+    ファイルが無い場合は空のスキーマ（全列・型推論）を返す。
+    """
+    import yaml  # スキーマを使う時だけ読み込む
+
+    p = Path(path) if path is not None else resource_path(SCHEMA_FILE)
+    if not p.exists():
+        return TableSchema()
+    with open(p, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return schema_from_dict(data)
+
+
+def apply_schema(df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """
+    読み込み済みの DataFrame にスキーマの型を適用する（Excel など dtype 指定で読めない場合用）。
+    既に同じ型の列はそのまま（コピーしない）。
+    - category：categories に無い値は欠損になる
+    - 整数：数値に変換できない値は欠損になる
+    """
+    out = df.copy(deep=False)
+    for spec in schema.columns:
+        dtype = spec.pandas_dtype()
+        if dtype is None or spec.name not in out.columns:
+            continue
+        s = out[spec.name]
+        if s.dtype == dtype:
+            continue
+        try:
+            if spec.dtype and spec.dtype.lower() in _NULLABLE_INT:
+                s = pd.to_numeric(s, errors="coerce")
+            out[spec.name] = s.astype(dtype)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"列 {spec.name} を {spec.dtype} に変換できません: {e}") from e
+    return out
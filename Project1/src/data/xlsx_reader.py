@@ -0,0 +1,198 @@
+# src/data/xlsx_reader.py
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import Iterator, Optional
+from xml.etree.ElementTree import iterparse, parse
+
+
+# ---- xlsx シート XML の直接パーサ -------------------------------------------------
+#
+# openpyxl は read_only モードでもセルごとにオブジェクト変換（インライン文字列のリッチテキスト解析など）
+# を行うため、10万行を超えるシートでは読み込みの大半がそこに費やされる。
+# ここでは zip 内のシート XML を expat（iterparse）で直接読み、
+# openpyxl の iter_rows(values_only=True) と同じ値のタプルを1行ずつ返す。
+# 日付判定・Excel シリアル値の変換だけは openpyxl のヘルパを使う。
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_DIMENSION = re.compile(rb'<(?:\w+:)?dimension ref="(?:[A-Z]+\d+:)?[A-Z]+(\d+)"')
+
+# 列記号（A, B, ..., AA, ...）→ 0 始まりの列番号
+_COL_INDEX: dict[str, int] = {}
+
+
+def _col_index(ref: str) -> int:
+    letters = ref.rstrip("0123456789")
+    idx = _COL_INDEX.get(letters)
+    if idx is None:
+        idx = 0
+        for ch in letters:
+            idx = idx * 26 + (ord(ch) - 64)
+        idx -= 1
+        _COL_INDEX[letters] = idx
+    return idx
+
+
+def _text(el) -> str:
+    """<si> / <is> 要素の文字列。ふりがな（rPh）は含めない。"""
+    parts: list[str] = []
+    for child in el:
+        if child.tag == _NS_MAIN + "t":
+            parts.append(child.text or "")
+        elif child.tag == _NS_MAIN + "r":
+            for t in child.iter(_NS_MAIN + "t"):
+                parts.append(t.text or "")
+    return "".join(parts)
+
+
+def _sheet_member(zf: zipfile.ZipFile, sheet: int | str | None) -> str:
+    """シート番号・シート名から zip 内のシート XML のパスを求める。"""
+    wb = parse(zf.open("xl/workbook.xml")).getroot()
+    sheets = wb.findall(f"{_NS_MAIN}sheets/{_NS_MAIN}sheet")
+    if sheet is None:
+        sheet = 0
+    if isinstance(sheet, int):
+        target = sheets[sheet]
+    else:
+        matches = [s for s in sheets if s.get("name") == sheet]
+        if not matches:
+            raise KeyError(f"シートが見つかりません: {sheet}")
+        target = matches[0]
+    rid = target.get(f"{_NS_REL}id")
+    rels = parse(zf.open("xl/_rels/workbook.xml.rels")).getroot()
+    for rel in rels.iter(f"{_NS_PKG_REL}Relationship"):
+        if rel.get("Id") == rid:
+            path = rel.get("Target", "")
+            return path.lstrip("/") if path.startswith("/") else posixpath.normpath(posixpath.join("xl", path))
+    raise KeyError(f"シートの参照が見つかりません: {sheet}")
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    out: list[str] = []
+    for _, el in iterparse(zf.open("xl/sharedStrings.xml"), events=("end",)):
+        if el.tag == _NS_MAIN + "si":
+            out.append(_text(el))
+            el.clear()
+    return out
+
+
+def _date_styles(zf: zipfile.ZipFile) -> frozenset[int]:
+    """日付書式が設定されたセルスタイル（cellXfs の番号）の集合。"""
+    from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+
+    if "xl/styles.xml" not in zf.namelist():
+        return frozenset()
+    root = parse(zf.open("xl/styles.xml")).getroot()
+    formats = dict(BUILTIN_FORMATS)
+    for nf in root.iter(f"{_NS_MAIN}numFmt"):
+        formats[int(nf.get("numFmtId", 0))] = nf.get("formatCode", "")
+    xfs = root.find(f"{_NS_MAIN}cellXfs")
+    if xfs is None:
+        return frozenset()
+    return frozenset(
+        i for i, xf in enumerate(xfs.findall(f"{_NS_MAIN}xf"))
+        if is_date_format(formats.get(int(xf.get("numFmtId", 0)), ""))
+    )
+
+
+def _epoch(zf: zipfile.ZipFile):
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+    pr = parse(zf.open("xl/workbook.xml")).getroot().find(f"{_NS_MAIN}workbookPr")
+    flag = pr.get("date1904", "0") if pr is not None else "0"
+    return CALENDAR_MAC_1904 if flag.lower() in ("1", "true") else CALENDAR_WINDOWS_1900
+
+
+def _iter_rows(
+    member,
+    shared: list[str],
+    date_styles: frozenset[int],
+    epoch,
+) -> Iterator[tuple]:
+    from openpyxl.utils.datetime import from_excel
+
+    tag_row = _NS_MAIN + "row"
+    tag_c = _NS_MAIN + "c"
+    tag_v = _NS_MAIN + "v"
+    tag_is = _NS_MAIN + "is"
+
+    tag_sheet_data = _NS_MAIN + "sheetData"
+
+    sheet_data = None
+    expected = 1
+    for event, row in iterparse(member, events=("start", "end")):
+        if event == "start":
+            if row.tag == tag_sheet_data:
+                sheet_data = row
+            continue
+        if row.tag != tag_row:
+            continue
+        r = row.get("r")
+        if r is not None:
+            # 行が省略されている（空行）場合は空タプルで埋める
+            for _ in range(int(r) - expected):
+                yield ()
+            expected = int(r)
+        expected += 1
+
+        values: list = []
+        for pos, c in enumerate(row.iter(tag_c)):
+            ref = c.get("r")
+            idx = _col_index(ref) if ref else pos
+            t = c.get("t", "n")
+            if t == "inlineStr":
+                is_ = c.find(tag_is)
+                value = _text(is_) if is_ is not None else None
+            else:
+                v = c.findtext(tag_v)
+                if not v:  # 値なし（計算結果が保存されていない数式など）
+                    value = None
+                elif t == "s":
+                    value = shared[int(v)]
+                elif t == "n":
+                    value = float(v) if ("." in v or "E" in v or "e" in v) else int(v)
+                    s = c.get("s")
+                    if s is not None and int(s) in date_styles:
+                        value = from_excel(value, epoch)
+                elif t == "b":
+                    value = v == "1"
+                else:  # str（数式の文字列結果）/ e（エラー値）/ d（ISO 日付）
+                    value = v
+            if idx >= len(values):
+                values.extend([None] * (idx - len(values) + 1))
+            values[idx] = value
+        # 処理済みの行は親から外し、ツリーに行が溜まらないようにする（メモリを行数に比例させない）
+        if sheet_data is not None:
+            sheet_data.remove(row)
+        yield tuple(values)
+
+
+@contextmanager
+def open_sheet_rows(
+    source: Path | BytesIO,
+    sheet: int | str | None = 0,
+) -> Iterator[tuple[Optional[int], Iterator[tuple]]]:
+    """
+    xlsx/xlsm の指定シートを開き、(行数の見込み, 行タプルのイテレータ) を返すコンテキストマネージャ。
+    行数はシートの dimension 要素から取り、書かれていなければ None。
+    """
+    with zipfile.ZipFile(source) as zf:
+        member_name = _sheet_member(zf, sheet)
+        with zf.open(member_name) as head:
+            m = _DIMENSION.search(head.read(4096))
+        max_row = int(m.group(1)) if m else None
+        shared = _shared_strings(zf)
+        date_styles = _date_styles(zf)
+        epoch = _epoch(zf)
+        with zf.open(member_name) as member:
+            yield max_row, _iter_rows(member, shared, date_styles, epoch)
@@ -1,12 +1,52 @@
 # src/processing/aggregations.py
 from __future__ import annotations
 
-from typing import Iterable, Sequence, Mapping, Literal, Optional
-import re
-from collections import Counter
+import itertools
+from typing import Any, Iterable, Sequence, Mapping, Literal, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
 
+import numpy as np
 import pandas as pd
 
+from .partials import CountState, CrosstabState, LikertState, NPSState, dtype_order
+from .terms import DEFAULT_BATCH_SIZE, Tokenizer, count_terms_in, most_common, most_common_by_group
+from ..utils.profiling import timed
+
+
+# 集計関数の入力：DataFrame か、iter_table_chunks() などが返す DataFrame のチャンク列
+TableLike = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+# ---- 入力の正規化（チャンク入力対応） --------------------------------------------
+
+def _as_frame(data: TableLike, cols: Sequence[str]) -> pd.DataFrame:
+    """
+    集計関数の入力を DataFrame にそろえる。
+    - DataFrame はそのまま返す（コピーしない）
+    - チャンク列の場合は必要な列 cols だけを取り出して連結する
+      （不要な列を保持しないため、全列を読み込むよりメモリが小さい）
+    チャンク列はイテレータの場合1回しか消費できない点に注意。
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    parts: list[pd.DataFrame] = []
+    for chunk in data:
+        missing = [c for c in cols if c not in chunk.columns]
+        if missing:
+            raise KeyError(f"列が見つかりません: {', '.join(missing)}")
+        parts.append(chunk[list(cols)])
+    if not parts:
+        return pd.DataFrame(columns=list(cols))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _iter_chunks(data: TableLike) -> Iterable[pd.DataFrame]:
+    """DataFrame は1チャンクとして、チャンク列はそのまま返す。"""
+    if isinstance(data, pd.DataFrame):
+        return (data,)
+    return data
+
 
 # ---- ユーティリティ（カテゴリ順の制御） --------------------------------------
 
@@ -17,6 +57,7 @@ def apply_category_order(
     """
     カテゴリ列に「表示順」を適用する。
     order を指定しない場合は元のユニーク順（value_counts()とは独立）。
+    スキーマで categories を定義した列（順序付き category 型）は、その順序がそのまま使われる。
     """
     s = ser.copy()
     if order is None:
@@ -27,8 +68,9 @@ def apply_category_order(
 
 # ---- 単変量の基本集計 -----------------------------------------------------------
 
+@timed(rows="input")
 def count_by(
-    df: pd.DataFrame,
+    df: TableLike,
     col: str,
     *,
     dropna: bool = True,
@@ -37,23 +79,20 @@ def count_by(
     """
     カテゴリ列の件数を返す（index=カテゴリ, values=件数）。
     - dropna=True で欠損を除外
-    - order を指定すると、その順序で並ぶ
+    - order を指定すると、その順序で並ぶ（order に無い値は除外）
+    ※欠損は dropna の指定によらず件数に含めない
     """
-    if col not in df.columns:
-        raise KeyError(f"列が見つかりません: {col}")
-    s = df[col]
-    if dropna:
-        s = s.dropna()
-    s = apply_category_order(s, order)
-    vc = s.value_counts(dropna=not dropna, sort=False)  # 並び順はカテゴリ順に合わせる
+    # 件数は部分集計（CountState）で数える。チャンク入力でも生データを保持しない
     # カテゴリ順が未指定の場合は index 昇順にしておく（日本語でも安定挙動に）
-    if order is None:
-        vc = vc.sort_index()
-    return vc
+    state = CountState(col)
+    for chunk in _iter_chunks(df):
+        state.update(chunk)
+    return state.finalize(order=order)
 
 
+@timed(rows="input")
 def percent_by(
-    df: pd.DataFrame,
+    df: TableLike,
     col: str,
     *,
     digits: int = 1,
@@ -71,26 +110,32 @@ def percent_by(
     return perc
 
 
-def mean_of(df: pd.DataFrame, col: str, *, dropna: bool = True) -> float:
+@timed(rows="input")
+def mean_of(df: TableLike, col: str, *, dropna: bool = True) -> float:
     """数値列の平均を返す。"""
+    df = _as_frame(df, [col])
     if col not in df.columns:
         raise KeyError(f"列が見つかりません: {col}")
     s = df[col]
     return float(s.dropna().mean()) if dropna else float(s.mean())
 
 
-def median_of(df: pd.DataFrame, col: str, *, dropna: bool = True) -> float:
+@timed(rows="input")
+def median_of(df: TableLike, col: str, *, dropna: bool = True) -> float:
     """数値列の中央値を返す。"""
+    df = _as_frame(df, [col])
     if col not in df.columns:
         raise KeyError(f"列が見つかりません: {col}")
     s = df[col]
     return float(s.dropna().median()) if dropna else float(s.median())
 
 
-def mode_of(df: pd.DataFrame, col: str, *, dropna: bool = True) -> pd.Series:
+@timed(rows="input")
+def mode_of(df: TableLike, col: str, *, dropna: bool = True) -> pd.Series:
     """
     最頻値（複数ある場合は複数返る）。返り値は Series。
     """
+    df = _as_frame(df, [col])
     if col not in df.columns:
         raise KeyError(f"列が見つかりません: {col}")
     s = df[col].dropna() if dropna else df[col]
@@ -99,8 +144,9 @@ def mode_of(df: pd.DataFrame, col: str, *, dropna: bool = True) -> pd.Series:
 
 # ---- グループ集計（クロス集計/平均・割合など） ----------------------------------
 
+@timed(rows="input")
 def mean_by(
-    df: pd.DataFrame,
+    df: TableLike,
     group_col: str,
     value_col: str,
     *,
@@ -109,19 +155,21 @@ def mean_by(
     """
     group_col ごとの value_col の平均。
     """
+    df = _as_frame(df, [group_col, value_col])
     if group_col not in df.columns or value_col not in df.columns:
         raise KeyError(f"列が見つかりません: {group_col}, {value_col}")
     s_group = apply_category_order(df[group_col], order)
     g = pd.Series(df[value_col].values, index=s_group)
-    out = g.groupby(level=0).mean()
+    out = g.groupby(level=0, observed=False).mean()
     # カテゴリ順が未指定なら index 昇順
     if order is None:
         out = out.sort_index()
     return out
 
 
+@timed(rows="input")
 def crosstab_counts(
-    df: pd.DataFrame,
+    df: TableLike,
     row: str,
     col: str,
     *,
@@ -131,28 +179,19 @@ def crosstab_counts(
 ) -> pd.DataFrame:
     """
     行×列の件数のクロス集計。
+    行・列のどちらかが欠損の行は数えない（dropna=False なら NaN の行・列として末尾に数える）。
+    row_order/col_order に無い値は除外する。
     """
-    if row not in df.columns or col not in df.columns:
-        raise KeyError(f"列が見つかりません: {row}, {col}")
-    r = df[row]
-    c = df[col]
-    if dropna:
-        mask = r.notna() & c.notna()
-        r = r[mask]
-        c = c[mask]
-    r = apply_category_order(r, row_order)
-    c = apply_category_order(c, col_order)
-    tab = pd.crosstab(r, c, dropna=False)
     # 未指定なら index/columns 昇順
-    if row_order is None:
-        tab = tab.sort_index(axis=0)
-    if col_order is None:
-        tab = tab.sort_index(axis=1)
-    return tab
+    state = CrosstabState(row, col, dropna=dropna)
+    for chunk in _iter_chunks(df):
+        state.update(chunk)
+    return state.finalize(row_order=row_order, col_order=col_order)
 
 
+@timed(rows="input")
 def crosstab_percent(
-    df: pd.DataFrame,
+    df: TableLike,
     row: str,
     col: str,
     *,
@@ -173,6 +212,15 @@ def crosstab_percent(
         df, row, col,
         row_order=row_order, col_order=col_order, dropna=dropna
     )
+    return _percent_table(tab, normalize, digits)
+
+
+def _percent_table(
+    tab: pd.DataFrame,
+    normalize: Literal["all", "index", "columns"],
+    digits: int,
+) -> pd.DataFrame:
+    """件数のクロス表を割合（%）に変換する。"""
     denom = {
         "index": tab.sum(axis=1).replace(0, pd.NA),
         "columns": tab.sum(axis=0).replace(0, pd.NA),
@@ -188,10 +236,142 @@ def crosstab_percent(
     return out.round(digits)
 
 
+# ---- 全ペアのクロス集計（属性 × 設問） ------------------------------------------
+
+# ワーカープロセス側で共有メモリ上のコード配列を参照するためのグローバル
+_WORKER_SHM: Optional[SharedMemory] = None
+_WORKER_CODES: Optional[np.ndarray] = None
+
+
+def _factorize(s: pd.Series, order: Optional[Sequence[str]]) -> tuple[np.ndarray, pd.Index]:
+    """列を整数コードへ変換する（欠損・order 外の値は -1）。"""
+    if order is None and isinstance(s.dtype, pd.CategoricalDtype):
+        # category 型は既存のコードを流用し、カテゴリを値の昇順に並べ替えるだけにする
+        cats = s.cat.categories
+        perm = cats.argsort()
+        rank = np.empty(len(perm), dtype=np.int32)
+        rank[perm] = np.arange(len(perm), dtype=np.int32)
+        codes = s.cat.codes.to_numpy()
+        return np.where(codes >= 0, rank[codes], -1).astype(np.int32), pd.Index(cats[perm].to_numpy())
+    if order is None:
+        codes, uniques = pd.factorize(s, sort=True)
+        return codes.astype(np.int32, copy=False), pd.Index(uniques)
+    cat = pd.Categorical(s, categories=list(order))
+    return cat.codes.astype(np.int32), pd.Index(list(order))
+
+
+def _pair_counts(codes_r: np.ndarray, n_r: int, codes_c: np.ndarray, n_c: int) -> np.ndarray:
+    """2列のコードを結合し、bincount で件数行列（n_r × n_c）を求める。"""
+    mask = (codes_r >= 0) & (codes_c >= 0)
+    combined = codes_r[mask].astype(np.int64) * n_c + codes_c[mask]
+    return np.bincount(combined, minlength=n_r * n_c).reshape(n_r, n_c)
+
+
+def _init_crosstab_worker(shm_name: str, shape: tuple[int, int]) -> None:
+    """ProcessPoolExecutor の initializer：共有メモリのコード配列にアタッチする。"""
+    global _WORKER_SHM, _WORKER_CODES
+    _WORKER_SHM = SharedMemory(name=shm_name)
+    _WORKER_CODES = np.ndarray(shape, dtype=np.int32, buffer=_WORKER_SHM.buf)
+
+
+def _crosstab_worker(task: tuple[int, int, int, int]) -> np.ndarray:
+    i, n_i, j, n_j = task
+    assert _WORKER_CODES is not None
+    return _pair_counts(_WORKER_CODES[i], n_i, _WORKER_CODES[j], n_j)
+
+
+def _counts_frame(
+    mat: np.ndarray,
+    row: str, row_labels: pd.Index, row_ordered: bool,
+    col: str, col_labels: pd.Index, col_ordered: bool,
+) -> pd.DataFrame:
+    """件数行列を crosstab_counts と同じ形の DataFrame にする。"""
+    if row_ordered:
+        index = pd.CategoricalIndex(row_labels, categories=row_labels, ordered=True, name=row)
+        keep_r = slice(None)
+    else:
+        keep_r = mat.sum(axis=1) > 0  # その組み合わせで観測されたカテゴリだけ残す
+        index = pd.Index(row_labels[keep_r], name=row)
+    if col_ordered:
+        columns = pd.CategoricalIndex(col_labels, categories=col_labels, ordered=True, name=col)
+        keep_c = slice(None)
+    else:
+        keep_c = mat.sum(axis=0) > 0
+        columns = pd.Index(col_labels[keep_c], name=col)
+    return pd.DataFrame(mat[keep_r][:, keep_c].astype("int64"), index=index, columns=columns)
+
+
+@timed(rows="input")
+def crosstab_all(
+    df: TableLike,
+    rows: Sequence[str],
+    cols: Sequence[str],
+    *,
+    workers: Optional[int] = None,
+    orders: Optional[Mapping[str, Sequence[str]]] = None,
+    normalize: Optional[Literal["all", "index", "columns"]] = None,
+    digits: int = 1,
+) -> dict[tuple[str, str], pd.DataFrame]:
+    """
+    rows（属性：年代・性別など）× cols（設問）の全ペアのクロス集計をまとめて行う。
+    - 各列は1回だけ整数コードに変換し、ペアごとの件数は bincount で求める
+    - workers に 2 以上を指定すると、コード配列を共有メモリに置いてプロセスプールで並列計算する
+    - orders で列ごとのカテゴリ順を指定できる（crosstab_counts の row_order/col_order 相当）
+    - normalize を指定すると crosstab_percent と同じ割合（%）を返す
+    返り値：{(row, col): クロス表}。各表は crosstab_counts / crosstab_percent と同じ形。
+    """
+    orders = orders or {}
+    names = list(dict.fromkeys([*rows, *cols]))
+    df = _as_frame(df, names)
+    missing = [c for c in names if c not in df.columns]
+    if missing:
+        raise KeyError(f"列が見つかりません: {', '.join(missing)}")
+    # 順序付き category 型の列は、そのカテゴリ順を既定の順序にする
+    orders = {**{n: o for n in names if (o := dtype_order(df[n])) is not None}, **orders}
+
+    pos = {name: i for i, name in enumerate(names)}
+    labels: list[pd.Index] = []
+    codes = np.empty((len(names), len(df)), dtype=np.int32)
+    for i, name in enumerate(names):
+        codes[i], uniq = _factorize(df[name], orders.get(name))
+        labels.append(uniq)
+
+    pairs = [(r, c) for r in rows for c in cols]
+    tasks = [(pos[r], len(labels[pos[r]]), pos[c], len(labels[pos[c]])) for r, c in pairs]
+
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        mats = [_pair_counts(codes[i], n_i, codes[j], n_j) for i, n_i, j, n_j in tasks]
+    else:
+        shm = SharedMemory(create=True, size=max(codes.nbytes, 1))
+        try:
+            np.ndarray(codes.shape, dtype=np.int32, buffer=shm.buf)[:] = codes
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_crosstab_worker,
+                initargs=(shm.name, codes.shape),
+            ) as ex:
+                chunk = max(1, len(tasks) // (workers * 4))
+                mats = list(ex.map(_crosstab_worker, tasks, chunksize=chunk))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    out: dict[tuple[str, str], pd.DataFrame] = {}
+    for (r, c), mat in zip(pairs, mats):
+        tab = _counts_frame(
+            mat,
+            r, labels[pos[r]], r in orders,
+            c, labels[pos[c]], c in orders,
+        )
+        out[(r, c)] = tab if normalize is None else _percent_table(tab, normalize, digits)
+    return out
+
+
 # ---- Likert（1〜5など）向けの集計 ------------------------------------------------
 
+@timed(rows="input")
 def likert_summary(
-    df: pd.DataFrame,
+    df: TableLike,
     col: str,
     *,
     scale: Sequence[int] = (1, 2, 3, 4, 5),
@@ -202,31 +382,18 @@ def likert_summary(
     Likert 尺度（例：1〜5）を想定したサマリー。
     出力：各スコアの件数・割合・平均・中央値
     """
-    if col not in df.columns:
-        raise KeyError(f"列が見つかりません: {col}")
-    s = df[col].dropna()
-    # スコア外の値を除外（安全運転）
-    s = s[s.isin(scale)]
-    counts = s.value_counts().reindex(scale, fill_value=0)
-    perc = (counts / counts.sum() * 100).round(digits) if counts.sum() > 0 else counts.astype(float)
-    out = pd.DataFrame({
-        "件数": counts,
-        "割合(%)": perc
-    })
-    if labels:
-        out.index = [labels.get(int(i), str(i)) for i in out.index]
-    stats = pd.Series({
-        "平均": s.mean() if len(s) else float("nan"),
-        "中央値": s.median() if len(s) else float("nan"),
-        "回答数": int(len(s)),
-    })
-    return out, stats
+    # スコア外の値は除外（安全運転）。平均・中央値はスコア別件数から求める
+    state = LikertState(col, scale)
+    for chunk in _iter_chunks(df):
+        state.update(chunk)
+    return state.finalize(labels=labels, digits=digits)
 
 
 # ---- NPS（推奨度 0〜10） -------------------------------------------------------
 
+@timed(rows="input")
 def nps(
-    df: pd.DataFrame,
+    df: TableLike,
     col: str,
     *,
     digits: int = 1
@@ -238,55 +405,174 @@ def nps(
     - 9〜10: Promoters
     返り値：カテゴリ割合と NPS 値（Promoters% - Detractors%）
     """
-    if col not in df.columns:
-        raise KeyError(f"列が見つかりません: {col}")
-    s = df[col].dropna()
-    s = s[s.between(0, 10)]  # 範囲外は除外
-    if len(s) == 0:
-        return pd.Series({"Promoters(%)": 0.0, "Passives(%)": 0.0, "Detractors(%)": 0.0, "NPS": 0.0})
-    promoters = (s >= 9).mean() * 100
-    passives = ((s >= 7) & (s <= 8)).mean() * 100
-    detractors = (s <= 6).mean() * 100
-    result = pd.Series({
-        "Promoters(%)": round(promoters, digits),
-        "Passives(%)": round(passives, digits),
-        "Detractors(%)": round(detractors, digits),
-        "NPS": round(promoters - detractors, digits)
-    })
+    state = NPSState(col)  # 範囲外は除外
+    for chunk in _iter_chunks(df):
+        state.update(chunk)
+    return state.finalize(digits=digits)
+
+
+# ---- 複数指標の一括集計 --------------------------------------------------------
+
+# summarize() で指定できる指標名
+SUMMARY_METRICS: tuple[str, ...] = (
+    "count",    # count_by
+    "percent",  # percent_by
+    "mean",     # mean_of
+    "median",   # median_of
+    "mode",     # mode_of
+    "likert",   # likert_summary
+    "nps",      # nps
+    "n",        # 有効回答数（欠損以外）
+    "missing",  # 欠損数
+)
+
+# 件数（value_counts）から求める指標
+_COUNT_BASED = {"count", "percent", "mode", "likert", "nps"}
+
+SummarySpec = Mapping[str, Union[Sequence[str], Mapping[str, Any]]]
+
+
+def _parse_column_spec(col: str, spec: Union[Sequence[str], Mapping[str, Any]]) -> tuple[list[str], dict[str, Any]]:
+    """列ごとの指定を (指標名リスト, オプション) に分解する。"""
+    if isinstance(spec, Mapping):
+        options = dict(spec)
+        metrics = list(options.pop("metrics", []))
+    elif isinstance(spec, str):
+        metrics, options = [spec], {}
+    else:
+        metrics, options = list(spec), {}
+    unknown = [m for m in metrics if m not in SUMMARY_METRICS]
+    if unknown:
+        raise ValueError(f"未対応の指標です（列={col}）: {', '.join(unknown)}")
+    return metrics, options
+
+
+@timed(rows="input")
+def summarize(df: TableLike, spec: SummarySpec) -> dict[str, dict[str, Any]]:
+    """
+    複数列・複数指標の集計をまとめて行う。
+    count_by / mean_of / likert_summary などを列ごとに何度も呼ぶ代わりに、
+    列ごとに1回だけ走査し、欠損マスクと value_counts を全指標で共有する（列のコピーは作らない）。
+
+    spec の例：
+        {
+            "年代": {"metrics": ["count", "percent"], "order": AGES},
+            "満足度": ["mean", "median", "mode", "likert"],
+            "推奨度": {"metrics": ["nps"], "digits": 1},
+        }
+    列ごとのオプション：order（count/percent）、scale・labels（likert）、digits（percent/likert/nps）
+
+    返り値：{列名: {指標名: 結果}}。各結果は対応する単体関数と同じ形。
+    """
+    parsed = {col: _parse_column_spec(col, col_spec) for col, col_spec in spec.items()}
+    df = _as_frame(df, list(parsed))
+    missing_cols = [c for c in parsed if c not in df.columns]
+    if missing_cols:
+        raise KeyError(f"列が見つかりません: {', '.join(missing_cols)}")
+
+    result: dict[str, dict[str, Any]] = {}
+    for col, (metrics, options) in parsed.items():
+        s = df[col]
+        digits = options.get("digits", 1)
+        out: dict[str, Any] = {}
+
+        if "n" in metrics or "missing" in metrics:
+            na_count = int(s.isna().sum())
+            if "n" in metrics:
+                out["n"] = int(len(s)) - na_count
+            if "missing" in metrics:
+                out["missing"] = na_count
+
+        if _COUNT_BASED.intersection(metrics):
+            # 欠損を除いた件数を1回だけ数え、件数系の指標はすべてここから求める
+            vc = s.value_counts(dropna=True, sort=False)
+            if "count" in metrics or "percent" in metrics:
+                order = options.get("order", dtype_order(s))
+                counts = CountState(col).update_from_counts(vc).finalize(order=order)
+                if "count" in metrics:
+                    out["count"] = counts
+                if "percent" in metrics:
+                    total = counts.sum()
+                    out["percent"] = counts.astype(float) if total == 0 else (counts / total * 100).round(digits)
+            if "mode" in metrics:
+                top = vc[vc == vc.max()].index if len(vc) else vc.index
+                out["mode"] = pd.Series(top, dtype=s.dtype, name=col).sort_values(ignore_index=True)
+            if "likert" in metrics:
+                likert = LikertState(col, options.get("scale", (1, 2, 3, 4, 5))).update_from_counts(vc)
+                out["likert"] = likert.finalize(labels=options.get("labels"), digits=digits)
+            if "nps" in metrics:
+                out["nps"] = NPSState(col).update_from_counts(vc).finalize(digits=digits)
+
+        # 平均・中央値は欠損をスキップして直接計算（dropna によるコピーを作らない）
+        if "mean" in metrics:
+            out["mean"] = float(s.mean(skipna=True))
+        if "median" in metrics:
+            out["median"] = float(s.median(skipna=True))
+
+        result[col] = {m: out[m] for m in metrics}
     return result
 
 
 # ---- 自由記述の簡易頻出語 ------------------------------------------------------
 
-_JA_TOKEN_SPLIT = re.compile(r"[\\s、。．,\\.／/・;；:：!！\\?？\\(\\)（）\\[\\]『』「」\"'`]")
-
+@timed(rows="input")
 def top_terms(
-    df: pd.DataFrame,
+    df: TableLike,
     col: str,
     *,
     stopwords: Optional[Iterable[str]] = None,
     top_n: int = 20,
-    min_len: int = 2
+    min_len: int = 2,
+    tokenizer: Optional[Tokenizer] = None,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> pd.Series:
     """
     日本語の自由記述列からの簡易頻出語トップ。
-    * 高度な形態素解析は使わず、空白/句読点/記号で分割するだけの簡易版。
-    * 実運用では MeCab や Sudachi を使うと精度が上がる。
+    * 既定は空白/句読点/記号で分割するだけの簡易版（Series.str.split(正規表現) でまとめて分割）。
+    * tokenizer で差し替え可能。分かち書きの無い文章は NgramTokenizer(2)、
+      MeCab や Sudachi を使う場合は WordTokenizer(関数) で包んで渡す。
+    * チャンク列は1チャンクずつ数えてマージする（全行を連結しない）。
+    * workers>=2 でバッチをプロセス並列に数える。
+    同数の語は語の昇順に並べる。
     """
-    if col not in df.columns:
-        raise KeyError(f"列が見つかりません: {col}")
-
-    sw = set(stopwords or [])
-    counter: Counter[str] = Counter()
+    counts = count_terms_in(
+        _iter_chunks(df), col,
+        tokenizer=tokenizer, stopwords=stopwords, min_len=min_len,
+        workers=workers, batch_size=batch_size,
+    )
+    return most_common(counts, top_n)
 
-    for v in df[col].dropna().astype(str):
-        for token in _JA_TOKEN_SPLIT.split(v):
-            t = token.strip()
-            if len(t) < min_len:
-                continue
-            if t in sw:
-                continue
-            counter[t] += 1
 
-    most = counter.most_common(top_n)
-    return pd.Series({k: v for k, v in most})
+@timed(rows="input")
+def top_terms_by(
+    df: TableLike,
+    col: str,
+    by: str,
+    *,
+    stopwords: Optional[Iterable[str]] = None,
+    top_n: int = 20,
+    min_len: int = 2,
+    tokenizer: Optional[Tokenizer] = None,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[Any, pd.Series]:
+    """
+    グループ（by 列の値）ごとの頻出語トップを1回の走査で求める。
+    返り値：{グループ値: top_terms と同じ形の Series}
+    by が順序付き category の場合はその順（チャンク列なら最初のチャンクの型）、それ以外は値の昇順で並べる。
+    """
+    chunks = iter(_iter_chunks(df))
+    first = next(chunks, None)
+    if first is None:
+        return {}
+    order = dtype_order(first[by]) if by in first.columns else None
+    counts = count_terms_in(
+        itertools.chain([first], chunks), col, by=by,
+        tokenizer=tokenizer, stopwords=stopwords, min_len=min_len,
+        workers=workers, batch_size=batch_size,
+    )
+    result = most_common_by_group(counts, top_n)
+    if order is not None:
+        result = {g: result[g] for g in order if g in result}
+    return result
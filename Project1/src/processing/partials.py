@@ -0,0 +1,300 @@
+# src/processing/partials.py
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, Mapping, Optional, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+
+
+# ---- 部分集計（チャンクごとに更新・ワーカー間でマージ可能な集計状態） ------------
+#
+# 使い方：
+#     state = CountState("年代")
+#     for chunk in iter_table_chunks(path):
+#         state.update(chunk)
+#     counts = state.finalize()          # count_by と同じ形の Series
+#
+# 並列処理では各ワーカーが自分の担当チャンクで state を作り、親で merge する。
+# いずれの state も生データの行は保持せず、件数などの集約値だけを持つ。
+
+
+def dtype_order(s: pd.Series) -> Optional[list]:
+    """
+    順序付き category 型（スキーマで categories を定義した列など）なら、そのカテゴリ順を返す。
+    集計関数で order が未指定の場合の既定の表示順になる。
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype) and s.dtype.ordered:
+        return list(s.dtype.categories)
+    return None
+
+
+def _require(df: pd.DataFrame, *cols: str) -> None:
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise KeyError(f"列が見つかりません: {', '.join(missing)}")
+
+
+@dataclass
+class CountState:
+    """
+    カテゴリ列の件数（count_by / percent_by 用）。欠損は数えない。
+    order は列が順序付き category 型なら最初のチャンクから自動で設定される。
+    """
+    col: str
+    counts: Counter = field(default_factory=Counter)
+    order: Optional[list] = None
+
+    def update(self, df: pd.DataFrame) -> "CountState":
+        _require(df, self.col)
+        s = df[self.col]
+        if self.order is None:
+            self.order = dtype_order(s)
+        return self.update_from_counts(s.value_counts(dropna=True, sort=False))
+
+    def update_from_counts(self, vc: pd.Series) -> "CountState":
+        """value_counts() 済みの件数 Series を足し込む（集計済みの値の再利用向け）。"""
+        for key, n in vc.items():
+            if n:  # category 型の未出現カテゴリ（0件）は数えない
+                self.counts[key] += int(n)
+        return self
+
+    def merge(self, other: "CountState") -> "CountState":
+        self.counts.update(other.counts)
+        if self.order is None:
+            self.order = other.order
+        return self
+
+    def finalize(self, order: Optional[Sequence[str]] = None) -> pd.Series:
+        """count_by と同じ形（index=カテゴリ, values=件数, name="count"）で返す。"""
+        if order is None:
+            order = self.order
+        if order is None:
+            out = pd.Series(dict(self.counts), dtype="int64", name="count")
+            out.index.name = self.col
+            return out.sort_index()
+        index = pd.CategoricalIndex(list(order), categories=list(order), ordered=True, name=self.col)
+        values = [self.counts.get(k, 0) for k in order]
+        return pd.Series(values, index=index, dtype="int64", name="count")
+
+
+@dataclass
+class CrosstabState:
+    """
+    行×列の件数行列（crosstab_counts / crosstab_percent 用）。
+    行・列が順序付き category 型なら、そのカテゴリ順を既定の並びにする。
+    dropna=False なら欠損も NaN の行・列として数える（末尾に置く）。
+    """
+    row: str
+    col: str
+    counts: Counter = field(default_factory=Counter)
+    row_order: Optional[list] = None
+    col_order: Optional[list] = None
+    dropna: bool = True
+
+    def update(self, df: pd.DataFrame) -> "CrosstabState":
+        _require(df, self.row, self.col)
+        r = df[self.row]
+        c = df[self.col]
+        if self.row_order is None:
+            self.row_order = dtype_order(r)
+        if self.col_order is None:
+            self.col_order = dtype_order(c)
+        if self.dropna:
+            mask = r.notna() & c.notna()
+            if not mask.any():
+                return self
+            r, c = r[mask], c[mask]
+        elif r.empty:
+            return self
+        sizes = pd.DataFrame({"r": r, "c": c}).groupby(
+            ["r", "c"], sort=False, observed=True, dropna=self.dropna,
+        ).size()
+        for (rk, ck), n in sizes.items():
+            # NaN はオブジェクトごとに == が成り立たないので、キーは None にそろえる
+            self.counts[(None if pd.isna(rk) else rk, None if pd.isna(ck) else ck)] += int(n)
+        return self
+
+    def merge(self, other: "CrosstabState") -> "CrosstabState":
+        self.counts.update(other.counts)
+        self.row_order = self.row_order if self.row_order is not None else other.row_order
+        self.col_order = self.col_order if self.col_order is not None else other.col_order
+        return self
+
+    def finalize(
+        self,
+        row_order: Optional[Sequence[str]] = None,
+        col_order: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """crosstab_counts と同じ形の DataFrame で返す。"""
+        row_order = row_order if row_order is not None else self.row_order
+        col_order = col_order if col_order is not None else self.col_order
+        rows = _axis_values(row_order, [k[0] for k in self.counts])
+        cols = _axis_values(col_order, [k[1] for k in self.counts])
+        pos_r = {k: i for i, k in enumerate(rows)}
+        pos_c = {k: i for i, k in enumerate(cols)}
+        values = np.zeros((len(rows), len(cols)), dtype="int64")
+        for (rk, ck), n in self.counts.items():
+            i, j = pos_r.get(rk), pos_c.get(ck)
+            if i is not None and j is not None:  # 指定の並びに無い値は除外
+                values[i, j] += n
+        index = _axis_index(rows, row_order, self.row)
+        columns = _axis_index(cols, col_order, self.col)
+        return pd.DataFrame(values, index=index, columns=columns)
+
+
+def _axis_values(order: Optional[Sequence], keys: list) -> list:
+    """軸の並び（order 未指定なら出現した値の昇順）。欠損（None）があれば末尾に足す。"""
+    values = list(order) if order is not None else list(pd.Index({k for k in keys if k is not None}).sort_values())
+    return values + [None] if None in keys else values
+
+
+def _axis_index(values: list, order: Optional[Sequence], name: str) -> pd.Index:
+    """集計表の行・列のラベル。order 指定時は順序付き category（欠損は NaN として末尾）。"""
+    if order is not None:
+        return pd.CategoricalIndex(values, categories=list(order), ordered=True, name=name)
+    return pd.Index([np.nan if v is None else v for v in values], name=name)
+
+
+@dataclass
+class LikertState:
+    """Likert 尺度のスコア別件数（likert_summary 用）。平均・中央値も件数から復元する。"""
+    col: str
+    scale: Sequence[int] = (1, 2, 3, 4, 5)
+    counts: np.ndarray = field(default=None)  # type: ignore[assignment]
+
+    def __post_init__(self) -> None:
+        self.scale = tuple(self.scale)
+        if self.counts is None:
+            self.counts = np.zeros(len(self.scale), dtype="int64")
+
+    def update(self, df: pd.DataFrame) -> "LikertState":
+        _require(df, self.col)
+        return self.update_from_counts(df[self.col].value_counts(dropna=True, sort=False))
+
+    def update_from_counts(self, vc: pd.Series) -> "LikertState":
+        """value_counts() 済みの件数 Series を足し込む。スコア外の値は無視される。"""
+        vc = vc[vc.index.isin(self.scale)]
+        self.counts += vc.reindex(self.scale, fill_value=0).to_numpy(dtype="int64")
+        return self
+
+    def merge(self, other: "LikertState") -> "LikertState":
+        if tuple(other.scale) != self.scale:
+            raise ValueError(f"scale が一致しません: {self.scale} != {tuple(other.scale)}")
+        self.counts += other.counts
+        return self
+
+    def _median(self) -> float:
+        n = int(self.counts.sum())
+        order = np.argsort(self.scale, kind="stable")
+        values = np.asarray(self.scale, dtype=float)[order]
+        cum = np.cumsum(self.counts[order])
+        # 0 始まりの順位 k の値 = 累積件数が k を超える最初のスコア
+        lo = values[np.searchsorted(cum, (n - 1) // 2, side="right")]
+        hi = values[np.searchsorted(cum, n // 2, side="right")]
+        return float((lo + hi) / 2)
+
+    def finalize(
+        self,
+        labels: Optional[Mapping[int, str]] = None,
+        digits: int = 1,
+    ) -> tuple[pd.DataFrame, pd.Series]:
+        """likert_summary と同じ (スコア別表, 統計量) のタプルで返す。"""
+        counts = pd.Series(
+            self.counts, index=pd.Index(list(self.scale), name=self.col), name="count"
+        )
+        total = int(counts.sum())
+        perc = (counts / total * 100).round(digits) if total > 0 else counts.astype(float)
+        out = pd.DataFrame({
+            "件数": counts,
+            "割合(%)": perc
+        })
+        if labels:
+            out.index = [labels.get(int(i), str(i)) for i in out.index]
+        stats = pd.Series({
+            "平均": float(np.dot(self.counts, self.scale) / total) if total else float("nan"),
+            "中央値": self._median() if total else float("nan"),
+            "回答数": total,
+        })
+        return out, stats
+
+
+@dataclass
+class NPSState:
+    """NPS の区分別件数（nps 用）。0〜10 の範囲外は数えない。"""
+    col: str
+    promoters: int = 0
+    passives: int = 0
+    detractors: int = 0
+    total: int = 0
+
+    def update(self, df: pd.DataFrame) -> "NPSState":
+        _require(df, self.col)
+        return self.update_from_counts(df[self.col].value_counts(dropna=True, sort=False))
+
+    def update_from_counts(self, vc: pd.Series) -> "NPSState":
+        """value_counts() 済みの件数 Series（index=スコア）を足し込む。"""
+        score = vc.index.to_numpy(dtype=float)
+        n = vc.to_numpy(dtype="int64")
+        n = n * ((score >= 0) & (score <= 10))  # 範囲外は除外
+        self.promoters += int(n[score >= 9].sum())
+        self.passives += int(n[(score >= 7) & (score <= 8)].sum())
+        self.detractors += int(n[score <= 6].sum())
+        self.total += int(n.sum())
+        return self
+
+    def merge(self, other: "NPSState") -> "NPSState":
+        self.promoters += other.promoters
+        self.passives += other.passives
+        self.detractors += other.detractors
+        self.total += other.total
+        return self
+
+    def finalize(self, digits: int = 1) -> pd.Series:
+        """nps と同じ形の Series で返す。"""
+        if self.total == 0:
+            return pd.Series({"Promoters(%)": 0.0, "Passives(%)": 0.0, "Detractors(%)": 0.0, "NPS": 0.0})
+        promoters = self.promoters / self.total * 100
+        passives = self.passives / self.total * 100
+        detractors = self.detractors / self.total * 100
+        return pd.Series({
+            "Promoters(%)": round(promoters, digits),
+            "Passives(%)": round(passives, digits),
+            "Detractors(%)": round(detractors, digits),
+            "NPS": round(promoters - detractors, digits)
+        })
+
+
+# ---- 複数 state の一括更新・マージ ----------------------------------------------
+
+State = TypeVar("State", CountState, CrosstabState, LikertState, NPSState)
+
+
+def update_all(chunks: Iterable[pd.DataFrame], states: Sequence[State]) -> Sequence[State]:
+    """
+    チャンク列を1回だけ走査し、全ての state を更新する。
+    イテレータ入力でも複数の集計を1パスで済ませるためのヘルパ。
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    for chunk in chunks:
+        for st in states:
+            st.update(chunk)
+    return states
+
+
+def merge_all(states: Iterable[State]) -> State:
+    """
+    同種の state（ワーカーごとの部分集計など）を1つにマージする。
+    先頭の state に後続を足し込んで返す。
+    """
+    it = iter(states)
+    try:
+        acc = next(it)
+    except StopIteration:
+        raise ValueError("マージ対象の state がありません") from None
+    for st in it:
+        acc.merge(st)
+    return acc
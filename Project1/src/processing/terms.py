@@ -0,0 +1,207 @@
+# src/processing/terms.py
+from __future__ import annotations
+
+import heapq
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Hashable, Iterable, Iterator, Optional, Protocol
+
+import numpy as np
+import pandas as pd
+
+
+# ---- 自由記述の頻出語カウント（バッチ・ベクトル化・並列対応） --------------------------
+#
+# 文字列 Series をバッチごとに重複を除いてからトークン化し、出現回数で重み付けして数える。
+# 各バッチの結果は Counter なので、チャンク入力・プロセス並列の結果をそのままマージできる。
+# グループ別（年代ごとなど）の集計も、(グループ, 語) の組で数えるので1回の走査で済む。
+
+# 空白・句読点・記号で区切る
+TOKEN_SPLIT = re.compile(r"[\s、。．,\.／/・;；:：!！\?？\(\)（）\[\]『』「」\"'`]+")
+
+DEFAULT_BATCH_SIZE = 50_000
+
+
+class Tokenizer(Protocol):
+    """
+    トークナイザのインターフェース。
+    文字列の Series を受け取り、1トークン1行の Series を返す。
+    返り値の index は入力の index を引き継ぐこと（どの文面から出た語かの対応付けに使う）。
+    プロセス並列で使う場合は pickle できる（モジュール直下の関数・クラス）必要がある。
+    """
+    def __call__(self, texts: pd.Series) -> pd.Series: ...
+
+
+def split_tokenizer(texts: pd.Series) -> pd.Series:
+    """
+    空白・句読点・記号で分割する簡易トークナイザ（既定）。
+    区切りの連続も1つの区切りとして扱うので、空白の strip は不要（空文字は min_len で落ちる）。
+    """
+    return texts.str.split(TOKEN_SPLIT, regex=True).explode()
+
+
+class NgramTokenizer:
+    """
+    文字 n-gram トークナイザ。分かち書きされない日本語の文章向けのフォールバック。
+    句読点・記号で区切った各区間から、長さ n の部分文字列をすべて取り出す。
+    """
+
+    def __init__(self, n: int = 2) -> None:
+        if n < 1:
+            raise ValueError(f"n は 1 以上を指定してください: {n}")
+        self.n = n
+
+    def __call__(self, texts: pd.Series) -> pd.Series:
+        segments = split_tokenizer(texts).dropna()
+        lens = segments.str.len()
+        if segments.empty:
+            return segments
+        # 開始位置ごとに全行まとめて slice する（行ごとの Python ループを避ける）
+        parts = [
+            segments[lens >= i + self.n].str.slice(i, i + self.n)
+            for i in range(int(lens.max()) - self.n + 1)
+        ]
+        return pd.concat(parts) if parts else segments.iloc[:0]
+
+
+class WordTokenizer:
+    """
+    1文字列 → 語のリスト を返す関数（MeCab / Sudachi のラッパなど）を Tokenizer にする。
+    例：WordTokenizer(my_mecab_wakati)  ※並列時は func もモジュール直下の関数にすること
+    """
+
+    def __init__(self, func: Callable[[str], Iterable[str]]) -> None:
+        self.func = func
+
+    def __call__(self, texts: pd.Series) -> pd.Series:
+        return texts.map(lambda t: list(self.func(t))).explode()
+
+
+def count_terms(
+    texts: pd.Series,
+    *,
+    tokenizer: Tokenizer = split_tokenizer,
+    stopwords: Iterable[str] = (),
+    min_len: int = 2,
+    groups: Optional[pd.Series] = None,
+) -> Counter:
+    """
+    1バッチ分の語を数える。groups を渡すと (グループ, 語) をキーに数える。
+    texts と groups は同じ長さ・並びであること。
+    tokenizer には重複を除いた文面（0 始まりの連番 index）が渡される。
+    """
+    mask = texts.notna()
+    if groups is not None:
+        mask &= groups.notna()
+    texts = texts[mask].astype(str)
+    if texts.empty:
+        return Counter()
+
+    # 自由記述は同じ文面（選択式の回答など）が繰り返し現れるため、
+    # 重複を除いた文面だけをトークン化し、出現回数で重み付けして数える
+    if groups is None:
+        vc = texts.value_counts(sort=False)
+        uniq = pd.Series(vc.index.to_numpy(dtype=object))
+    else:
+        vc = pd.DataFrame({"g": groups[mask].to_numpy(), "t": texts.to_numpy()}).value_counts(sort=False)
+        uniq = pd.Series(vc.index.get_level_values("t").to_numpy(dtype=object))
+    weights = vc.to_numpy()
+
+    tokens = tokenizer(uniq).dropna()
+    lens = np.fromiter(map(len, tokens.to_numpy()), dtype=np.int64, count=len(tokens))
+    tokens = tokens[lens >= min_len]
+    sw = list(stopwords)
+    if sw:
+        tokens = tokens[~tokens.isin(sw)]
+    if tokens.empty:
+        return Counter()
+
+    pos = tokens.index.to_numpy()
+    if groups is None:
+        keys = pd.Index(tokens.to_numpy())
+    else:
+        g = vc.index.get_level_values("g").to_numpy()[pos]
+        keys = pd.MultiIndex.from_arrays([g, tokens.to_numpy()])
+    summed = pd.Series(weights[pos], index=keys).groupby(level=list(range(keys.nlevels))).sum()
+    return Counter(summed.to_dict())
+
+
+def _count_batch(args: tuple) -> Counter:
+    """ProcessPoolExecutor 用（モジュール直下の関数）。"""
+    texts, groups, tokenizer, stopwords, min_len = args
+    return count_terms(texts, tokenizer=tokenizer, stopwords=stopwords, min_len=min_len, groups=groups)
+
+
+def _batches(
+    frames: Iterable[pd.DataFrame],
+    col: str,
+    by: Optional[str],
+    batch_size: int,
+) -> Iterator[tuple[pd.Series, Optional[pd.Series]]]:
+    for df in frames:
+        if col not in df.columns or (by is not None and by not in df.columns):
+            missing = [c for c in (col, by) if c is not None and c not in df.columns]
+            raise KeyError(f"列が見つかりません: {', '.join(missing)}")
+        for start in range(0, len(df), batch_size):
+            part = df.iloc[start:start + batch_size]
+            yield part[col], (part[by] if by is not None else None)
+
+
+def count_terms_in(
+    frames: Iterable[pd.DataFrame],
+    col: str,
+    *,
+    by: Optional[str] = None,
+    tokenizer: Optional[Tokenizer] = None,
+    stopwords: Optional[Iterable[str]] = None,
+    min_len: int = 2,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Counter:
+    """
+    DataFrame（のチャンク列）の col を batch_size 行ずつ数え、Counter にまとめる。
+    workers に 2 以上を指定するとバッチをプロセスプールで並列に数えてマージする。
+    """
+    tokenizer = tokenizer or split_tokenizer
+    sw = tuple(stopwords or ())
+    batches = _batches(frames, col, by, batch_size)
+    total: Counter = Counter()
+    if workers is None or workers <= 1:
+        for texts, groups in batches:
+            total.update(count_terms(texts, tokenizer=tokenizer, stopwords=sw, min_len=min_len, groups=groups))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        args = ((texts, groups, tokenizer, sw, min_len) for texts, groups in batches)
+        for counts in ex.map(_count_batch, args):
+            total.update(counts)
+    return total
+
+
+def most_common(counts: Counter, top_n: int) -> pd.Series:
+    """件数の多い順（同数は語の昇順）に top_n 件を Series で返す。"""
+    top = heapq.nsmallest(top_n, counts.items(), key=lambda kv: (-kv[1], str(kv[0])))
+    return pd.Series({k: v for k, v in top}, dtype="int64")
+
+
+def _sorted_groups(groups: Iterable[Hashable]) -> list[Hashable]:
+    """グループ値の昇順（数値は数値として並べる。型が混在して比べられない場合だけ文字列順）。"""
+    groups = list(groups)
+    try:
+        return sorted(groups)
+    except TypeError:
+        return sorted(groups, key=str)
+
+
+def most_common_by_group(counts: Counter, top_n: int) -> dict[Hashable, pd.Series]:
+    """(グループ, 語) の Counter から、グループごとの上位 top_n 件を返す（グループ値の昇順）。"""
+    per_group: dict[Hashable, Counter] = {}
+    for (g, term), n in counts.items():
+        per_group.setdefault(g, Counter())[term] = n
+    return {g: most_common(per_group[g], top_n) for g in _sorted_groups(per_group)}
+
+
+__all__ = [
+    "TOKEN_SPLIT", "Tokenizer", "split_tokenizer", "NgramTokenizer", "WordTokenizer",
+    "count_terms", "count_terms_in", "most_common", "most_common_by_group",
+]
@@ -0,0 +1,341 @@
+# src/reporting/batch.py
+"""
+セグメント（店舗・地域など）ごとに1つずつ PDF レポートを作るバッチ。
+
+実行例（Project1 直下で）:
+    python -m src.reporting.batch data/input/survey.xlsx --by 店舗 --workers 4
+    python -m src.reporting.batch data/input/survey.xlsx --by 年代 --questions 満足度 性別 --force
+    python -m src.reporting.batch data/input/survey.xlsx --by 年代 --schema   # configs/schema.yaml の型で読む
+
+- データは1回だけ読み込み、設問ごとの件数は crosstab_all（列ごとに1回だけ整数コード化）で全セグメント分を一度に求める
+- グラフ描画と PDF 作成はプロセスプールで並列に行う（ワーカーには行データではなく集計結果だけを渡す）
+- 出力先の .batch_manifest.json に各レポートの内容ハッシュを記録し、内容が変わっていないレポートは作り直さない
+  （途中で止まっても、再実行すれば残りだけを作る）
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import pandas as pd
+
+from ..data.loader import load_table
+from ..data.schema import ColumnSpec, load_schema
+from ..processing.aggregations import count_by, crosstab_all
+from ..processing.partials import dtype_order
+from ..utils.logging import setup_logging, setup_worker_logging, worker_logging
+from ..utils.paths import reports_dir
+from ..utils import profiling
+
+
+# ---- 設定 ------------------------------------------------------------------------
+
+MANIFEST_NAME = ".batch_manifest.json"
+
+# 出力内容が変わる変更をしたら上げる（既存レポートを作り直させる）
+BATCH_VERSION = 1
+
+# --questions 省略時に「選択式の設問」とみなすユニーク数の上限
+MAX_CHOICES = 20
+
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+@dataclass
+class SegmentJob:
+    """1レポート分の入力（ワーカーへ送るのは集計結果だけ）。"""
+    segment: str
+    out_path: Path
+    title: str
+    n: int
+    counts: dict[str, pd.Series]
+    vector_charts: bool = True
+
+    def digest(self) -> str:
+        """レポートの内容を決める要素のハッシュ（再作成が必要かの判定用）。"""
+        h = hashlib.blake2b(digest_size=16)
+        meta = [BATCH_VERSION, self.segment, self.title, self.n, self.vector_charts, list(self.counts)]
+        h.update(json.dumps(meta, ensure_ascii=False, default=str).encode("utf-8"))
+        for s in self.counts.values():
+            h.update(pd.util.hash_pandas_object(s, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+
+
+def safe_filename(name: str) -> str:
+    """セグメント名をファイル名に使える形にする。"""
+    return _UNSAFE_CHARS.sub("_", str(name)).strip("._") or "_"
+
+
+def segment_filenames(segments: Sequence[Any]) -> dict[str, str]:
+    """
+    セグメント名 → ファイル名（拡張子なし）。
+    "A/B" と "A_B" のように safe_filename が同じになるセグメントは、
+    セグメント名のハッシュを付けて区別する（並び順によらず同じ名前になる）。
+    """
+    names = {str(s): safe_filename(s) for s in segments}
+    seen: dict[str, int] = {}
+    for base in names.values():
+        seen[base] = seen.get(base, 0) + 1
+    return {
+        seg: base if seen[base] == 1 else f"{base}_{hashlib.blake2b(seg.encode('utf-8'), digest_size=4).hexdigest()}"
+        for seg, base in names.items()
+    }
+
+
+def default_questions(df: pd.DataFrame, by: str, max_choices: int = MAX_CHOICES) -> list[str]:
+    """選択式とみなせる列（ユニーク数が max_choices 以下）を設問として選ぶ。"""
+    return [
+        c for c in df.columns
+        if c != by and 1 <= df[c].nunique(dropna=True) <= max_choices
+    ]
+
+
+# ---- 集計（メインプロセスで1回だけ） ---------------------------------------------
+
+def segment_jobs(
+    df: pd.DataFrame,
+    by: str,
+    questions: Sequence[str],
+    out_dir: Path,
+    *,
+    title: str = "アンケート集計レポート",
+    vector_charts: bool = True,
+) -> list[SegmentJob]:
+    """
+    全セグメント × 全設問の件数をまとめて求め、セグメントごとのジョブにする。
+    設問のカテゴリ軸は全体で共通（あるセグメントで0件のカテゴリも0として残る）。
+    ファイル名は segment_filenames() で決める（別のセグメントが同じファイルを上書きしない）。
+    """
+    if by not in df.columns:
+        raise KeyError(f"列が見つかりません: {by}")
+    sizes = count_by(df, by, order=dtype_order(df[by]))
+    # 順序付き category の列は未出現のカテゴリも0件で並ぶので、回答の無いセグメントは作らない
+    sizes = sizes[sizes > 0]
+    tabs = crosstab_all(df, [by], list(questions))
+    filenames = segment_filenames(list(sizes.index))
+
+    jobs = []
+    for seg, n in sizes.items():
+        counts = {}
+        for q in questions:
+            tab = tabs[(by, q)]
+            counts[q] = tab.loc[seg] if seg in tab.index else pd.Series(0, index=tab.columns, dtype="int64")
+            counts[q].name = "count"
+        jobs.append(SegmentJob(
+            segment=str(seg),
+            out_path=out_dir / f"{filenames[str(seg)]}.pdf",
+            title=title,
+            n=int(n),
+            counts=counts,
+            vector_charts=vector_charts,
+        ))
+    return jobs
+
+
+# ---- レポート作成（ワーカープロセス） ---------------------------------------------
+
+def _init_worker(log_queue: Any = None) -> None:
+    """
+    ワーカーの初期化：GUI を使わない Agg バックエンドにし、フォント・スタイルを先に用意する。
+    log_queue を渡すと、ワーカーのログは親プロセスへ送って書き出す。
+    """
+    if log_queue is not None:
+        setup_worker_logging(log_queue)
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from .pdf_builder import warm_up
+
+    warm_up()
+
+
+def build_segment_report(job: SegmentJob) -> tuple[str, float]:
+    """1セグメント分の PDF を作り、(セグメント名, 所要秒数) を返す。"""
+    from ..viz.charts import ChartSpec
+    from .pdf_builder import build_analysis_report
+
+    t0 = time.perf_counter()
+    charts = [
+        ChartSpec("bar_counts", s, title=q, params={"xlabel": q})
+        for q, s in job.counts.items()
+    ]
+    tables = {}
+    for q, s in job.counts.items():
+        total = s.sum()
+        pct = (s / total * 100).round(1) if total else s.astype(float)
+        tables[q] = pd.DataFrame({q: s.index.astype(str), "件数": s.to_numpy(), "割合(%)": pct.to_numpy()})
+
+    # 一時ファイルに書いてから置き換える（途中で止まっても壊れた PDF を残さない）
+    tmp = job.out_path.with_name(f"{job.out_path.stem}.{os.getpid()}.tmp.pdf")
+    try:
+        build_analysis_report(
+            tmp,
+            title=f"{job.title}：{job.segment}",
+            overview_kv={"セグメント": job.segment, "回答数": job.n, "設問数": len(job.counts)},
+            chart_paths=charts,
+            vector_charts=job.vector_charts,
+            tables=tables,
+        )
+        os.replace(tmp, job.out_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return job.segment, time.perf_counter() - t0
+
+
+# ---- 再開用マニフェスト -----------------------------------------------------------
+
+def _read_manifest(out_dir: Path) -> dict[str, Any]:
+    p = out_dir / MANIFEST_NAME
+    if not p.exists():
+        return {}
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir: Path, manifest: dict[str, Any]) -> None:
+    p = out_dir / MANIFEST_NAME
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def is_up_to_date(job: SegmentJob, manifest: dict[str, Any]) -> bool:
+    """PDF が存在し、前回作成時と内容ハッシュが同じなら True。"""
+    entry = manifest.get(job.out_path.name)
+    return bool(entry) and entry.get("digest") == job.digest() and job.out_path.exists()
+
+
+# ---- 実行 ------------------------------------------------------------------------
+
+def run_batch(
+    jobs: Sequence[SegmentJob],
+    out_dir: Path,
+    *,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> dict[str, Any]:
+    """
+    ジョブを実行し、結果の集計（作成数・スキップ数・失敗・各レポートの所要秒数）を返す。
+    1件終わるごとに進捗を表示し、マニフェストを更新する。
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(out_dir)
+    todo = [j for j in jobs if force or not is_up_to_date(j, manifest)]
+    skipped = len(jobs) - len(todo)
+    timings: dict[str, float] = {}
+    failed: dict[str, str] = {}
+    total = len(todo)
+    t_start = time.perf_counter()
+
+    def _done(job: SegmentJob, sec: Optional[float], err: Optional[BaseException]) -> None:
+        k = len(timings) + len(failed) + 1
+        if err is None:
+            timings[job.segment] = sec or 0.0
+            manifest[job.out_path.name] = {"digest": job.digest(), "segment": job.segment, "seconds": round(sec or 0.0, 3)}
+            _write_manifest(out_dir, manifest)
+            print(f"[{k}/{total}] {job.segment}  {sec:.2f}s  -> {job.out_path}", flush=True)
+        else:
+            failed[job.segment] = f"{type(err).__name__}: {err}"
+            print(f"[{k}/{total}] {job.segment}  失敗: {failed[job.segment]}", file=sys.stderr, flush=True)
+
+    if skipped:
+        print(f"最新のためスキップ: {skipped} 件", flush=True)
+
+    if workers is None or workers <= 1 or total <= 1:
+        _init_worker()
+        for job in todo:
+            try:
+                _, sec = build_segment_report(job)
+                _done(job, sec, None)
+            except Exception as e:
+                _done(job, None, e)
+    else:
+        with worker_logging() as log_queue, ProcessPoolExecutor(
+            max_workers=min(workers, total), initializer=_init_worker, initargs=(log_queue,)
+        ) as ex:
+            pending: dict[Future, SegmentJob] = {ex.submit(build_segment_report, j): j for j in todo}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    job = pending.pop(fut)
+                    err = fut.exception()
+                    _done(job, None if err else fut.result()[1], err)
+
+    elapsed = time.perf_counter() - t_start
+    secs = list(timings.values())
+    summary = {
+        "built": len(timings),
+        "skipped": skipped,
+        "failed": failed,
+        "elapsed": round(elapsed, 3),
+        "mean_seconds": round(sum(secs) / len(secs), 3) if secs else 0.0,
+        "max_seconds": round(max(secs), 3) if secs else 0.0,
+        "timings": {k: round(v, 3) for k, v in timings.items()},
+    }
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="セグメントごとの PDF レポートを一括作成")
+    ap.add_argument("input", type=Path, help="アンケートデータ（.xlsx / .csv）")
+    ap.add_argument("--by", required=True, help="セグメントに分ける列（店舗・地域など）")
+    ap.add_argument("--questions", nargs="*", default=None, help="集計する設問列（省略時は選択式の列すべて）")
+    ap.add_argument("--out", type=Path, default=None, help="出力先（既定：data/output/reports/<by>）")
+    ap.add_argument("--title", default="アンケート集計レポート")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--sheet", default=0, help="Excel のシート名または番号")
+    ap.add_argument("--schema", nargs="?", type=Path, const=Path(), default=None, metavar="PATH",
+                    help="スキーマの型で読む（PATH 省略時は configs/schema.yaml）。"
+                         "指定時も --by と設問の列はスキーマに無くても読む")
+    ap.add_argument("--force", action="store_true", help="最新のレポートも作り直す")
+    ap.add_argument("--raster", action="store_true", help="グラフをベクターではなく PNG で埋め込む")
+    ap.add_argument("--profile", action="store_true",
+                    help="処理時間を計測し、出力先に profile.json と profile.trace.json（Chrome trace）を書く")
+    args = ap.parse_args(argv)
+    setup_logging(use_queue=True)
+    if args.profile:
+        profiling.enable()
+
+    sheet: int | str = int(args.sheet) if str(args.sheet).isdigit() else args.sheet
+    t0 = time.perf_counter()
+    schema = None
+    if args.schema is not None:
+        schema = load_schema(args.schema if args.schema != Path() else None)
+        # スキーマの列だけに絞ると --by / --questions の列が落ちるので、それらは型推論で読む
+        if schema.usecols is not None:
+            extra = [c for c in dict.fromkeys([args.by, *(args.questions or [])]) if c not in schema.usecols]
+            schema = replace(schema, columns=schema.columns + tuple(ColumnSpec(c) for c in extra))
+    df = load_table(args.input, sheet=sheet, schema=schema, cache=True)
+    questions = args.questions if args.questions is not None else default_questions(df, args.by)
+    out_dir = args.out or reports_dir() / safe_filename(args.by)
+    jobs = segment_jobs(df, args.by, questions, out_dir, title=args.title, vector_charts=not args.raster)
+    print(f"読み込み・集計: {time.perf_counter() - t0:.2f}s  セグメント {len(jobs)} 件 × 設問 {len(questions)} 問", flush=True)
+
+    with profiling.stage("run_batch", rows=len(jobs)):
+        summary = run_batch(jobs, out_dir, workers=args.workers, force=args.force)
+    print(
+        f"完了: 作成 {summary['built']} 件 / スキップ {summary['skipped']} 件 / 失敗 {len(summary['failed'])} 件"
+        f"  合計 {summary['elapsed']:.2f}s（1件平均 {summary['mean_seconds']:.2f}s・最大 {summary['max_seconds']:.2f}s）",
+        flush=True,
+    )
+    if args.profile:
+        # ワーカープロセス内の処理は含まれない（--workers 1 なら全段階を記録する）
+        profiling.export_json(out_dir / "profile.json")
+        profiling.export_chrome_trace(out_dir / "profile.trace.json")
+        print(f"計測結果: {out_dir / 'profile.json'}", flush=True)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
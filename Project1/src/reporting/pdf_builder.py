@@ -1,8 +1,11 @@
 # src/reporting/pdf_builder.py
 from __future__ import annotations
 
+import functools
+import threading
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable, Optional, Sequence, Mapping
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Sequence, Mapping, Union
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
@@ -13,11 +16,20 @@ from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
     Image as RLImage, PageBreak, Flowable
 )
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
 from reportlab.pdfgen.canvas import Canvas
 
 import pandas as pd
 
+from ..utils.profiling import timed
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from ..viz.charts import ChartSpec
+
+# 図として渡せるもの：画像ファイルのパス / matplotlib の Figure / ChartSpec（または同じキーの dict）
+ChartInput = Union[Path, str, "Figure", "ChartSpec", Mapping[str, Any]]
+
 
 # ============================================================================
 # フォント登録（日本語CIDフォント） ※全テキストに適用すること
@@ -25,24 +37,43 @@ import pandas as pd
 JP_SANS = "HeiseiKakuGo-W5"  # ゴシック
 JP_SERIF = "HeiseiMin-W3"    # 明朝
 
+# フォント登録・スタイル生成はプロセスごとに1回だけ行う（バッチで数百件作る場合の固定費を削る）
+_fonts_ready = False
+_font_lock = threading.Lock()
+
+
 def _ensure_japanese_fonts() -> None:
-    """ReportLab に日本語の CID フォントを登録。未登録なら登録する。"""
-    try:
-        pdfmetrics.getFont(JP_SANS)
-    except Exception:
-        pdfmetrics.registerFont(UnicodeCIDFont(JP_SANS))
-    try:
-        pdfmetrics.getFont(JP_SERIF)
-    except Exception:
-        pdfmetrics.registerFont(UnicodeCIDFont(JP_SERIF))
+    """ReportLab に日本語の CID フォントを登録。未登録なら登録する（2回目以降は何もしない）。"""
+    global _fonts_ready
+    if _fonts_ready:
+        return
+    with _font_lock:
+        if _fonts_ready:
+            return
+        for name in (JP_SANS, JP_SERIF):
+            try:
+                pdfmetrics.getFont(name)
+            except Exception:
+                pdfmetrics.registerFont(UnicodeCIDFont(name))
+        _fonts_ready = True
 
 
 # ============================================================================
 # スタイル
 # ============================================================================
+@functools.lru_cache(maxsize=1)
+def _sample_styles() -> StyleSheet1:
+    """getSampleStyleSheet() は呼ぶたびに新しく作るため、1回だけ作って使い回す。"""
+    return getSampleStyleSheet()
+
+
+@functools.lru_cache(maxsize=1)
 def _build_styles() -> dict[str, ParagraphStyle]:
-    """日本語フォント適用済みの Paragraph スタイル群を生成。"""
-    base = getSampleStyleSheet()
+    """
+    日本語フォント適用済みの Paragraph スタイル群を生成（初回のみ。以降は同じ dict を返す）。
+    共有されるので、呼び出し側で変更しないこと。
+    """
+    base = _sample_styles()
     styles: dict[str, ParagraphStyle] = {}
 
     # 既定（本文）はゴシックを採用
@@ -76,6 +107,15 @@ def _build_styles() -> dict[str, ParagraphStyle]:
     return styles
 
 
+def warm_up() -> None:
+    """
+    フォント登録とスタイル生成を先に済ませておく。
+    プロセスプールの initializer に渡すと、各ワーカーの1件目のレポートが遅くならない。
+    """
+    _ensure_japanese_fonts()
+    _build_styles()
+
+
 # ============================================================================
 # ページ装飾（ヘッダー／フッター）
 # ============================================================================
@@ -123,26 +163,130 @@ def _auto_image(path: Path, max_w: float, max_h: float) -> RLImage:
     return img
 
 
+def _svg_drawing(fig: "Figure") -> Optional[Flowable]:
+    """
+    Figure を SVG としてメモリ上に書き出し、svglib で ReportLab の Drawing（ベクター）にする。
+    文字はパスとして書き出すので、PDF 側のフォントに依存しない。svglib が無ければ None。
+    """
+    try:
+        from svglib.svglib import svg2rlg
+    except ImportError:
+        return None
+    import matplotlib as mpl
+
+    buf = BytesIO()
+    with mpl.rc_context({"svg.fonttype": "path"}):
+        fig.savefig(buf, format="svg")
+    buf.seek(0)
+    return svg2rlg(buf)
+
+
+def _figure_flowable(fig: "Figure", max_w: float, max_h: float, vector: bool = True) -> Flowable:
+    """
+    Figure を、縦横比を維持して最大サイズ内に収めた Flowable にする（ディスクを経由しない）。
+    - vector=True : SVG → Drawing（ベクター。拡大しても劣化せず、PDF も小さい）
+    - vector=False または svglib が無い場合 : メモリ上の PNG を画像として埋め込む
+    """
+    drawing = _svg_drawing(fig) if vector else None
+    if drawing is not None and drawing.width > 0 and drawing.height > 0:
+        scale = min(max_w / float(drawing.width), max_h / float(drawing.height))
+        drawing.width *= scale
+        drawing.height *= scale
+        drawing.scale(scale, scale)
+        return drawing
+
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    buf.seek(0)
+    img = RLImage(buf)
+    w, h = img.imageWidth, img.imageHeight
+    if w > 0 and h > 0:
+        scale = min(max_w / float(w), max_h / float(h))
+        img.drawWidth = w * scale
+        img.drawHeight = h * scale
+    return img
+
+
+def _chart_flowable(item: ChartInput, max_w: float, max_h: float, vector: bool = True) -> Flowable:
+    """
+    図の入力（パス / Figure / ChartSpec / dict）を Flowable にする。
+    ChartSpec はここで描画し、埋め込み後に図をプールへ返す。画像ファイルが無い場合は空白で占位する。
+    """
+    if isinstance(item, (str, Path)):
+        # 空文字は Path("") がカレントディレクトリになるので、ファイルとして存在するものだけを使う
+        p = Path(item)
+        return _auto_image(p, max_w=max_w, max_h=max_h) if str(item) and p.is_file() else _sp(max_h)
+
+    from matplotlib.figure import Figure
+
+    if isinstance(item, Figure):
+        return _figure_flowable(item, max_w, max_h, vector)
+
+    from ..viz.charts import CHART_KINDS, ChartSpec, figure_scope
+
+    spec = item if isinstance(item, ChartSpec) else ChartSpec(**item)
+    if spec.kind not in CHART_KINDS:
+        raise ValueError(f"未対応のグラフ種類です: {spec.kind}")
+    with figure_scope(CHART_KINDS[spec.kind](spec.data, title=spec.title, **spec.params)) as fig:
+        return _figure_flowable(fig, max_w, max_h, vector)
+
+
 # ============================================================================
 # 表（DataFrame → Table）
 # ============================================================================
-def dataframe_table(
-    df: pd.DataFrame,
-    col_widths: Optional[Sequence[float]] = None,
-    header_bg: colors.Color = colors.HexColor("#f0f2f6"),
-    row_alt_bg: colors.Color = colors.HexColor("#fafafa"),
-    font_name: str = JP_SANS,
-    font_size: float = 9.5,
-    padding: float = 4,
-) -> Table:
+# 巨大な1つの Table はページ分割のたびに残り全行を測り直すため、行数の2乗で遅くなる。
+# そこで行の高さを最初に1回だけ測り、ページの残りの高さに収まる行数ずつ Table に分ける（_PagedTable）。
+
+# 省略行（「… 他 N 行」、最終行）のスタイル
+_SUMMARY_ROW_STYLE = TableStyle([
+    ("SPAN", (0, -1), (-1, -1)),
+    ("ALIGN", (0, -1), (-1, -1), "CENTER"),
+    ("TEXTCOLOR", (0, -1), (-1, -1), colors.HexColor("#555")),
+])
+
+
+def _cell_strings(df: pd.DataFrame) -> list[list[str]]:
+    """セルの文字列化を列単位でまとめて行う（欠損は空文字）。"""
+    cols = []
+    for c in df.columns:
+        s = df[c]
+        values = s.astype(str).to_numpy(dtype=object)
+        values[s.isna().to_numpy()] = ""
+        cols.append(values)
+    if not cols:
+        return [[] for _ in range(len(df))]
+    return [list(r) for r in zip(*cols)]
+
+
+def _natural_col_widths(
+    header: Sequence[str],
+    rows: Sequence[Sequence[str]],
+    font_name: str,
+    font_size: float,
+    padding: float,
+    sample: int = 5,
+) -> list[float]:
     """
-    pandas.DataFrame を ReportLab Table へ変換してスタイルを適用。
+    列ごとに最も長い文字列の幅から列幅を決める（分割した Table 間で列幅をそろえるため）。
+    全セルを測ると遅いので、文字数の多い上位 sample 件だけ実測する。
     """
-    data = [list(map(str, df.columns))]
-    data += [list(map(lambda x: "" if pd.isna(x) else str(x), row)) for _, row in df.iterrows()]
-
-    tbl = Table(data, colWidths=col_widths, repeatRows=1)
-    style = TableStyle([
+    widths = []
+    for j, h in enumerate(header):
+        cells = [r[j] for r in rows]
+        longest = sorted(cells, key=len, reverse=True)[:sample]
+        w = max(pdfmetrics.stringWidth(t, font_name, font_size) for t in [h, *longest])
+        widths.append(w + 2 * padding + 1)
+    return widths
+
+
+def _table_style(
+    header_bg: colors.Color,
+    row_alt_bg: colors.Color,
+    font_name: str,
+    font_size: float,
+    padding: float,
+) -> TableStyle:
+    return TableStyle([
         ("FONTNAME", (0, 0), (-1, -1), font_name),
         ("FONTSIZE", (0, 0), (-1, -1), font_size),
         ("ALIGN", (0, 0), (-1, 0), "CENTER"),
@@ -156,13 +300,165 @@ def dataframe_table(
         ("TOPPADDING", (0, 0), (-1, -1), padding),
         ("BOTTOMPADDING", (0, 0), (-1, -1), padding),
     ])
-    tbl.setStyle(style)
+
+
+def _table_rows(df: pd.DataFrame, max_rows: Optional[int]) -> tuple[list[str], list[list[str]], Optional[list[str]]]:
+    """(ヘッダ, 本体の行, 省略を示す行) を返す。max_rows を超えた分は省略行にまとめる。"""
+    header = list(map(str, df.columns))
+    n = len(df)
+    if max_rows is not None and n > max_rows:
+        rows = _cell_strings(df.iloc[:max_rows])
+        summary = [f"… 他 {n - max_rows:,} 行（全 {n:,} 行）"] + [""] * (len(header) - 1)
+        return header, rows, summary
+    return header, _cell_strings(df), None
+
+
+class _PagedTable(Flowable):
+    """
+    ヘッダ付きの表を、フレームの残りの高さに収まる行数ずつ Table に分けて配置する Flowable。
+    行の高さは作成時に1回だけ測り、分割時はその累積で行数を決める（各ページの先頭にヘッダが来る）。
+    """
+
+    def __init__(
+        self,
+        header: list[str],
+        rows: list[list[str]],
+        summary: Optional[list[str]],
+        col_widths: Optional[Sequence[float]],
+        style: TableStyle,
+        max_rows: Optional[int] = None,
+        heights: Optional[tuple[float, list[float], float]] = None,
+    ):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.summary = summary
+        self.col_widths = col_widths
+        self.style = style
+        self.max_rows = max_rows
+        # (ヘッダの高さ, 各行の高さ, 省略行の高さ)
+        self.heights = heights or self._measure()
+
+    def _measure(self) -> tuple[float, list[float], float]:
+        """
+        ヘッダ・1行・2行のセルだけの小さな Table を測り、各行の高さを行内の改行数から求める
+        （全行の Table を測ると、それだけで行数の2乗の時間がかかる）。
+        """
+        blank = [""] * len(self.header)
+        two_lines = ["x\nx"] + blank[1:]
+        sample = Table([self.header, blank, two_lines], colWidths=self.col_widths)
+        sample.setStyle(self.style)
+        sample.wrap(0, 0)
+        head, one, two = sample._rowHeights
+        leading = two - one
+        row_hs = [one + leading * max(c.count("\n") for c in r) if r else one for r in self.rows]
+        return head, row_hs, one if self.summary is not None else 0.0
+
+    def _table(self, rows: list[list[str]], summary: Optional[list[str]]) -> Table:
+        data = [self.header, *rows]
+        if summary is not None:
+            data.append(summary)
+        tbl = Table(data, colWidths=self.col_widths, repeatRows=1)
+        tbl.setStyle(self.style)
+        if summary is not None:
+            tbl.setStyle(_SUMMARY_ROW_STYLE)
+        return tbl
+
+    def wrap(self, availWidth: float, availHeight: float) -> tuple[float, float]:
+        # 測った行の高さから求める（ここで Table を作ると、ページごとに残り全行を測り直すことになる）
+        head, row_hs, summary_h = self.heights
+        if self.max_rows is not None and len(self.rows) > self.max_rows:
+            height = availHeight + 1  # 上限を超える分は split で分けさせる
+        else:
+            height = head + sum(row_hs) + summary_h
+        self.width = sum(self.col_widths) if self.col_widths else 0
+        self.height = height
+        return self.width, height
+
+    def split(self, availWidth: float, availHeight: float) -> list[Flowable]:
+        head, row_hs, summary_h = self.heights
+        room = availHeight - head
+        # 収まる行数（交互の背景色が Table の境目でずれないよう偶数にする）
+        k, used = 0, 0.0
+        limit = len(self.rows) if self.max_rows is None else min(len(self.rows), self.max_rows)
+        while k < limit and used + row_hs[k] <= room:
+            used += row_hs[k]
+            k += 1
+        if k == len(self.rows) and used + summary_h <= room:
+            return [self._table(self.rows, self.summary)]
+        k -= k % 2
+        if k < 2:
+            return []  # このフレームには置かず、次のページへ
+        rest = _PagedTable(
+            self.header, self.rows[k:], self.summary, self.col_widths, self.style,
+            max_rows=self.max_rows, heights=(head, row_hs[k:], summary_h),
+        )
+        return [self._table(self.rows[:k], None), rest]
+
+    def draw(self) -> None:
+        tbl = self._table(self.rows, self.summary)
+        tbl.wrap(self.width, self.height)
+        tbl.drawOn(self.canv, 0, 0)
+
+
+def dataframe_tables(
+    df: pd.DataFrame,
+    col_widths: Optional[Sequence[float]] = None,
+    header_bg: colors.Color = colors.HexColor("#f0f2f6"),
+    row_alt_bg: colors.Color = colors.HexColor("#fafafa"),
+    font_name: str = JP_SANS,
+    font_size: float = 9.5,
+    padding: float = 4,
+    rows_per_table: Optional[int] = None,
+    max_rows: Optional[int] = None,
+) -> list[Flowable]:
+    """
+    大きな DataFrame を、ページの残りの高さに収まる行数ずつの Table（各々ヘッダ付き）にして配置する。
+    story.extend(dataframe_tables(df)) のように使う。列幅は全 Table で共通。
+    rows_per_table を指定すると、1つの Table の行数をそれ以下にする。
+    max_rows を指定すると先頭 max_rows 行だけを載せ、残りは「… 他 N 行」の1行にまとめる。
+    """
+    _ensure_japanese_fonts()
+    header, rows, summary = _table_rows(df, max_rows)
+    if col_widths is None and header:
+        col_widths = _natural_col_widths(header, rows, font_name, font_size, padding)
+    style = _table_style(header_bg, row_alt_bg, font_name, font_size, padding)
+    if rows_per_table is not None:
+        rows_per_table = max(2, rows_per_table - rows_per_table % 2)
+    return [_PagedTable(header, rows, summary, col_widths, style, max_rows=rows_per_table)]
+
+
+def dataframe_table(
+    df: pd.DataFrame,
+    col_widths: Optional[Sequence[float]] = None,
+    header_bg: colors.Color = colors.HexColor("#f0f2f6"),
+    row_alt_bg: colors.Color = colors.HexColor("#fafafa"),
+    font_name: str = JP_SANS,
+    font_size: float = 9.5,
+    padding: float = 4,
+    max_rows: Optional[int] = None,
+) -> Table:
+    """
+    pandas.DataFrame を ReportLab Table へ変換してスタイルを適用。
+    行数の多い表は dataframe_tables（ページの残りの高さに合わせて分割）を使うこと。
+    max_rows を指定すると、超えた分は「… 他 N 行」の1行にまとめる。
+    """
+    header, rows, summary = _table_rows(df, max_rows)
+    data = [header, *rows]
+    if summary is not None:
+        data.append(summary)
+
+    tbl = Table(data, colWidths=col_widths, repeatRows=1)
+    tbl.setStyle(_table_style(header_bg, row_alt_bg, font_name, font_size, padding))
+    if summary is not None:
+        tbl.setStyle(_SUMMARY_ROW_STYLE)
     return tbl
 
 
 # ============================================================================
 # ビルド関数（カバーページ＋本文）
 # ============================================================================
+@timed()
 def build_analysis_report(
     out_path: Path,
     *,
@@ -171,9 +467,11 @@ def build_analysis_report(
     author: str | None = None,
     meta: Optional[Mapping[str, str]] = None,
     overview_kv: Optional[Mapping[str, str | int | float]] = None,
-    chart_paths: Optional[Sequence[Path]] = None,
+    chart_paths: Optional[Sequence[ChartInput]] = None,
     chart_cols: int = 2,
+    vector_charts: bool = True,
     tables: Optional[Mapping[str, pd.DataFrame]] = None,
+    table_max_rows: Optional[int] = None,
     notes: Optional[Sequence[str]] = None,
     footer_right: str = "Generated by Project1",
 ) -> Path:
@@ -181,7 +479,10 @@ def build_analysis_report(
     実用的な PDF レポートを生成する高水準API。
       - カバーページ：タイトル、サブタイトル、メタ情報
       - 本文：概要（Key-Value）、図（グリッド配置）、表（DataFrame）、所見
+        表はページ単位の Table に分割する。table_max_rows を超える行は省略行にまとめる
       - 全ページにページ番号とヘッダー/フッター
+    chart_paths には画像パスのほか、Figure や ChartSpec をそのまま渡せる。
+    Figure / ChartSpec は PNG ファイルを経由せず、vector_charts=True ならベクターで埋め込む。
     """
     _ensure_japanese_fonts()
     styles = _build_styles()
@@ -234,12 +535,8 @@ def build_analysis_report(
         # グリッド配置
         row: list[Flowable] = []
         for i, p in enumerate(chart_paths, start=1):
-            if p and Path(p).exists():
-                img = _auto_image(Path(p), max_w=max_w, max_h=max_h)
-                row.append(img)
-            else:
-                # 画像が無い場合は空スペーサで占位
-                row.append(_sp(max_h))
+            # 画像が無い場合は空スペーサで占位
+            row.append(_chart_flowable(p, max_w, max_h, vector_charts) if p is not None else _sp(max_h))
             # 1行を確定
             if i % chart_cols == 0:
                 # 画像を横に並べるため、Table を利用（枠線は消す）
@@ -263,7 +560,7 @@ def build_analysis_report(
         story.append(Paragraph("表", styles["H2"]))
         for caption, df in tables.items():
             story.append(Paragraph(caption, styles["H3"]))
-            story.append(dataframe_table(df))
+            story.extend(dataframe_tables(df, max_rows=table_max_rows))
             story.append(_sp(6))
 
     # --- Notes ---
@@ -291,9 +588,16 @@ def build_analysis_report(
 # ============================================================================
 # 互換用：最小限のシンプル関数（既存コードからの移行も考慮）
 # ============================================================================
-def build_simple_report(out_path: Path, title: str, image_paths: Iterable[Path]) -> None:
+@timed()
+def build_simple_report(
+    out_path: Path,
+    title: str,
+    image_paths: Iterable[ChartInput],
+    vector_charts: bool = True,
+) -> None:
     """
     以前のサンプル互換：タイトル＋画像並べ（1枚1段）。
+    image_paths には Figure / ChartSpec も渡せる（build_analysis_report と同じ）。
     """
     _ensure_japanese_fonts()
     styles = _build_styles()
@@ -312,7 +616,8 @@ def build_simple_report(out_path: Path, title: str, image_paths: Iterable[Path])
     max_h = 70 * mm
 
     for p in image_paths:
-        if Path(p).exists():
-            story.append(_auto_image(Path(p), max_w=max_w, max_h=max_h))
-            story.append(_sp(6))
+        if isinstance(p, (str, Path)) and not Path(p).exists():
+            continue
+        story.append(_chart_flowable(p, max_w, max_h, vector_charts))
+        story.append(_sp(6))
     doc.build(story, onFirstPage=lambda c, d: _header_footer(c, d, title))
\ No newline at end of file
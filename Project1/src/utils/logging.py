@@ -1,10 +1,16 @@
 # src/utils/logging.py
 from __future__ import annotations
 
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
+import queue
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Literal
+from typing import Any, Iterator, Optional, Literal
 
 from .paths import ensure_dir, project_root
 
@@ -18,11 +24,154 @@ DEFAULT_DATEFMT = "%Y-%m-%d %H:%M:%S"
 # Streamlit などで多重に初期化されないよう制御用フラグ
 __LOGGING_CONFIGURED = False
 
+# キューの既定の上限（超えた分は捨てて数える。ログ出力で処理を止めないため）
+DEFAULT_QUEUE_SIZE = 10_000
 
-def _make_console_handler(level: int, fmt: str, datefmt: str) -> logging.Handler:
+# 実際に書き出すハンドラ（コンソール・ファイル）と、起動中の QueueListener
+_output_handlers: list[logging.Handler] = []
+_listeners: list[logging.handlers.QueueListener] = []
+
+_dropped = 0
+_dropped_lock = threading.Lock()
+
+# ワーカーが終了時に送る「破棄した件数」のレコードに付ける属性名
+_WORKER_DROPPED_ATTR = "worker_dropped_records"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JSON 出力
+# ─────────────────────────────────────────────────────────────────────────────
+
+# LogRecord の標準属性（これ以外は logger.info(..., extra={...}) で渡された項目として出力する）
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """1レコード1行の JSON にする（ログ集約ツール向け）。extra で渡した項目も含める。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.processName,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _make_formatter(fmt: str, datefmt: str, json_format: bool) -> logging.Formatter:
+    if json_format:
+        return JsonFormatter(datefmt=datefmt)
+    return logging.Formatter(fmt=fmt, datefmt=datefmt)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# キュー経由の出力
+# ─────────────────────────────────────────────────────────────────────────────
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    レコードをキューへ入れるだけのハンドラ（書き出しは QueueListener のスレッドが行う）。
+    キューが満杯なら待たずに捨て、dropped_records() の件数に数える。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 他プロセスへ送れるよう、メッセージと例外を文字列にしておく（書式は出力側のハンドラで適用）
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _add_dropped(1)
+
+
+class _Listener(logging.handlers.QueueListener):
+    """
+    停止時の終了マーカーは満杯でも待って入れる（put_nowait だと満杯時に失敗するため）。
+    ワーカーが送ってくる破棄件数のレコードは書き出さず、このプロセスの件数に足す。
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        n = getattr(record, _WORKER_DROPPED_ATTR, None)
+        if n is not None:
+            _add_dropped(int(n))
+            return
+        super().handle(record)
+
+
+def _add_dropped(n: int) -> None:
+    global _dropped
+    with _dropped_lock:
+        _dropped += n
+
+
+def _start_listener(q: Any) -> _Listener:
+    listener = _Listener(q, *_output_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+def _stop_listener(listener: logging.handlers.QueueListener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+        listener.stop()
+
+
+def dropped_records() -> int:
+    """
+    キューが満杯のため捨てたログの件数（前回 shutdown_logging() で報告した分は除く）。
+    終了したワーカーの分も含む。
+    """
+    return _dropped
+
+
+def shutdown_logging() -> None:
+    """
+    QueueListener を止め、キューに残っているログを書き出す（終了時に自動で呼ばれる）。
+    破棄したログがあれば件数を1回だけ書き、件数を0に戻す。
+    """
+    global _dropped
+    for listener in list(_listeners):
+        _stop_listener(listener)
+    with _dropped_lock:
+        n, _dropped = _dropped, 0
+    if n:
+        # ここではもうキューを通さないので、出力ハンドラへ直接書く
+        record = logging.LogRecord(
+            "logging", logging.WARNING, __file__, 0, "キューが満杯のため %d 件のログを破棄しました", (n,), None
+        )
+        for h in _output_handlers:
+            if record.levelno >= h.level:
+                h.handle(record)
+
+
+atexit.register(shutdown_logging)
+
+
+def _make_console_handler(level: int, fmt: str, datefmt: str, json_format: bool = False) -> logging.Handler:
     handler = logging.StreamHandler()
     handler.setLevel(level)
-    handler.setFormatter(logging.Formatter(fmt=fmt, datefmt=datefmt))
+    handler.setFormatter(_make_formatter(fmt, datefmt, json_format))
     return handler
 
 
@@ -34,6 +183,7 @@ def _make_rotating_file_handler(
     max_bytes: int = 5 * 1024 * 1024,  # 5MB
     backup_count: int = 3,
     encoding: str = "utf-8",
+    json_format: bool = False,
 ) -> logging.Handler:
     ensure_dir(filepath.parent)
     handler = logging.handlers.RotatingFileHandler(
@@ -43,7 +193,7 @@ def _make_rotating_file_handler(
         encoding=encoding
     )
     handler.setLevel(level)
-    handler.setFormatter(logging.Formatter(fmt=fmt, datefmt=datefmt))
+    handler.setFormatter(_make_formatter(fmt, datefmt, json_format))
     return handler
 
 
@@ -59,6 +209,9 @@ def setup_logging(
     datefmt: str = DEFAULT_DATEFMT,
     root_level: int = logging.INFO,
     reset: bool = False,
+    use_queue: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    json_format: bool = False,
 ) -> None:
     """
     ロギングの全体設定を行う。何度呼んでも安全（基本的に最初の1回でOK）。
@@ -79,13 +232,24 @@ def setup_logging(
         ルートロガーのレベル。
     reset : bool
         True の場合、既存のハンドラをすべて外して再設定。
+    use_queue : bool
+        True の場合、ルートロガーにはキューへ入れるだけのハンドラを付け、
+        コンソール・ファイルへの書き出し（ローテーション含む）は1本の QueueListener スレッドで行う。
+    queue_size : int
+        use_queue=True のときのキューの上限。満杯の間のログは捨てて dropped_records() に数える。
+    json_format : bool
+        True の場合、1レコード1行の JSON で出力する。
     """
     global __LOGGING_CONFIGURED
 
     root_logger = logging.getLogger()
     if reset:
+        shutdown_logging()
         for h in list(root_logger.handlers):
             root_logger.removeHandler(h)
+            if h in _output_handlers:
+                h.close()
+        _output_handlers.clear()
         __LOGGING_CONFIGURED = False
 
     if __LOGGING_CONFIGURED:
@@ -96,17 +260,93 @@ def setup_logging(
     root_logger.setLevel(root_level)
 
     # Console handler
-    ch = _make_console_handler(console_level, fmt, datefmt)
-    root_logger.addHandler(ch)
+    _output_handlers.append(_make_console_handler(console_level, fmt, datefmt, json_format))
 
     # File handler (optional)
     if file_level is not None:
         if file_path is None:
             file_path = project_root() / "logs" / "app.log"
-        fh = _make_rotating_file_handler(file_path, file_level, fmt, datefmt)
-        root_logger.addHandler(fh)
+        _output_handlers.append(_make_rotating_file_handler(file_path, file_level, fmt, datefmt, json_format=json_format))
+
+    if use_queue:
+        q: queue.Queue = queue.Queue(maxsize=queue_size)
+        root_logger.addHandler(BoundedQueueHandler(q))
+        _start_listener(q)
+    else:
+        for h in _output_handlers:
+            root_logger.addHandler(h)
+
+    __LOGGING_CONFIGURED = True
 
+
+# ─────────────────────────────────────────────────────────────────────────────
+# プロセスプール（ワーカーのログを親プロセスで書き出す）
+# ─────────────────────────────────────────────────────────────────────────────
+#
+# ワーカーごとにファイルへ書くとローテーションが競合するため、ワーカーはレコードを
+# multiprocessing のキューへ送るだけにし、親プロセスの QueueListener がまとめて書き出す。
+#
+#   with worker_logging() as log_queue:
+#       with ProcessPoolExecutor(initializer=setup_worker_logging, initargs=(log_queue,)) as ex:
+#           ...
+
+@contextmanager
+def worker_logging(queue_size: int = DEFAULT_QUEUE_SIZE, mp_context: Any = None) -> Iterator[Any]:
+    """
+    ワーカーから受け取るキューを作り、親プロセスの出力ハンドラへ流すリスナーを起動する。
+    with を抜けるとキューに残ったログを書き出してからリスナーを止める。
+    mp_context はプールに渡すものと同じにする（spawn のプールなら get_context("spawn")）。
+    setup_logging() 前に呼んだ場合は既定の設定で初期化する。
+    """
+    import multiprocessing
+
+    if not _output_handlers:
+        setup_logging()
+    q = (mp_context or multiprocessing.get_context()).Queue(maxsize=queue_size)
+    listener = _start_listener(q)
+    try:
+        yield q
+    finally:
+        _stop_listener(listener)
+        q.close()
+
+
+def _report_worker_dropped(log_queue: Any) -> None:
+    """ワーカー終了時：破棄した件数を親プロセスへ送る（親の dropped_records() に足される）。"""
+    global _dropped
+    with _dropped_lock:
+        n, _dropped = _dropped, 0
+    if not n:
+        return
+    record = logging.LogRecord("logging", logging.WARNING, __file__, 0, "", None, None)
+    setattr(record, _WORKER_DROPPED_ATTR, n)
+    try:
+        log_queue.put(record, timeout=5)
+    except (queue.Full, OSError, ValueError):
+        pass  # 親がもう受け取れない場合は諦める
+
+
+def setup_worker_logging(log_queue: Any, level: int = logging.INFO) -> None:
+    """
+    ワーカープロセスの初期化用。ルートロガーのハンドラを、親プロセスへ送るハンドラだけにする。
+    キューが満杯なら待たずに捨て、その件数はワーカー終了時に親プロセスへ送る。
+    """
+    global __LOGGING_CONFIGURED, _dropped
+    from multiprocessing import util
+
+    root_logger = logging.getLogger()
+    for h in list(root_logger.handlers):
+        root_logger.removeHandler(h)
+    # fork で引き継いだ親のリスナー・ハンドラはこのプロセスでは使わない
+    _listeners.clear()
+    _output_handlers.clear()
+    _dropped = 0
+    root_logger.addHandler(BoundedQueueHandler(log_queue))
+    root_logger.setLevel(level)
     __LOGGING_CONFIGURED = True
+    # ワーカーは atexit を実行せずに終わるため、multiprocessing の終了処理で送る
+    # （キュー自身の終了処理（優先度 10）より先に動くよう、優先度を高くする）
+    util.Finalize(None, _report_worker_dropped, args=(log_queue,), exitpriority=100)
 
 
 def get_logger(name: str = "app") -> logging.Logger:
@@ -1,6 +1,8 @@
 # src/utils/paths.py
 from __future__ import annotations
 
+import functools
+from dataclasses import dataclass
 from pathlib import Path
 import sys
 import os
@@ -22,13 +24,32 @@ def _meipass() -> Optional[Path]:
     return None
 
 
+# ------------------------------------------------------------------------------
+# 場所の上書き（環境変数 または configure_paths）
+# ------------------------------------------------------------------------------
+# 出力先を高速なローカルディスクや tmpfs に移したいとき用。優先順位は API > 環境変数 > 既定。
+#   PROJECT1_ROOT        : プロジェクトルート
+#   PROJECT1_DATA_DIR    : data/（input / output / intermediate をこの下に置く）
+#   PROJECT1_OUTPUT_DIR  : data/output/（charts / reports をこの下に置く）
+ENV_ROOT = "PROJECT1_ROOT"
+ENV_DATA_DIR = "PROJECT1_DATA_DIR"
+ENV_OUTPUT_DIR = "PROJECT1_OUTPUT_DIR"
+
+_overrides: dict[str, Path] = {}
+
+
+def _override(key: str, env: str) -> Optional[Path]:
+    if key in _overrides:
+        return _overrides[key]
+    value = os.environ.get(env)
+    return Path(value).expanduser().resolve() if value else None
+
+
 # ------------------------------------------------------------------------------
 # プロジェクトルート決定
 # ------------------------------------------------------------------------------
-def project_root() -> Path:
+def _default_root() -> Path:
     """
-    プロジェクトのルートディレクトリを返す。
-
     - 開発時（ソース実行）: このファイルから 2 つ上がルート（…/src/utils/ → ルート）
     - PyInstallerバイナリ: 実行ファイルの親ディレクトリをルートとみなす
       （Windows: app.exe のある場所、macOS: app.app/Contents/MacOS/ の親など）
@@ -41,14 +62,94 @@ def project_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
+@dataclass(frozen=True)
+class PathLayout:
+    """ディレクトリ構成（初回に1回だけ決めて使い回す）。"""
+    root: Path
+    data: Path
+    input: Path
+    output: Path
+    charts: Path
+    reports: Path
+    intermediate: Path
+    assets: Path
+    fonts: Path
+    styles: Path
+
+
+@functools.lru_cache(maxsize=None)
+def layout() -> PathLayout:
+    """
+    現在のディレクトリ構成。結果はキャッシュされるので、
+    環境変数を後から変えた場合は invalidate_paths() を呼ぶ。
+    """
+    root = _override("root", ENV_ROOT) or _default_root()
+    data = _override("data", ENV_DATA_DIR) or root / "data"
+    output = _override("output", ENV_OUTPUT_DIR) or data / "output"
+    assets = root / "assets"
+    return PathLayout(
+        root=root,
+        data=data,
+        input=data / "input",
+        output=output,
+        charts=output / "charts",
+        reports=output / "reports",
+        intermediate=data / "intermediate",
+        assets=assets,
+        fonts=assets / "fonts",
+        styles=assets / "styles",
+    )
+
+
+def project_root() -> Path:
+    """
+    プロジェクトのルートディレクトリを返す（PROJECT1_ROOT / configure_paths で上書き可）。
+    """
+    return layout().root
+
+
+def configure_paths(
+    *,
+    root: str | Path | None = None,
+    data_dir: str | Path | None = None,
+    output_dir: str | Path | None = None,
+) -> PathLayout:
+    """
+    ルート・data・output の場所を上書きする（指定したものだけ。環境変数より優先）。
+    例: configure_paths(output_dir="/dev/shm/project1")  # 出力を tmpfs へ
+    """
+    for key, value in (("root", root), ("data", data_dir), ("output", output_dir)):
+        if value is not None:
+            _overrides[key] = Path(value).expanduser().resolve()
+    invalidate_paths()
+    return layout()
+
+
+def reset_paths() -> None:
+    """configure_paths の上書きを取り消す（環境変数・既定に戻る）。"""
+    _overrides.clear()
+    invalidate_paths()
+
+
+def invalidate_paths() -> None:
+    """
+    キャッシュしたディレクトリ構成と resource_path の結果を捨てる。
+    環境変数の変更、PyInstaller の同梱リソースの差し替え後などに呼ぶ。
+    """
+    layout.cache_clear()
+    resource_path.cache_clear()
+
+
 # ------------------------------------------------------------------------------
 # リソース取得（assets などを PyInstaller の展開先／プロジェクトから安全に参照）
 # ------------------------------------------------------------------------------
+@functools.lru_cache(maxsize=256)
 def resource_path(relative: str | Path) -> Path:
     """
     配布後（PyInstaller）でも開発時でも、相対パスで同梱リソースを取得する。
     - バイナリ実行時: _MEIPASS（展開先）を優先
     - ソース実行時  : project_root を基準に結合
+    結果はキャッシュする（取り直すときは invalidate_paths()）。
     """
     rel = Path(relative)
     mp = _meipass()
@@ -65,31 +166,31 @@ def resource_path(relative: str | Path) -> Path:
 # 主要ディレクトリ（Project1 の構成に準拠）
 # ------------------------------------------------------------------------------
 def data_dir() -> Path:
-    return project_root() / "data"
+    return layout().data
 
 def input_dir() -> Path:
-    return data_dir() / "input"
+    return layout().input
 
 def output_dir() -> Path:
-    return data_dir() / "output"
+    return layout().output
 
 def charts_dir() -> Path:
-    return output_dir() / "charts"
+    return layout().charts
 
 def reports_dir() -> Path:
-    return output_dir() / "reports"
+    return layout().reports
 
 def intermediate_dir() -> Path:
-    return data_dir() / "intermediate"
+    return layout().intermediate
 
 def assets_dir() -> Path:
-    return project_root() / "assets"
+    return layout().assets
 
 def fonts_dir() -> Path:
-    return assets_dir() / "fonts"
+    return layout().fonts
 
 def styles_dir() -> Path:
-    return assets_dir() / "styles"
+    return layout().styles
 
 
 # ------------------------------------------------------------------------------
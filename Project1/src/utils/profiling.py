@@ -0,0 +1,352 @@
+# src/utils/profiling.py
+"""
+処理段階ごとの計測（読み込み → 集計 → グラフ → PDF のどこに時間がかかっているか）。
+
+    from src.utils.profiling import stage, timed
+
+    @timed(rows="result")
+    def load_table(...): ...
+
+    with stage("集計", rows=len(df)) as sp:
+        ...
+        sp.meta["設問数"] = len(questions)
+
+- 無効時（既定）は、フラグを1回見て何もしない（計測用のオブジェクトも作らない）
+- 有効時は 経過時間・CPU 時間・件数・メモリ（RSS または tracemalloc のピーク）を段階ごとに記録し、
+  ロガー "profiling" に DEBUG で出す（setup_logging(json_format=True) なら項目ごとに JSON へ出る）
+- export_json() / export_chrome_trace() で1回の実行分をファイルに書き出す
+  （Chrome trace は chrome://tracing や https://ui.perfetto.dev で開ける）
+- 環境変数 PROJECT1_PROFILE=1（tracemalloc なら PROJECT1_PROFILE=tracemalloc）でも有効になる
+- 記録するのは呼び出したプロセス内だけ（プロセスプールのワーカー内の処理は含まれない）
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Literal, Optional, TypeVar
+
+from .logging import get_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+logger = get_logger("profiling")
+
+MemoryMode = Literal["rss", "tracemalloc", "none"]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 記録
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class StageRecord:
+    """1段階分の計測結果。start / wall などの時間は秒（start は enable() からの経過）。"""
+    name: str
+    start: float
+    wall: float
+    cpu: float
+    rows: Optional[int] = None
+    depth: int = 0
+    parent: Optional[str] = None
+    rss_mb: Optional[float] = None        # 終了時の RSS
+    max_rss_mb: Optional[float] = None    # 終了時点までのプロセスの最大 RSS
+    peak_mb: Optional[float] = None       # tracemalloc のピーク（段階の開始時点からの増分）
+    thread: int = 0
+    meta: dict[str, Any] = field(default_factory=dict)
+
+
+class Span:
+    """stage() の with で受け取るオブジェクト。rows / meta は処理中に設定してよい。"""
+    __slots__ = ("name", "rows", "meta", "_t0", "_c0", "_mem0", "_child_peak")
+
+    def __init__(self, name: str, rows: Optional[int], meta: dict[str, Any]):
+        self.name = name
+        self.rows = rows
+        self.meta = meta
+        self._t0 = 0.0
+        self._c0 = 0.0
+        self._mem0 = 0
+        self._child_peak = 0
+
+
+class _NullSpan:
+    """無効時に返す何もしない Span（1つを使い回す）。"""
+    __slots__ = ()
+    name = ""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        pass
+
+    @property
+    def rows(self) -> None:
+        return None
+
+    @property
+    def meta(self) -> dict[str, Any]:
+        return {}
+
+
+_NULL_SPAN = _NullSpan()
+
+_enabled = False
+_memory: MemoryMode = "rss"
+_origin = 0.0
+_records: list[StageRecord] = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _current_rss_mb() -> Optional[float]:
+    """現在の RSS（MB）。/proc が無い環境では None。"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+
+def _stack() -> list[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def enable(memory: MemoryMode = "rss") -> None:
+    """
+    計測を有効にし、記録を空にする。
+    memory="tracemalloc" は段階ごとの割り当てピークを測れるが、処理が数割遅くなる。
+    """
+    global _enabled, _memory, _origin
+    with _lock:
+        _records.clear()
+    _memory = memory
+    _origin = time.perf_counter()
+    if memory == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable() -> None:
+    """計測を止める（記録は残る）。"""
+    global _enabled
+    _enabled = False
+    if _memory == "tracemalloc" and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """記録を空にし、時刻の起点を今にする（Streamlit の再実行ごとなど）。"""
+    global _origin
+    with _lock:
+        _records.clear()
+    _origin = time.perf_counter()
+
+
+def records() -> list[StageRecord]:
+    """記録のコピー（開始順）。"""
+    with _lock:
+        return sorted(_records, key=lambda r: r.start)
+
+
+@contextmanager
+def _measure(name: str, rows: Optional[int], meta: dict[str, Any]) -> Iterator[Span]:
+    span = Span(name, rows, meta)
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    tracing = _memory == "tracemalloc" and tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        span._mem0 = tracemalloc.get_traced_memory()[0]
+    stack.append(span)
+    span._c0 = time.process_time()
+    span._t0 = time.perf_counter()
+    try:
+        yield span
+    finally:
+        wall = time.perf_counter() - span._t0
+        cpu = time.process_time() - span._c0
+        stack.pop()
+        peak = None
+        if tracing:
+            # 内側の段階で reset_peak() されるので、内側のピークも合わせて最大を取る
+            # （ピークは絶対値で受け渡し、記録するのは開始時点からの増分）
+            peak_bytes = max(tracemalloc.get_traced_memory()[1], span._child_peak)
+            if parent is not None:
+                parent._child_peak = max(parent._child_peak, peak_bytes)
+            peak = round(max(peak_bytes - span._mem0, 0) / 1e6, 3)
+        rec = StageRecord(
+            name=name,
+            start=span._t0 - _origin,
+            wall=wall,
+            cpu=cpu,
+            rows=span.rows,
+            depth=len(stack),
+            parent=parent.name if parent else None,
+            rss_mb=_current_rss_mb() if _memory == "rss" else None,
+            max_rss_mb=_max_rss_mb() if _memory == "rss" else None,
+            peak_mb=peak,
+            thread=threading.get_ident(),
+            meta=span.meta,
+        )
+        with _lock:
+            _records.append(rec)
+        logger.debug(
+            "%s: %.1fms (cpu %.1fms) rows=%s", name, wall * 1000, cpu * 1000, span.rows,
+            extra={"stage": name, "wall_ms": round(wall * 1000, 3), "cpu_ms": round(cpu * 1000, 3), "rows": span.rows},
+        )
+
+
+def stage(name: str, rows: Optional[int] = None, **meta: Any) -> Any:
+    """段階を計測する with 用のコンテキスト。無効時は何もしない。"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _measure(name, rows, meta)
+
+
+def _row_count(obj: Any) -> Optional[int]:
+    shape = getattr(obj, "shape", None)
+    if shape:
+        return int(shape[0])
+    return None
+
+
+def timed(
+    name: Optional[str] = None,
+    *,
+    rows: Optional[Literal["result", "input"]] = None,
+) -> Callable[[F], F]:
+    """
+    関数を1段階として計測するデコレータ。無効時は元の関数をそのまま呼ぶ。
+    rows="result" なら戻り値の行数、"input" なら最初の引数（DataFrame）の行数を記録する。
+    """
+    def deco(func: F) -> F:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _measure(label, _row_count(args[0]) if rows == "input" and args else None, {}) as span:
+                result = func(*args, **kwargs)
+                if rows == "result":
+                    span.rows = _row_count(result)
+                return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 集計・書き出し
+# ─────────────────────────────────────────────────────────────────────────────
+
+def summary() -> list[dict[str, Any]]:
+    """段階名ごとの 回数・合計/平均/最大の経過時間・CPU 時間・件数・メモリ（合計時間の降順）。"""
+    groups: dict[str, list[StageRecord]] = {}
+    for r in records():
+        groups.setdefault(r.name, []).append(r)
+    out = []
+    for name, rs in groups.items():
+        walls = [r.wall for r in rs]
+        peaks = [r.peak_mb for r in rs if r.peak_mb is not None]
+        rss = [r.max_rss_mb for r in rs if r.max_rss_mb is not None]
+        out.append({
+            "stage": name,
+            "calls": len(rs),
+            "total_ms": round(sum(walls) * 1000, 2),
+            "mean_ms": round(sum(walls) / len(rs) * 1000, 2),
+            "max_ms": round(max(walls) * 1000, 2),
+            "cpu_ms": round(sum(r.cpu for r in rs) * 1000, 2),
+            "rows": sum(r.rows for r in rs if r.rows is not None) if any(r.rows is not None for r in rs) else None,
+            "peak_mb": max(peaks) if peaks else None,
+            "max_rss_mb": max(rss) if rss else None,
+        })
+    return sorted(out, key=lambda d: -d["total_ms"])
+
+
+def _write_json(path: Path | str, data: Any) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def export_json(path: Path | str) -> Path:
+    """1回の実行分の記録（各段階と段階名ごとの集計）を JSON に書く。"""
+    return _write_json(path, {
+        "memory": _memory,
+        "records": [asdict(r) for r in records()],
+        "summary": summary(),
+    })
+
+
+def chrome_trace() -> dict[str, Any]:
+    """Chrome trace 形式（Trace Event Format の "X" イベント）にする。"""
+    pid = os.getpid()
+    events = []
+    for r in records():
+        args = {"rows": r.rows, "cpu_ms": round(r.cpu * 1000, 3), **r.meta}
+        if r.peak_mb is not None:
+            args["peak_mb"] = r.peak_mb
+        if r.rss_mb is not None:
+            args["rss_mb"] = round(r.rss_mb, 1)
+        events.append({
+            "name": r.name,
+            "cat": "stage",
+            "ph": "X",
+            "ts": round(r.start * 1e6, 1),
+            "dur": round(r.wall * 1e6, 1),
+            "pid": pid,
+            "tid": r.thread,
+            "args": args,
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path: Path | str) -> Path:
+    return _write_json(path, chrome_trace())
+
+
+# 環境変数での有効化（Streamlit やバッチをコードを変えずに計測したいとき）
+_env = os.environ.get("PROJECT1_PROFILE", "").strip().lower()
+if _env and _env not in ("0", "false", "no"):
+    enable("tracemalloc" if _env == "tracemalloc" else "rss")
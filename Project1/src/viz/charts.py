@@ -1,21 +1,42 @@
 # src/viz/charts.py
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import shutil
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, Optional, Sequence
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Union
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import matplotlib as mpl
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.colors import to_rgb
+from matplotlib.patches import Circle
 import pandas as pd
 
-from .themes import use_default_theme
+from ..utils.paths import charts_dir, ensure_dir
+from ..utils.profiling import timed
+from .themes import current_theme, get_theme, rc_colors, use_default_theme, use_theme
 
 # 既定テーマ（ダーク表示・保存は白背景）を適用
 use_default_theme()
 
 # アクセントカラー（UIと統一したい場合はここを変更）
 ACCENT = "#00b894"
-PALETTE = sns.color_palette([ACCENT])
+PALETTE = [to_rgb(ACCENT)]
+
+
+def _sns():
+    """seaborn は scipy まで読み込み重いので、描画するときに初めて import する"""
+    import seaborn as sns
+
+    return sns
 
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -34,30 +55,157 @@ def _safe_ylim(ax, values: Iterable[float], pad_ratio: float = 1.15) -> None:
     vmax = max(vals) if vals else 0
     ax.set_ylim(0, vmax * pad_ratio if vmax > 0 else 1)
 
-def _save_fig(fig: plt.Figure, out: Optional[Path]) -> None:
+def _save_fig(fig: Figure, out: Optional[Path]) -> None:
     if out:
         out.parent.mkdir(parents=True, exist_ok=True)
         fig.savefig(out)
 
 
+# ────────────────────────────────────────────────────────────────────────────────
+# Figure の再利用プール
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# plt.subplots() で作った図は pyplot が参照を持ち続けるため、閉じ忘れると
+# 長時間動く Streamlit サーバではメモリが増え続ける。
+# ここでは pyplot を介さずに Figure を作り（オブジェクト指向 API）、使い終わった図は
+# release_figure() でプールへ返して、同じサイズ・テーマの次の描画で clear して使い回す。
+# プールに入りきらない図はその場で破棄する。件数は figure_stats() で確認できる。
+
+class FigurePool:
+    """
+    サイズ・解像度・背景色が同じ Figure を使い回すプール（スレッドセーフ）。
+    - acquire(): 空の Figure と Axes を1つ返す
+    - release(fig): 図を clear してプールへ返す（max_idle を超える分は破棄）
+    """
+
+    def __init__(self, max_idle: int = 8) -> None:
+        self.max_idle = max_idle
+        self._idle: dict[tuple, list[Figure]] = {}
+        self._keys: "weakref.WeakKeyDictionary[Figure, tuple]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.discarded = 0
+        self._live = 0  # 生存している（GC されていない）図の数
+
+    @staticmethod
+    def _current_key() -> tuple:
+        rc = mpl.rcParams
+        return (tuple(rc["figure.figsize"]), rc["figure.dpi"], str(rc["figure.facecolor"]), str(rc["figure.edgecolor"]))
+
+    def _on_collect(self) -> None:
+        with self._lock:
+            self._live -= 1
+
+    def acquire(self) -> tuple[Figure, Axes]:
+        key = self._current_key()
+        with self._lock:
+            idle = self._idle.get(key)
+            fig = idle.pop() if idle else None
+            if fig is not None:
+                self.reused += 1
+            else:
+                self.created += 1
+                self._live += 1
+        if fig is None:
+            fig = Figure()
+            self._keys[fig] = key
+            weakref.finalize(fig, self._on_collect)
+        ax = fig.add_subplot()
+        return fig, ax
+
+    def release(self, fig: Figure) -> None:
+        """図を空にしてプールへ返す。返した後の fig は使わないこと。"""
+        key = self._keys.get(fig)
+        fig.clear()
+        with self._lock:
+            self.released += 1
+            if key is None:  # プール外で作られた図
+                return
+            idle = self._idle.setdefault(key, [])
+            if len(idle) >= self.max_idle or any(f is fig for f in idle):
+                self.discarded += 1
+                return
+            # 一時的にサイズ・背景色を変えた図も、元に戻してから再利用する
+            fig.set_size_inches(key[0], forward=False)
+            fig.patch.set_facecolor(key[2])
+            idle.append(fig)
+
+    def clear(self) -> None:
+        """待機中の図をすべて破棄する。"""
+        with self._lock:
+            self.discarded += sum(len(v) for v in self._idle.values())
+            self._idle.clear()
+
+    def stats(self) -> dict[str, int]:
+        """作成数・再利用数・返却数・破棄数・待機中・生存中（GC 前）の図の数。"""
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "released": self.released,
+                "discarded": self.discarded,
+                "idle": sum(len(v) for v in self._idle.values()),
+                "live": self._live,
+            }
+
+
+FIGURE_POOL = FigurePool()
+
+
+def release_figure(fig: Figure) -> None:
+    """描画関数が返した図を使い終わったら呼ぶ（プールへ返して再利用する）。"""
+    FIGURE_POOL.release(fig)
+
+
+@contextmanager
+def figure_scope(fig: Figure) -> Iterator[Figure]:
+    """
+    描画関数の返り値を with で使い、抜けるときに確実にプールへ返す。
+    例：
+        with figure_scope(bar_from_counts(s, "性別分布")) as fig:
+            st.pyplot(fig)
+    """
+    try:
+        yield fig
+    finally:
+        release_figure(fig)
+
+
+def figure_stats() -> dict[str, int]:
+    """既定プールの統計（メモリが増え続けていないかの確認用）。"""
+    return FIGURE_POOL.stats()
+
+
+def _new_figure() -> tuple[Figure, Axes]:
+    """
+    pyplot を介さずに Figure / Axes を作る（既定プールから取得）。
+    pyplot のグローバルな「現在の図」を使わないので、スレッド・ワーカープロセスからも安全に描ける。
+    サイズ・色は現在の rcParams（テーマ）に従う。
+    """
+    return FIGURE_POOL.acquire()
+
+
 # ────────────────────────────────────────────────────────────────────────────────
 # 円グラフ
 # ────────────────────────────────────────────────────────────────────────────────
 
+@timed()
 def pie_from_counts(
     series: pd.Series,
     title: str = "",
     out: Optional[Path] = None,
     autopct: str = "%1.1f%%",
     startangle: int = 90,
-) -> plt.Figure:
+) -> Figure:
     """
     件数 Series を円グラフにする。
     - series.index: ラベル、series.values: 件数
     - 日本語ラベル対応
     """
     s = _ensure_str_index(series.dropna())
-    fig, ax = plt.subplots()
+    fig, ax = _new_figure()
     ax.pie(s.values, labels=s.index, autopct=autopct, startangle=startangle)
     ax.set_title(title)
     ax.axis("equal")  # 真円
@@ -66,6 +214,7 @@ def pie_from_counts(
     return fig
 
 
+@timed()
 def donut_from_counts(
     series: pd.Series,
     title: str = "",
@@ -73,17 +222,17 @@ def donut_from_counts(
     autopct: str = "%1.1f%%",
     startangle: int = 90,
     width: float = 0.35,
-) -> plt.Figure:
+) -> Figure:
     """
     ドーナツ（穴あき）円グラフ。中央に空白を作って情報量の多い凡例でも見やすく。
     """
     s = _ensure_str_index(series.dropna())
-    fig, ax = plt.subplots()
+    fig, ax = _new_figure()
     wedges, texts, autotexts = ax.pie(
         s.values, labels=s.index, autopct=autopct, startangle=startangle, wedgeprops=dict(width=1.0)
     )
     # ドーナツ化：内側に白円を重ねる
-    circle = plt.Circle((0, 0), 1.0 - width, color="white")
+    circle = Circle((0, 0), 1.0 - width, color="white")
     ax.add_artist(circle)
     ax.set_title(title)
     ax.axis("equal")
@@ -96,6 +245,7 @@ def donut_from_counts(
 # 棒グラフ（単変量）
 # ────────────────────────────────────────────────────────────────────────────────
 
+@timed()
 def bar_from_counts(
     series: pd.Series,
     title: str = "",
@@ -104,23 +254,24 @@ def bar_from_counts(
     out: Optional[Path] = None,
     color: str = ACCENT,
     rotation: int = 20,
-) -> plt.Figure:
+) -> Figure:
     """
     件数 Series を棒グラフで表示。
     """
     s = _ensure_str_index(series)
-    fig, ax = plt.subplots()
-    sns.barplot(x=s.index, y=s.values, ax=ax, color=color)
+    fig, ax = _new_figure()
+    _sns().barplot(x=s.index, y=s.values, ax=ax, color=color)
     ax.set_title(title)
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
     _safe_ylim(ax, s.values)
-    plt.xticks(rotation=rotation)
+    ax.tick_params(axis="x", labelrotation=rotation)
     fig.tight_layout()
     _save_fig(fig, out)
     return fig
 
 
+@timed()
 def bar_from_percent(
     series: pd.Series,
     title: str = "",
@@ -129,18 +280,18 @@ def bar_from_percent(
     out: Optional[Path] = None,
     color: str = ACCENT,
     rotation: int = 20,
-) -> plt.Figure:
+) -> Figure:
     """
     割合 Series を棒グラフで表示。
     """
     s = _ensure_str_index(series)
-    fig, ax = plt.subplots()
-    sns.barplot(x=s.index, y=s.values, ax=ax, color=color)
+    fig, ax = _new_figure()
+    _sns().barplot(x=s.index, y=s.values, ax=ax, color=color)
     ax.set_title(title)
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
     ax.set_ylim(0, 100)
-    plt.xticks(rotation=rotation)
+    ax.tick_params(axis="x", labelrotation=rotation)
     fig.tight_layout()
     _save_fig(fig, out)
     return fig
@@ -150,6 +301,7 @@ def bar_from_percent(
 # 棒グラフ（グループ集計）
 # ────────────────────────────────────────────────────────────────────────────────
 
+@timed()
 def bar_group_mean(
     series_mean: pd.Series,
     title: str = "",
@@ -158,24 +310,25 @@ def bar_group_mean(
     out: Optional[Path] = None,
     color: str = ACCENT,
     rotation: int = 0,
-) -> plt.Figure:
+) -> Figure:
     """
     groupby した平均値 Series を棒グラフに。
     例：mean_by(df, "年代", "満足度") の返り値を渡す。
     """
     s = _ensure_str_index(series_mean)
-    fig, ax = plt.subplots()
-    sns.barplot(x=s.index, y=s.values, ax=ax, color=color)
+    fig, ax = _new_figure()
+    _sns().barplot(x=s.index, y=s.values, ax=ax, color=color)
     ax.set_title(title)
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
     _safe_ylim(ax, s.values)
-    plt.xticks(rotation=rotation)
+    ax.tick_params(axis="x", labelrotation=rotation)
     fig.tight_layout()
     _save_fig(fig, out)
     return fig
 
 
+@timed()
 def stacked_bar_from_dataframe(
     df_counts: pd.DataFrame,
     title: str = "",
@@ -184,7 +337,7 @@ def stacked_bar_from_dataframe(
     out: Optional[Path] = None,
     palette: Optional[Sequence[str]] = None,
     rotation: int = 0,
-) -> plt.Figure:
+) -> Figure:
     """
     クロス集計（件数）の DataFrame を積み上げ棒グラフにする。
     行が x 軸、列がカテゴリになる想定。
@@ -193,9 +346,9 @@ def stacked_bar_from_dataframe(
     if palette is None:
         # 列数に合わせてシーケンシャルな色を生成（アクセントを基点）
         # seaborn の deep で十分見やすい配色を使用
-        palette = sns.color_palette("deep", n_colors=df_counts.shape[1])
+        palette = _sns().color_palette("deep", n_colors=df_counts.shape[1])
 
-    fig, ax = plt.subplots()
+    fig, ax = _new_figure()
     bottom = None
     for i, col in enumerate(df_counts.columns):
         values = df_counts[col].values
@@ -205,8 +358,233 @@ def stacked_bar_from_dataframe(
     ax.set_title(title)
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
-    plt.xticks(rotation=rotation)
+    ax.tick_params(axis="x", labelrotation=rotation)
     ax.legend(title="カテゴリ", bbox_to_anchor=(1.02, 1.0), loc="upper left")
     fig.tight_layout()
     _save_fig(fig, out)
     return fig
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# 描画キャッシュ（内容アドレス方式の PNG キャッシュ）
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# Streamlit の再実行のたびに同じグラフを matplotlib で描き直さないよう、
+# 「データの値・グラフ種類・タイトル等の引数・テーマ・サイズ」のハッシュをファイル名にして PNG を保存する。
+# 同じキーのファイルがあれば matplotlib を一切使わずにそのパス（またはバイト列）を返す。
+# キャッシュは charts_dir()/cache に置き、最終利用時刻の古いものから削除する（LRU）。
+
+CHART_CACHE_MAX_FILES = 500
+CHART_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# render_cached で指定できるグラフ種類
+CHART_KINDS: dict[str, Callable[..., Figure]] = {
+    "pie": pie_from_counts,
+    "donut": donut_from_counts,
+    "bar_counts": bar_from_counts,
+    "bar_percent": bar_from_percent,
+    "bar_mean": bar_group_mean,
+    "stacked_bar": stacked_bar_from_dataframe,
+}
+
+
+def chart_cache_dir() -> Path:
+    """描画キャッシュの保存先（data/output/charts/cache）。"""
+    return charts_dir() / "cache"
+
+
+def chart_key(
+    kind: str,
+    data: pd.Series | pd.DataFrame,
+    *,
+    title: str = "",
+    theme: Optional[str] = None,
+    size: Optional[tuple[float, float]] = None,
+    params: Optional[dict[str, Any]] = None,
+) -> str:
+    """グラフの内容を決める要素からキャッシュキー（ハッシュ文字列）を作る。"""
+    h = hashlib.blake2b(digest_size=16)
+    meta = {
+        "kind": kind, "title": title, "theme": theme,
+        "size": list(size) if size else None, "params": params or {},
+        # 行の値のハッシュには列名・dtype が含まれないため別に入れる（凡例・表示に影響する）
+        "columns": [str(c) for c in data.columns] if isinstance(data, pd.DataFrame) else None,
+        "dtypes": [str(t) for t in data.dtypes] if isinstance(data, pd.DataFrame) else str(data.dtype),
+    }
+    h.update(json.dumps(meta, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _evict_charts(directory: Path, max_files: int, max_bytes: int) -> None:
+    """最終利用時刻（mtime）の古い順に、件数・合計サイズの上限まで削除する。"""
+    entries = []
+    for p in directory.glob("*.png"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    count = len(entries)
+    for _, size, p in entries:
+        if count <= max_files and total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        count -= 1
+        total -= size
+
+
+def _render_png(
+    path: Path,
+    kind: str,
+    data: pd.Series | pd.DataFrame,
+    title: str,
+    theme: Optional[str],
+    size: Optional[tuple[float, float]],
+    params: dict[str, Any],
+) -> None:
+    """
+    グラフを描いて path に保存する（一時ファイル → rename で原子的に置き換え）。
+    テーマは rcParams を変えずに図ごとに適用するので、別スレッドで別テーマの図を同時に描いてもよい。
+    """
+    target = get_theme(theme) if theme else None
+    source = rc_colors() if target is not None and theme != current_theme() else None
+    with figure_scope(CHART_KINDS[kind](data, title=title, **params)) as fig:
+        if source is not None:
+            target.apply(fig, source)  # type: ignore[union-attr]
+        if size:
+            fig.set_size_inches(size)
+            fig.tight_layout()
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        fig.savefig(tmp, format="png", **(target.savefig_kwargs if target is not None else {}))
+        os.replace(tmp, path)
+
+
+@timed()
+def render_cached(
+    kind: str,
+    data: pd.Series | pd.DataFrame,
+    *,
+    title: str = "",
+    out: Optional[Path] = None,
+    theme: Optional[str] = None,
+    size: Optional[tuple[float, float]] = None,
+    as_bytes: bool = False,
+    directory: Optional[Path] = None,
+    max_files: int = CHART_CACHE_MAX_FILES,
+    max_bytes: int = CHART_CACHE_MAX_BYTES,
+    **params: Any,
+) -> Union[Path, bytes]:
+    """
+    キャッシュ付きでグラフを PNG にする。
+    - kind: CHART_KINDS のキー（"pie", "bar_counts" など）
+    - params: 各描画関数への追加引数（xlabel, rotation など）
+    - theme: "light" / "dark"。None なら現在のテーマ
+    - size: (幅, 高さ) インチ。None なら現在の figure.figsize
+    - out: 指定するとキャッシュからそのパスへコピーし、out を返す
+    - as_bytes: True なら PNG のバイト列を返す（st.image にそのまま渡せる）
+    返り値：PNG のパス（out 指定時は out）またはバイト列
+    """
+    if kind not in CHART_KINDS:
+        raise ValueError(f"未対応のグラフ種類です: {kind}")
+    theme = theme or current_theme()
+    size = tuple(size) if size else tuple(mpl.rcParams["figure.figsize"])  # type: ignore[assignment]
+    directory = directory or chart_cache_dir()
+
+    key = chart_key(kind, data, title=title, theme=theme, size=size, params=params)
+    path = directory / f"{kind}.{key}.png"
+    try:
+        os.utime(path)  # ヒット：最終利用時刻だけ更新（LRU 用）
+    except FileNotFoundError:
+        ensure_dir(directory)
+        _render_png(path, kind, data, title, theme, size, params)
+        _evict_charts(directory, max_files, max_bytes)
+
+    if out is not None:
+        ensure_dir(Path(out).parent)
+        shutil.copyfile(path, out)
+    if as_bytes:
+        return path.read_bytes()
+    return Path(out) if out is not None else path
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# 一括描画（プロセス並列）
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# レポート用のグラフ一式（設問ごとの円・棒、クロス集計の積み上げ棒など）を
+# 宣言的な ChartSpec のリストで受け取り、ワーカープロセスで並列に PNG にする。
+# 各ワーカーは Agg バックエンドでテーマを1回だけ適用し、描画は render_cached（キャッシュ付き）を通す。
+
+@dataclass
+class ChartSpec:
+    """
+    1枚分のグラフ定義。
+    - kind: CHART_KINDS のキー
+    - data: 件数・割合などの Series / クロス集計の DataFrame
+    - out: 保存先（None ならキャッシュ内のパス）
+    - params: 描画関数への追加引数（xlabel, rotation など）
+    """
+    kind: str
+    data: pd.Series | pd.DataFrame
+    title: str = ""
+    out: Optional[Path] = None
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+def _init_chart_worker(theme: Optional[str]) -> None:
+    """ワーカープロセスの初期化：GUI を使わない Agg バックエンドとテーマを設定する。"""
+    mpl.use("Agg")
+    if theme:
+        use_theme(theme)  # type: ignore[arg-type]
+
+
+def _render_spec(
+    spec: ChartSpec,
+    theme: Optional[str],
+    size: Optional[tuple[float, float]],
+    directory: Optional[Path],
+) -> Path:
+    return render_cached(  # type: ignore[return-value]
+        spec.kind, spec.data, title=spec.title, out=spec.out,
+        theme=theme, size=size, directory=directory, **spec.params,
+    )
+
+
+@timed()
+def render_charts(
+    specs: Iterable[ChartSpec | dict[str, Any]],
+    *,
+    workers: Optional[int] = None,
+    theme: Optional[str] = None,
+    size: Optional[tuple[float, float]] = None,
+    directory: Optional[Path] = None,
+) -> list[Path]:
+    """
+    複数のグラフをまとめて PNG にし、保存先のパスを specs と同じ順で返す。
+    - specs: ChartSpec または同じキーを持つ dict
+    - workers: 2 以上でプロセス並列（None/1 はこのプロセスで順に描画）
+    - theme: 全グラフに適用するテーマ（None なら現在のテーマ）
+    例：
+        render_charts([
+            ChartSpec("pie", count_by(df, "年代"), "年代比率", out=charts_dir() / "age.png"),
+            {"kind": "stacked_bar", "data": crosstab_counts(df, "年代", "性別"), "title": "年代×性別"},
+        ], workers=4)
+    """
+    items = [s if isinstance(s, ChartSpec) else ChartSpec(**s) for s in specs]
+    for s in items:
+        if s.kind not in CHART_KINDS:
+            raise ValueError(f"未対応のグラフ種類です: {s.kind}")
+    theme = theme or current_theme()
+    size = tuple(size) if size else None  # type: ignore[assignment]
+
+    if workers is None or workers <= 1 or len(items) <= 1:
+        return [_render_spec(s, theme, size, directory) for s in items]
+
+    n = len(items)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, n), initializer=_init_chart_worker, initargs=(theme,)
+    ) as ex:
+        return list(ex.map(_render_spec, items, [theme] * n, [size] * n, [directory] * n))
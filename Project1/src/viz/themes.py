@@ -3,7 +3,16 @@ from __future__ import annotations
 
 import matplotlib as mpl
 from contextlib import contextmanager
-from typing import Literal, Dict, Any
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Literal, Dict, Any, Mapping, Optional
+
+from matplotlib.colors import to_rgba
+from matplotlib.text import Text
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 
 # ---- 共通の基本パラメータ -------------------------------------------------------
@@ -74,21 +83,115 @@ DARK_RC: Dict[str, Any] = {
 }
 
 
-def _apply_rc(rc: Dict[str, Any]) -> None:
+# ---- コンパイル済みテーマ ---------------------------------------------------------
+#
+# BASE_RC とライト／ダークの差分を起動時に1回だけ合わせ、検証済みの値を持つ変更不可のオブジェクトにする。
+# - use_theme / theme_context : rcParams（プロセス全体で共有）を書き換える従来の方法
+# - Theme.apply(fig)           : rcParams を変えずに、描き終えた図の色だけをテーマに合わせる。
+#                                スレッドごとに別のテーマで描いても干渉しない
+# ライトとダークで違うのは色だけ（サイズ・フォントは BASE_RC で共通）なので、図ごとの適用は色の付け替えで済む。
+
+# テーマで変わる色のキー
+COLOR_KEYS: tuple[str, ...] = tuple(sorted((set(LIGHT_RC) | set(DARK_RC)) - {"lines.linewidth"}))
+
+ThemeName = Literal["light", "dark"]
+
+
+@dataclass(frozen=True)
+class Theme:
+    """BASE_RC とテーマ差分を合わせた、検証済みの rcParams（読み取り専用）。"""
+    name: str
+    rc: Mapping[str, Any]
+
+    @classmethod
+    def compile(cls, name: str, *layers: Mapping[str, Any]) -> "Theme":
+        merged: Dict[str, Any] = {}
+        for layer in layers:
+            merged.update(layer)
+        # RcParams を通して値を検証・正規化しておく（適用のたびに検証し直さなくてよい形にする）
+        validated = mpl.RcParams(merged)
+        return cls(name, MappingProxyType(dict(validated)))
+
+    @cached_property
+    def savefig_kwargs(self) -> Mapping[str, Any]:
+        """savefig に渡す引数（rcParams の savefig.* を使わずにこのテーマで保存する）。"""
+        return MappingProxyType({
+            "dpi": self.rc["savefig.dpi"],
+            "bbox_inches": self.rc["savefig.bbox"],
+            "pad_inches": self.rc["savefig.pad_inches"],
+            "facecolor": self.rc["savefig.facecolor"],
+        })
+
+    def apply(self, fig: "Figure", source: Optional[Mapping[str, Any]] = None) -> "Figure":
+        """
+        描き終えた図の色をこのテーマに合わせる（rcParams は変更しない）。
+        source は図を作ったときの色（省略時は現在の rcParams）。source の文字色のままの文字をこのテーマの文字色にする。
+        """
+        src = source if source is not None else rc_colors()
+        c = self.rc
+        old_text = to_rgba(src["text.color"])
+        for t in fig.findobj(Text):
+            if to_rgba(t.get_color()) == old_text:
+                t.set_color(c["text.color"])
+        fig.patch.set_facecolor(c["figure.facecolor"])
+        for ax in fig.axes:
+            ax.patch.set_facecolor(c["axes.facecolor"])
+            for spine in ax.spines.values():
+                spine.set_edgecolor(c["axes.edgecolor"])
+            ax.xaxis.label.set_color(c["axes.labelcolor"])
+            ax.yaxis.label.set_color(c["axes.labelcolor"])
+            ax.tick_params(axis="x", colors=c["xtick.color"])
+            ax.tick_params(axis="y", colors=c["ytick.color"])
+            ax.tick_params(grid_color=c["grid.color"])
+            legend = ax.get_legend()
+            if legend is not None and mpl.rcParams["legend.facecolor"] == "inherit":
+                legend.get_frame().set_facecolor(c["axes.facecolor"])
+        return fig
+
+
+THEMES: Mapping[str, Theme] = MappingProxyType({
+    "light": Theme.compile("light", BASE_RC, LIGHT_RC),
+    "dark": Theme.compile("dark", BASE_RC, DARK_RC),
+})
+
+
+def get_theme(mode: str) -> Theme:
+    """コンパイル済みのテーマを返す。"""
+    try:
+        return THEMES[mode]
+    except KeyError:
+        raise ValueError(f"未対応のテーマです: {mode}") from None
+
+
+def rc_colors() -> dict[str, Any]:
+    """現在の rcParams のうちテーマで変わる色（Theme.apply の source 用）。"""
+    rc = mpl.rcParams
+    return {k: rc[k] for k in COLOR_KEYS}
+
+
+# 直近に適用したテーマ名（描画キャッシュのキーなどに使う）
+_current_theme: Optional[str] = None
+
+
+def _apply_rc(rc: Mapping[str, Any]) -> None:
     """rcParams をまとめて更新する内部ヘルパ。"""
     mpl.rcParams.update(rc)
 
 
 def use_theme(mode: Literal["light", "dark"] = "light") -> None:
     """
-    テーマを適用する（ライト／ダーク）。
+    テーマを適用する（ライト／ダーク）。rcParams（プロセス全体）を書き換える。
     保存画像は常に白背景になるように設定（報告書向け）。
     """
-    _apply_rc(BASE_RC)
-    if mode == "dark":
-        _apply_rc(DARK_RC)
-    else:
-        _apply_rc(LIGHT_RC)
+    global _current_theme
+    theme = THEMES["dark" if mode == "dark" else "light"]
+    _apply_rc(theme.rc)
+    _current_theme = theme.name
+
+
+def current_theme() -> Optional[str]:
+    """直近に use_theme で適用したテーマ名（未適用なら None）。"""
+    return _current_theme
 
 
 def use_default_theme() -> None:
@@ -101,20 +204,30 @@ def use_default_theme() -> None:
 
 def reset_to_mpl_default() -> None:
     """Matplotlib のデフォルトに戻す（必要なら）。"""
+    global _current_theme
     mpl.rcParams.update(mpl.rcParamsDefault)
+    _current_theme = None
 
 
 @contextmanager
 def theme_context(mode: Literal["light", "dark"] = "light"):
     """
     一時的にテーマを適用するためのコンテキストマネージャ。
+    テーマが変える項目だけを退避・復元する（rcParams 全体はコピーしない）。
+    rcParams はプロセス全体で共有されるため、別スレッドで別テーマの図を描くときは
+    get_theme(mode).apply(fig) を使う。
     例：
         with theme_context("light"):
             ... グラフ作成 ...
     """
-    rc_backup = mpl.rcParams.copy()
+    global _current_theme
+    theme = THEMES["dark" if mode == "dark" else "light"]
+    rc_backup = {k: mpl.rcParams[k] for k in theme.rc}
+    theme_backup = _current_theme
     try:
-        use_theme(mode)
+        _apply_rc(theme.rc)
+        _current_theme = theme.name
         yield
     finally:
-        mpl.rcParams.update(rc_backup)
\ No newline at end of file
+        _apply_rc(rc_backup)
+        _current_theme = theme_backup
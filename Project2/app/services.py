@@ -3,12 +3,10 @@
 from .models import Transaction
 from .storage import Storage
 
-import csv
-
 class FinanceService:
     @staticmethod
     def add_entry(is_revenue, trans_data):
-        transaction = Transaction(trans_data)
+        transaction = Transaction(**trans_data)
         type_name = "revenue" if is_revenue else "expenses"
         Storage.save(type_name, transaction)
         return transaction
@@ -21,13 +19,11 @@ class FinanceService:
     
     @staticmethod
     def get_monthly_data(is_revenue, year_month):
+        """その月の取引を Transaction のリストで返す（日付は date、金額は int）"""
         type_name = "revenue" if is_revenue else "expenses"
-        path = Storage.get_path(type_name, year_month)
-        
-        rows = []
-        if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if row: rows.append(row)
-        return rows
\ No newline at end of file
+        return Storage.load_month(type_name, year_month)
+
+    @staticmethod
+    def compact(vacuum=False):
+        """以前の CSV を取り込み、データベースを整理する"""
+        return Storage.compact(vacuum=vacuum)
@@ -1,29 +1,172 @@
 import csv
-import os
+import sqlite3
+from datetime import date
 from pathlib import Path
 
+from .models import Transaction
+
+
 class Storage:
+    """
+    取引データの保存先（SQLite）。
+    - 1取引1行。年月（YYYY_MM）を月ごとの区切り（パーティションキー）として持ち、
+      (種別, 年月, 日付) と (種別, 分類, 日付) に索引を張る → 月単位・分類単位の読み込みは索引だけで済む
+    - 日付は ISO 形式の文字列、金額は整数で保存し、読み込み時は Transaction（date / int）で返す
+    - WAL モードなので追記が速く、読み込み中でも書き込める
+    - 以前の CSV（data/<type>/<type>_YYYY_MM.csv）は compact() で取り込める
+    """
     BASE_DIR = Path("data")
+    DB_NAME = "ledger.sqlite3"
+
+    _conn = None
+    _conn_path = None
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS transactions (
+        id         INTEGER PRIMARY KEY,
+        type       TEXT    NOT NULL,
+        year_month TEXT    NOT NULL,
+        date       TEXT    NOT NULL,
+        category   TEXT    NOT NULL,
+        amount     INTEGER NOT NULL,
+        note       TEXT    NOT NULL DEFAULT ''
+    );
+    CREATE INDEX IF NOT EXISTS idx_transactions_month
+        ON transactions (type, year_month, date, amount);
+    CREATE INDEX IF NOT EXISTS idx_transactions_category
+        ON transactions (type, category, date);
+    """
 
     # ファイルパスの取得
     @classmethod
     def get_path(cls, type_name: str, year_month: str):
+        """以前の形式（月ごとの CSV）のパス。compact() での取り込みに使う"""
         return cls.BASE_DIR / type_name / f"{type_name}_{year_month}.csv"
 
+    @classmethod
+    def db_path(cls):
+        return cls.BASE_DIR / cls.DB_NAME
+
+    # 接続（1プロセスで1つを使い回す。BASE_DIR を変えたら作り直す）
+    @classmethod
+    def connect(cls):
+        path = cls.db_path()
+        if cls._conn is not None and cls._conn_path == path:
+            return cls._conn
+        cls.close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(cls.SCHEMA)
+        cls._conn, cls._conn_path = conn, path
+        return conn
+
+    @classmethod
+    def close(cls):
+        if cls._conn is not None:
+            cls._conn.close()
+        cls._conn, cls._conn_path = None, None
+
+    @staticmethod
+    def _row(type_name, transaction):
+        d = transaction.date
+        return (type_name, d.strftime("%Y_%m"), d.isoformat(),
+                transaction.category, int(transaction.amount), transaction.note or "")
+
     #保存
     @classmethod
     def save(cls, type_name, transaction):
-        ym = transaction.date.strftime("%Y_%m")
-        path = cls.get_path(type_name, ym)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(transaction.to_list())
+        cls.save_many(type_name, [transaction])
+
+    @classmethod
+    def save_many(cls, type_name, transactions):
+        """まとめて保存（1トランザクションで書くので、大量でも速い）"""
+        conn = cls.connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO transactions (type, year_month, date, category, amount, note)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (cls._row(type_name, t) for t in transactions),
+            )
+
+    #読み込み
+    @staticmethod
+    def _transactions(cursor):
+        return [Transaction(date.fromisoformat(d), c, a, n) for d, c, a, n in cursor]
+
+    @classmethod
+    def load_month(cls, type_name, year_month):
+        """その月の取引（日付順・同じ日は登録順）"""
+        cur = cls.connect().execute(
+            "SELECT date, category, amount, note FROM transactions"
+            " WHERE type = ? AND year_month = ? ORDER BY date, id",
+            (type_name, year_month),
+        )
+        return cls._transactions(cur)
+
+    @classmethod
+    def load_range(cls, type_name, start, end, category=None):
+        """start〜end（両端を含む）の取引。category を指定するとその分類だけ"""
+        sql = ("SELECT date, category, amount, note FROM transactions"
+               " WHERE type = ? AND date BETWEEN ? AND ?")
+        params = [type_name, start.isoformat(), end.isoformat()]
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        cur = cls.connect().execute(sql + " ORDER BY date, id", params)
+        return cls._transactions(cur)
+
+    @classmethod
+    def monthly_totals(cls, type_name):
+        """{年月: 合計金額}（集計は SQLite 側で行う）"""
+        cur = cls.connect().execute(
+            "SELECT year_month, SUM(amount) FROM transactions"
+            " WHERE type = ? GROUP BY year_month ORDER BY year_month",
+            (type_name,),
+        )
+        return dict(cur.fetchall())
 
     #消去
     @classmethod
     def delete_file(cls, type_name, year_month):
+        """その月のデータを全て消す（以前の CSV が残っていればそれも消す）"""
+        conn = cls.connect()
+        with conn:
+            conn.execute("DELETE FROM transactions WHERE type = ? AND year_month = ?",
+                         (type_name, year_month))
         path = cls.get_path(type_name, year_month)
         if path.exists():
-            path.unlink()
\ No newline at end of file
+            path.unlink()
+
+    #整理
+    @classmethod
+    def compact(cls, vacuum=False):
+        """
+        以前の CSV を取り込んで削除し、索引の統計を必要に応じて更新する。
+        vacuum=True なら削除で空いた領域も詰める（ファイルを書き直すので大きいと時間がかかる）。
+        読めない行（日付や金額の形式が違うなど）がある CSV は取り込まずにそのまま残す。
+        取り込んだ CSV の数を返す。
+        """
+        imported = 0
+        for path in sorted(cls.BASE_DIR.glob("*/*_[0-9][0-9][0-9][0-9]_[0-9][0-9].csv")):
+            type_name = path.parent.name
+            try:
+                with open(path, newline="", encoding="utf-8") as f:
+                    rows = [r for r in csv.reader(f) if r]
+                transactions = [
+                    Transaction(date.fromisoformat(r[0]), r[1], int(r[2]), r[3] if len(r) > 3 else "")
+                    for r in rows
+                ]
+            except (OSError, UnicodeDecodeError, ValueError, IndexError) as e:
+                print(f"取り込めなかったため残します: {path} ({e})")
+                continue
+            cls.save_many(type_name, transactions)
+            path.unlink()
+            imported += 1
+        conn = cls.connect()
+        conn.execute("PRAGMA optimize")
+        if vacuum:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+        return imported
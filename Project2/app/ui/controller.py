@@ -18,9 +18,8 @@ class MainController:
             self.view.tree.delete(item)
 
         for is_rev in [True, False]:
-            rows = self.service.get_monthly_data(is_rev, ym)
-            for row in rows:
-                self.view.tree.insert("", "end", values=row)
+            for t in self.service.get_monthly_data(is_rev, ym):
+                self.view.tree.insert("", "end", values=t.to_list())
 
     def handle_add(self):
         data = self.view.get_input_data()
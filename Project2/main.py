@@ -21,6 +21,7 @@ def main():
     setup_directories()
     view = MainView()
     service = FinanceService()
+    service.compact()  # 以前の CSV があれば取り込む
     controller = MainController(view, service)
     print("Application starting...")
     view.mainloop()